@@ -0,0 +1,103 @@
+"""
+CollectionMatcher startup on a synthetic genre/alpha/artist/album library:
+a full scan vs. a start from the persistent index with nothing changed and
+with a few albums added, renamed and removed.
+
+The resulting collection caches are compared against a full rescan of the
+same tree, so the benchmark also checks the incremental index is exact.
+
+    python benchmarks/collection_index.py [--albums N] [--changes N] [--path DIR]
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.core.rileys_collection_matcher import CollectionMatcher
+
+GENRES = ["Rock", "Hip-Hop", "Jazz", "Electronic", "Metal"]
+WORDS = ["Love", "Night", "City", "Fire", "Dreams", "Heart", "Blue", "Road", "Light", "Summer", "Stone",
+         "Glass", "Wave", "Ghost", "River", "Echoes", "Gold", "Static", "Wild", "Silence"]
+ALBUMS_PER_ARTIST = 6
+TRACKS_PER_ALBUM = 3
+
+
+def make_library(root: Path, albums: int, rng: random.Random):
+    for i in range(albums // ALBUMS_PER_ARTIST):
+        artist = f"{' '.join(rng.sample(WORDS, 2))} {i}"
+        artist_dir = root / rng.choice(GENRES) / artist[0] / artist
+        for j in range(ALBUMS_PER_ARTIST):
+            add_album(artist_dir, artist, f"{1970 + (i + j) % 50} - {' '.join(rng.sample(WORDS, 3))} {j}")
+
+
+def add_album(artist_dir: Path, artist: str, folder: str):
+    album_dir = artist_dir / folder
+    album_dir.mkdir(parents=True)
+    for track in range(1, TRACKS_PER_ALBUM + 1):
+        (album_dir / f"{track:02d} - {artist} - Track {track}.mp3").touch()
+
+
+def change_library(root: Path, changes: int, rng: random.Random):
+    albums = sorted(p for p in root.glob("*/*/*/*") if p.is_dir())
+    for album_dir in rng.sample(albums, min(changes, len(albums))):
+        action = rng.choice(["add", "rename", "remove"])
+        if action == "add":
+            add_album(album_dir.parent, album_dir.parent.name, f"2024 - New Album {rng.randint(0, 10 ** 6)}")
+        elif action == "rename":
+            album_dir.rename(album_dir.with_name(album_dir.name + " (Deluxe)"))
+        else:
+            shutil.rmtree(album_dir)
+
+
+def start(root: Path, index: Path, rebuild: bool = False):
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        matcher = CollectionMatcher(str(root), index_path=str(index), rebuild=rebuild)
+    return time.perf_counter() - start_time, matcher
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--albums", type=int, default=20_000)
+    parser.add_argument("--changes", type=int, default=25, help="albums added, renamed or removed between runs")
+    parser.add_argument("--path", help="use an existing library instead of generating one (read only)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    work_dir = Path(tempfile.mkdtemp())
+    index = work_dir / "collection_index.json"
+    if args.path:
+        root = Path(args.path)
+    else:
+        root = work_dir / "library"
+        print(f"Generating {args.albums:,} albums...")
+        make_library(root, args.albums, rng)
+
+    runs = [("full scan", *start(root, index, rebuild=True)), ("unchanged", *start(root, index))]
+    if not args.path:
+        change_library(root, args.changes, rng)
+        runs.append((f"{args.changes} changed", *start(root, index)))
+
+    _, reference = start(root, work_dir / "reference.json", rebuild=True)
+    if runs[-1][2].collection_cache != reference.collection_cache:
+        print("MISMATCH: collection cache from the index differs from a full rescan")
+        sys.exit(1)
+
+    print(f"\n{'start':>12} | {'time (ms)':>9} | {'rescanned':>9} | {'speedup':>7}")
+    print("-" * 48)
+    for label, elapsed, matcher in runs:
+        print(f"{label:>12} | {elapsed * 1000:9.1f} | {matcher.rescanned:9,} | {runs[0][1] / elapsed:6.1f}x")
+    shutil.rmtree(work_dir)
+
+
+if __name__ == "__main__":
+    main()
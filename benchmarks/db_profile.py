@@ -0,0 +1,150 @@
+"""
+Database connection profiles on a synthetic releases table: the previous
+defaults (rollback journal, synchronous=FULL, no mmap, dict rows for bulk
+reads) vs. the tuned profile from the "database" config section with tuple
+rows for bulk reads.
+
+Each profile runs on a fresh copy of the same database.
+
+    python benchmarks/db_profile.py [--releases N] [--rounds N]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.core.config import Config as config
+from deemon.core.seen import SeenReleases
+from deemon.utils import startup
+
+RELEASES_PER_ARTIST = 100
+# One initial import followed by TRANSACTIONS refreshes of RELEASES_PER_REFRESH releases
+TRANSACTIONS = 200
+RELEASES_PER_REFRESH = 50
+
+LEGACY_PROFILE = {"journal_mode": "delete", "synchronous": "full", "mmap_size": 0, "cache_size": 2}
+
+
+def build_template(path: Path, releases: int):
+    from deemon.core import db
+    database = db.Database()
+    artists = releases // RELEASES_PER_ARTIST
+    today = date.today()
+    rows = []
+    imported = releases - TRANSACTIONS * RELEASES_PER_REFRESH
+    for album_id in range(releases):
+        artist_id = album_id % artists
+        release_date = (today - timedelta(days=album_id % 3650)).strftime('%Y-%m-%d')
+        trans_id = 1 if album_id < imported else (album_id - imported) // RELEASES_PER_REFRESH + 2
+        rows.append((artist_id, f"Artist {artist_id}", album_id, f"Album {album_id}", release_date,
+                     int(time.time()), 1, 0, trans_id))
+    database.insert_multiple('releases', rows)
+    database.cursor.executemany(
+        "INSERT INTO monitor (artist_id, artist_name, bitrate, record_type, alerts, profile_id, trans_id) "
+        "VALUES (?, ?, '320', 'all', 0, 1, ?)",
+        [(i, f"Artist {i}", 1) for i in range(artists)])
+    database.cursor.executemany("INSERT INTO transactions ('timestamp', 'profile_id') VALUES (?, 1)",
+                                [(int(time.time()),)] * (TRANSACTIONS + 1))
+    database.checkpoint()
+    database.close()
+    shutil.copy(startup.get_database(), path)
+
+
+def open_database(settings: dict):
+    from deemon.core import db
+    config._CONFIG['database'] = settings
+    return db.Database()
+
+
+def run_profile(settings: dict, legacy: bool, template: Path, rounds: int, releases: int) -> dict:
+    timings = {"load seen": [], "stats": [], "store new": [], "show releases": [], "rollback view": [],
+               "rollback": []}
+    for _ in range(rounds):
+        target = startup.get_database()
+        for suffix in ("-wal", "-shm"):
+            Path(str(target) + suffix).unlink(missing_ok=True)
+        shutil.copy(template, target)
+        database = open_database(settings)
+
+        # refresh loads all seen releases and stores a batch of new ones
+        new_releases = [{'artist_id': i % 1000, 'artist_name': f"Artist {i % 1000}", 'id': releases + i,
+                         'title': f"New {i}", 'release_date': date.today().strftime('%Y-%m-%d'), 'future': 0,
+                         'explicit_lyrics': 0, 'record_type': 'album'} for i in range(5000)]
+        config.set('tid', database.get_next_transaction_id(), validate=False)
+        start = time.perf_counter()
+        if legacy:
+            SeenReleases(database.get_artist_releases())
+        else:
+            database.get_seen_releases()
+        timings["load seen"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        if legacy:
+            len(database.get_all_monitored_artist_ids())
+            len(database.get_all_monitored_playlist_ids())
+            len(database.get_artist_releases())
+            len(database.get_future_releases())
+        else:
+            database.get_stats()
+        timings["stats"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        database.add_new_releases(new_releases)
+        database.commit()
+        timings["store new"].append(time.perf_counter() - start)
+
+        now = int(time.time())
+        start = time.perf_counter()
+        database.show_new_releases(now - 90 * 86400, now)
+        timings["show releases"].append(time.perf_counter() - start)
+
+        config.set('rollback_view_limit', 100, validate=False)
+        start = time.perf_counter()
+        database.get_transactions()
+        timings["rollback view"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        database.rollback_last_refresh(100)
+        timings["rollback"].append(time.perf_counter() - start)
+        database.close()
+    return {k: statistics.median(v) for k, v in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--releases", type=int, default=1_000_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    config()
+    config.set('check_account_status', False)
+    config.set('profile_id', 1, validate=False)
+
+    tuned_profile = dict(config._CONFIG['database'])
+
+    template = Path(tempfile.mkdtemp()) / "template.db"
+    print(f"Building template database with {args.releases:,} releases...")
+    build_template(template, args.releases)
+
+    results = {
+        "legacy": run_profile(LEGACY_PROFILE, True, template, args.rounds, args.releases),
+        "tuned": run_profile(tuned_profile, False, template, args.rounds, args.releases),
+    }
+
+    print(f"\n{'workload':>14} | {'legacy (ms)':>11} | {'tuned (ms)':>11} | {'speedup':>7}")
+    print("-" * 54)
+    for workload in results["legacy"]:
+        legacy, tuned = results["legacy"][workload], results["tuned"][workload]
+        print(f"{workload:>14} | {legacy * 1000:11.1f} | {tuned * 1000:11.1f} | {legacy / tuned:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Exclusion filtering of synthetic album titles: the previous per-title
+re.search loop vs. the compiled ExclusionFilter (cold and memoized).
+
+Results of both are compared so the benchmark also checks that the
+compiled filter excludes exactly the same titles.
+
+    python benchmarks/exclusions.py [--titles N] [--unique N] [--rounds N]
+"""
+import argparse
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.core.common import ExclusionFilter
+
+PATTERNS = [r"(?i)\blive\b", r"Remaster(ed)?\s*\d{4}", r"\bKaraoke\b", r"Instrumental", r"\bDemos?\b",
+            r"^Best of", r"\bRemix(es)?\b", r"Acoustic", r"\bEdit\)$", r"Anniversary",
+            r"Commentary", r"\(Sped Up\)", r"Slowed", r"Tribute", r"\bMedley\b"]
+KEYWORDS = ["deluxe", "expanded", "bonus", "clean", "radio", "mono", "version", "explicit", "session", "tour"]
+
+WORDS = ["Love", "Night", "City", "Fire", "Dreams", "Heart", "Blue", "Road", "Light", "Summer", "Stone",
+         "Glass", "Wave", "Ghost", "River", "Echoes", "Gold", "Static", "Wild", "Silence"]
+# Most titles are plain, roughly one in five carries an excluded suffix
+SUFFIXES = [""] * 40 + [" (Deluxe Edition)", " [Live]", " (Remastered 2011)", " (Radio Edit)",
+            " (Instrumental)", " [Bonus Tracks]", " (Acoustic Version)", " (Sped Up)", " (Mono)"]
+
+
+def legacy_exclude_filtered_versions(albums: list, exclusion_patterns: list, exclusion_keywords: list) -> list:
+    """ Previous implementation from deemon.core.common """
+    allowed = []
+    for album in albums:
+        album_title = album['title']
+        exclusion_pattern_match = [p for p in exclusion_patterns if re.search(p, album_title)]
+        keyword_search = re.search(r'\(([^)]+)\)|\[([^)]+)]', album_title.lower())
+        exclusion_keyword_match = [e for e in exclusion_keywords if keyword_search and e in keyword_search.group()]
+        if exclusion_keyword_match or exclusion_pattern_match:
+            continue
+        allowed.append(album)
+    return allowed
+
+
+def make_titles(count: int, unique: int) -> list:
+    rng = random.Random(0)
+    pool = [" ".join(rng.sample(WORDS, rng.randint(1, 4))) + rng.choice(SUFFIXES) for _ in range(unique)]
+    return [{'title': rng.choice(pool)} for _ in range(count)]
+
+
+def timed(func, rounds: int):
+    best, result = None, None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--unique", type=int, default=20_000, help="distinct titles among --titles")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    albums = make_titles(args.titles, args.unique)
+    keywords = [k.lower() for k in KEYWORDS]
+
+    legacy_time, legacy = timed(lambda: legacy_exclude_filtered_versions(albums, PATTERNS, keywords), args.rounds)
+    cold_time, cold = timed(lambda: ExclusionFilter(PATTERNS, keywords).filter(albums), args.rounds)
+    exclusions = ExclusionFilter(PATTERNS, keywords)
+    exclusions.filter(albums)
+    warm_time, warm = timed(lambda: exclusions.filter(albums), args.rounds)
+
+    if not (legacy == cold == warm):
+        print("MISMATCH: compiled filter results differ from the previous implementation")
+        sys.exit(1)
+
+    print(f"{args.titles:,} titles ({args.unique:,} distinct), {len(PATTERNS)} patterns, {len(keywords)} keywords, "
+          f"{args.titles - len(legacy):,} excluded\n")
+    print(f"{'filter':>10} | {'time (ms)':>9} | {'titles/s':>12} | {'speedup':>7}")
+    print("-" * 48)
+    for label, elapsed in (("legacy", legacy_time), ("compiled", cold_time), ("memoized", warm_time)):
+        print(f"{label:>10} | {elapsed * 1000:9.1f} | {args.titles / elapsed:12,.0f} | {legacy_time / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
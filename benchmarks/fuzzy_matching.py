@@ -0,0 +1,149 @@
+"""
+Playlist lookups against a synthetic collection: the previous
+is_album_in_collection (full-matrix Levenshtein against every artist) vs.
+CollectionMatcher.match_albums with the trigram FuzzyIndex.
+
+The previous implementation is too slow to run for a whole playlist, so it
+is timed on --legacy-sample albums and extrapolated. Results for the sample
+are compared so the benchmark also checks both agree.
+
+    python benchmarks/fuzzy_matching.py [--artists N] [--playlist N] [--legacy-sample N]
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.core.rileys_collection_matcher import CollectionMatcher
+
+WORDS = ["love", "night", "city", "fire", "dreams", "heart", "blue", "road", "light", "summer", "stone",
+         "glass", "wave", "ghost", "river", "echoes", "gold", "static", "wild", "silence", "black", "young",
+         "kings", "sister", "machine", "electric", "north", "velvet", "paper", "crystal"]
+ALBUMS_PER_ARTIST = 6
+
+
+def legacy_fuzzy_match(str1: str, str2: str, threshold: float = 0.85) -> bool:
+    """ Previous CollectionMatcher._fuzzy_match """
+    if not str1 or not str2:
+        return False
+    if str1 == str2:
+        return True
+    if str1 in str2 or str2 in str1:
+        len_ratio = min(len(str1), len(str2)) / max(len(str1), len(str2))
+        if len_ratio >= 0.70:
+            return True
+    len1, len2 = len(str1), len(str2)
+    if abs(len1 - len2) > max(len1, len2) * 0.3:
+        return False
+    d = [[0] * (len2 + 1) for _ in range(len1 + 1)]
+    for i in range(len1 + 1):
+        d[i][0] = i
+    for j in range(len2 + 1):
+        d[0][j] = j
+    for i in range(1, len1 + 1):
+        for j in range(1, len2 + 1):
+            cost = 0 if str1[i - 1] == str2[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+    return 1 - (d[len1][len2] / max(len1, len2)) >= threshold
+
+
+def legacy_is_album_in_collection(matcher: CollectionMatcher, artist_name: str, album_name: str) -> bool:
+    """ Previous CollectionMatcher.is_album_in_collection """
+    normalized_artist = matcher._normalize_text(artist_name)
+    normalized_album = matcher._normalize_text(album_name)
+    cache = matcher.collection_cache
+    if normalized_artist in cache:
+        if normalized_album in cache[normalized_artist]:
+            return True
+        for cached_album in cache[normalized_artist].keys():
+            if legacy_fuzzy_match(normalized_album, cached_album, threshold=0.85):
+                return True
+    for cached_artist in cache.keys():
+        if legacy_fuzzy_match(normalized_artist, cached_artist, threshold=0.90):
+            if normalized_album in cache[cached_artist]:
+                return True
+            for cached_album in cache[cached_artist].keys():
+                if legacy_fuzzy_match(normalized_album, cached_album, threshold=0.85):
+                    return True
+    return False
+
+
+def typo(text: str, rng: random.Random) -> str:
+    i = rng.randrange(len(text))
+    return text[:i] + rng.choice(string.ascii_lowercase) + text[i + 1:]
+
+
+def make_matcher(artists: int, rng: random.Random) -> CollectionMatcher:
+    matcher = CollectionMatcher.__new__(CollectionMatcher)
+    matcher.collection_cache = {}
+    matcher._artists = None
+    matcher._albums = {}
+    for i in range(artists):
+        artist = f"{' '.join(rng.sample(WORDS, rng.randint(1, 3)))} {i}"
+        matcher.collection_cache[artist] = {
+            f"{' '.join(rng.sample(WORDS, rng.randint(2, 4)))}": {'artist': artist} for _ in range(ALBUMS_PER_ARTIST)
+        }
+    return matcher
+
+
+def make_playlist(matcher: CollectionMatcher, count: int, rng: random.Random) -> list:
+    """ A third owned, a third owned with typos, a third not in the collection """
+    artists = list(matcher.collection_cache)
+    playlist = []
+    for i in range(count):
+        artist = rng.choice(artists)
+        album = rng.choice(list(matcher.collection_cache[artist]))
+        if i % 3 == 1:
+            artist, album = typo(artist, rng), typo(album, rng)
+        elif i % 3 == 2:
+            artist, album = f"{artist} {rng.choice(WORDS)}", f"{rng.choice(WORDS)} {album}"
+        playlist.append((artist.title(), album.title()))
+    return playlist
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--artists", type=int, default=50_000)
+    parser.add_argument("--playlist", type=int, default=500)
+    parser.add_argument("--legacy-sample", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    matcher = make_matcher(args.artists, rng)
+    playlist = make_playlist(matcher, args.playlist, rng)
+
+    start = time.perf_counter()
+    matcher._artist_index()
+    index_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = matcher.match_albums(playlist)
+    batch_time = time.perf_counter() - start
+
+    sample = playlist[:args.legacy_sample]
+    start = time.perf_counter()
+    legacy = [legacy_is_album_in_collection(matcher, artist, album) for artist, album in sample]
+    legacy_time = (time.perf_counter() - start) / len(sample) * len(playlist)
+
+    if legacy != matches[:len(sample)]:
+        print("MISMATCH: indexed matching differs from the previous implementation")
+        sys.exit(1)
+
+    print(f"{args.artists:,} artists, {args.artists * ALBUMS_PER_ARTIST:,} albums, "
+          f"{args.playlist:,} playlist albums, {sum(matches):,} in collection\n")
+    print(f"{'matching':>18} | {'time (s)':>9} | {'speedup':>7}")
+    print("-" * 42)
+    print(f"{'legacy (est.)':>18} | {legacy_time:9.2f} | {1:6.1f}x")
+    print(f"{'index + batch':>18} | {index_time + batch_time:9.2f} | {legacy_time / (index_time + batch_time):6.1f}x")
+    print(f"{'  of which index':>18} | {index_time:9.2f} |")
+
+
+if __name__ == "__main__":
+    main()
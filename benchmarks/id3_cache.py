@@ -0,0 +1,129 @@
+"""
+Reading the tags of a synthetic MP3 library for `library upgrade`: the
+previous EasyID3 pass over every file in a ThreadPoolExecutor(10) vs.
+read_library_tags with an empty cache (threads and worker processes), with
+nothing changed and with a few files retagged.
+
+Tags are compared against the previous implementation so the benchmark
+also checks cached results are exact.
+
+    python benchmarks/id3_cache.py [--files N] [--changes N] [--processes N]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from mutagen.easyid3 import EasyID3
+from mutagen.id3 import ID3
+
+from deemon.cmd import upgradelib
+from deemon.utils import scanner, startup
+
+WORDS = ["Love", "Night", "City", "Fire", "Dreams", "Heart", "Blue", "Road", "Light", "Summer", "Stone",
+         "Glass", "Wave", "Ghost", "River", "Echoes", "Gold", "Static", "Wild", "Silence"]
+TRACKS_PER_ALBUM = 10
+
+
+def tag(file: Path, artist: str, album: str, title: str):
+    audio = EasyID3(file)
+    audio.update({'artist': artist, 'album': album, 'title': title, 'tracknumber': '1'})
+    audio.save()
+
+
+def make_library(root: Path, files: int, rng: random.Random):
+    for i in range(files):
+        if i % TRACKS_PER_ALBUM == 0:
+            artist = f"{' '.join(rng.sample(WORDS, 2))} {i // 60}"
+            album = f"{' '.join(rng.sample(WORDS, 3))}"
+            album_dir = root / artist / album
+            album_dir.mkdir(parents=True, exist_ok=True)
+        file = album_dir / f"{i % TRACKS_PER_ALBUM + 1:02d} - Track.mp3"
+        # A tag with padding and some MPEG-looking filler, enough for EasyID3
+        ID3().save(file, padding=lambda info: 1024)
+        with open(file, 'ab') as f:
+            f.write(b'\xff\xfb\x90\x64' + bytes(4096))
+        if i % 50 == 49:
+            continue  # untagged file, shows up as an ID3 error
+        tag(file, artist, album, f"Track {i}")
+
+
+def change_library(root: Path, changes: int, rng: random.Random):
+    files = sorted(root.glob("**/*.mp3"))
+    for file in rng.sample(files, min(changes, len(files))):
+        tag(file, "Retagged Artist", "Retagged Album", file.stem)
+        # Keep the size, make sure the mtime moves on coarse filesystems
+        os.utime(file, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+
+def legacy_read(files: list) -> list:
+    """ Previous upgrade(): read_metadata for every file in a ThreadPoolExecutor(10) """
+    with ThreadPoolExecutor(10) as executor:
+        return [{'error': str(meta['error']) or type(meta['error']).__name__} if meta['error'] else
+                {key: meta[key] for key in ('artist', 'album', 'title')}
+                for meta in executor.map(upgradelib.read_metadata, files)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def scan(root: Path) -> list:
+    return sorted(scanner.scan(root, extensions={'.mp3'}), key=lambda entry: entry.path)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=20_000)
+    parser.add_argument("--changes", type=int, default=100, help="files retagged between runs")
+    parser.add_argument("--processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    root = Path(tempfile.mkdtemp()) / "library"
+    print(f"Generating {args.files:,} MP3 files...")
+    make_library(root, args.files, rng)
+    upgradelib.LIBRARY_ROOT = str(root)
+    cache = startup.get_id3_cache()
+
+    entries = scan(root)
+    files = [Path(entry.path) for entry in entries]
+    legacy_time, expected = timed(lambda: legacy_read(files))
+
+    runs = [("legacy", legacy_time, expected)]
+    for label, processes in (("cold threads", 0), (f"cold {args.processes} procs", args.processes)):
+        cache.unlink(missing_ok=True)
+        runs.append((label, *timed(lambda: upgradelib.read_library_tags(entries, processes))))
+    runs.append(("unchanged", *timed(lambda: upgradelib.read_library_tags(entries))))
+
+    change_library(root, args.changes, rng)
+    entries = scan(root)
+    _, reference = timed(lambda: legacy_read([Path(entry.path) for entry in entries]))
+    runs.append((f"{args.changes} changed", *timed(lambda: upgradelib.read_library_tags(entries))))
+
+    for label, _, result in runs:
+        if result != (reference if label == runs[-1][0] else expected):
+            print(f"MISMATCH: {label} tags differ from reading every file")
+            sys.exit(1)
+
+    print(f"\n{args.files:,} files, {os.cpu_count()} CPU(s)\n")
+    print(f"{'read':>16} | {'time (s)':>8} | {'speedup':>7}")
+    print("-" * 38)
+    for label, elapsed, _ in runs:
+        print(f"{label:>16} | {elapsed:8.2f} | {legacy_time / elapsed:6.1f}x")
+    shutil.rmtree(root.parent)
+    cache.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()
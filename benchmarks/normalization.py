@@ -0,0 +1,129 @@
+"""
+Text normalization of synthetic artist names and album titles: the previous
+per-call re.sub implementations (CollectionMatcher._normalize_text and the
+normalize_title copies in Search and Download) vs. deemon.utils.normalize,
+called per title with an empty cache and through the batch API.
+
+Results are compared so the benchmark also checks the output is unchanged.
+
+    python benchmarks/normalization.py [--titles N] [--distinct N]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.utils import normalize
+
+WORDS = ["Love", "Night", "City", "Fire", "Dreams", "Heart", "Blue", "Road", "Light", "Summer", "Stone",
+         "Glass", "Wave", "Ghost", "River", "Echoes", "Gold", "Static", "Wild", "Silence", "Beyoncé",
+         "Motörhead", "Café", "Don't", "Rock'n'Roll", "Mötley", "Sigur", "Rós", "Björk", "Señor"]
+SUFFIXES = ["", "", "", "", " (Remastered)", " - Remastered 2011", " [Deluxe Edition]", " (Deluxe)",
+            " (Expanded Edition)", " - Bonus Track Version", " [Explicit]", " (2019)", " - 2009 Remaster",
+            " (20th Anniversary Edition)", " [Reissue]", " Live", " Vol. 2", " + Demos", "...",
+            " (Full Dynamic Range Edition)", " - Single", " EP"]
+LEGACY_SUFFIXES = [
+    r'\s*-\s*remastered.*', r'\s*\(remastered.*\)', r'\s*\[remastered.*\]',
+    r'\s*-\s*deluxe.*', r'\s*\(deluxe.*\)', r'\s*\[deluxe.*\]',
+    r'\s*-\s*expanded.*', r'\s*\(expanded.*\)', r'\s*\[expanded.*\]',
+    r'\s*-\s*bonus.*', r'\s*\(bonus.*\)', r'\s*\[bonus.*\]',
+    r'\s*\[explicit\]', r'\s*\(explicit\)',
+    r'\s*\(\d{4}\)', r'\s*\[\d{4}\]', r'\s*-\s*\d{4}.*', r'\s*\(\d{4}.*\)', r'\s*\[\d{4}.*\]',
+    r'\s*-\s*reissue.*', r'\s*\(reissue.*\)', r'\s*\[reissue.*\]',
+    r'\s*-\s*anniversary.*', r'\s*\(anniversary.*\)', r'\s*\[anniversary.*\]',
+    r'\s*-\s*edition.*', r'\s*\(edition.*\)', r'\s*\[edition.*\]',
+]
+
+
+def legacy_name_key(text: str) -> str:
+    """ Previous CollectionMatcher._normalize_text """
+    if not text:
+        return ""
+    text = text.lower()
+    text = ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+    text = re.sub(r'\s*[\(\[\{]([^\)\]\}]*)[\)\]\}]\s*', ' ', text)
+    text = re.sub(r'\s*\+.*$', '', text)
+    text = re.sub(r'\.{2,}$', '', text)
+    text = re.sub(r'\.$', '', text)
+    text = re.sub(r'^(the|a|an)\s+', '', text)
+    text = re.sub(r"'s?\b", '', text)
+    text = re.sub(r'[^\w\s]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    edition_keywords = [
+        'remaster', 'remastered', 'edition', 'deluxe', 'bonus', 'expanded',
+        'anniversary', 'reissue', 'special', 'limited', 'collectors', 'collector',
+        'extended', 'version', 'vol', 'volume', 'disc', 'cd', 'lp', 'ep',
+        'digital', 'vinyl', 'anniversary', 'explicit', 'clean', 'instrumental',
+        'live', 'acoustic', 'unplugged', 'demo', 'bootleg', 'rerecorded',
+        'redux', 'revisited', 'enhanced', 'super', 'ultimate', 'definitive',
+        'complete', 'compiled', 'best', 'greatest', 'hits', 'full', 'dynamic',
+        'range', 'hd', 'hq', 'hi res', 'highres', 'flac', 'wav', 'mp3'
+    ]
+    pattern = r'\s+(' + '|'.join(edition_keywords) + r')\b.*$'
+    text = re.sub(pattern, '', text, flags=re.IGNORECASE)
+    text = re.sub(r'\s+\d{4}\s*$', '', text)
+    return text.strip()
+
+
+def legacy_strip_edition_key(title: str) -> str:
+    """ Previous Search.normalize_title / normalize_title in Download.download """
+    title = title.lower().strip()
+    for suffix in LEGACY_SUFFIXES:
+        title = re.sub(suffix, '', title, flags=re.IGNORECASE)
+    return title.strip()
+
+
+def make_titles(count: int, distinct: int) -> list:
+    rng = random.Random(0)
+    pool = [f"{rng.choice(['', '', 'The ', 'A '])}{' '.join(rng.sample(WORDS, rng.randint(1, 4)))}"
+            f"{rng.choice(SUFFIXES)}" for _ in range(distinct)]
+    return [rng.choice(pool) for _ in range(count)]
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    parser.add_argument("--distinct", type=int, default=100_000, help="distinct titles among them")
+    args = parser.parse_args()
+
+    titles = make_titles(args.titles, args.distinct)
+    rows = []
+    normalizers = [
+        ("name_key", legacy_name_key, normalize.name_key, normalize.name_keys),
+        ("strip_edition_key", legacy_strip_edition_key, normalize.strip_edition_key, normalize.strip_edition_keys),
+    ]
+    for label, legacy, key, keys in normalizers:
+        legacy_time, expected = timed(lambda: [legacy(title) for title in titles])
+        key.cache_clear()
+        call_time, per_call = timed(lambda: [key(title) for title in titles])
+        key.cache_clear()
+        batch_time, batch = timed(lambda: keys(titles))
+        if per_call != expected or batch != expected:
+            print(f"MISMATCH: {label} differs from the previous implementation")
+            sys.exit(1)
+        rows += [(f"{label} legacy", legacy_time, legacy_time), (f"{label} per call", call_time, legacy_time),
+                 (f"{label} batch", batch_time, legacy_time)]
+
+    print(f"{args.titles:,} titles, {len(set(titles)):,} distinct\n")
+    print(f"{'normalizer':>26} | {'time (s)':>8} | {'titles/s':>11} | {'speedup':>7}")
+    print("-" * 64)
+    for label, elapsed, baseline in rows:
+        print(f"{label:>26} | {elapsed:8.2f} | {args.titles / elapsed:11,.0f} | {baseline / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
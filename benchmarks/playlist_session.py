@@ -0,0 +1,72 @@
+"""
+Per-playlist latency: fresh Deezer() client per call vs. the pooled PlatformAPI session
+
+Requires network access to api.deezer.com.
+
+    python benchmarks/playlist_session.py [PLAYLIST_ID ...] [--rounds N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deezer import Deezer
+
+from deemon.core.config import Config as config
+
+# Deezer editorial chart playlists (public)
+DEFAULT_PLAYLISTS = [3155776842, 1109890291, 1313621735, 1111141961, 1116189381]
+
+
+def legacy_get_playlist_tracks(query: dict):
+    """ Previous behaviour: a new client (and TLS session) for every call """
+    return Deezer().api.get_playlist_tracks(query['id'])
+
+
+def measure(func, playlists: list, rounds: int) -> list:
+    timings = []
+    for _ in range(rounds):
+        for playlist_id in playlists:
+            start = time.perf_counter()
+            func({'id': playlist_id, 'title': str(playlist_id)})
+            timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(label: str, timings: list):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{label:>8} | {statistics.mean(timings) * 1000:9.1f} | "
+          f"{statistics.median(timings) * 1000:9.1f} | {p95 * 1000:9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("playlists", nargs="*", type=int, default=DEFAULT_PLAYLISTS)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    config()
+    config.set('check_account_status', False)
+
+    from deemon.core.api import PlatformAPI
+    platform_api = PlatformAPI()
+
+    # Warm up DNS and the pooled connection so neither run pays for it
+    platform_api.get_playlist_tracks({'id': args.playlists[0], 'title': ""})
+
+    print(f"{len(args.playlists)} playlist(s) x {args.rounds} round(s)\n")
+    print(f"{'client':>8} | {'mean (ms)':>9} | {'p50 (ms)':>9} | {'p95 (ms)':>9}")
+    print("-" * 45)
+    report("fresh", measure(legacy_get_playlist_tracks, args.playlists, args.rounds))
+    report("pooled", measure(platform_api.get_playlist_tracks, args.playlists, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
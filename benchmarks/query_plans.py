@@ -0,0 +1,138 @@
+"""
+Query plan regression check for Database.
+
+Runs the lookups made during refresh, monitor, show, rollback and download
+against a fresh database, captures the SQL they execute and fails if
+EXPLAIN QUERY PLAN reports a full table scan for any of them, or if a lookup
+by artist, album, playlist, ... only narrows the rows down by profile.
+
+    python benchmarks/query_plans.py [-v]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.core.config import Config as config
+
+# Key/value tables that only ever hold a handful of rows
+SMALL_TABLES = {'deemon', 'profiles', 'sqlite_sequence'}
+
+STATEMENTS = ("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")
+
+
+def full_scan(plan: list):
+    # "SCAN (subquery-N)" reads a derived result rather than a table
+    if any(step.startswith("SCAN ") and not step.split()[1].startswith("(") and step.split()[1] not in SMALL_TABLES
+           for step in plan):
+        return "FULL SCAN"
+
+
+def profile_scan(plan: list):
+    # Most databases have a single profile, so this reads every row of the table
+    if any(step.startswith("SEARCH ") and step.endswith(" (profile_id=?)") for step in plan):
+        return "PROFILE SCAN"
+
+
+def profile_queries(database):
+    """ Database methods that read every row of the profile, searching by profile_id alone is expected """
+    database.get_all_monitored_artists()
+    database.get_all_monitored_artist_ids()
+    database.get_monitored()
+    database.get_all_monitored_playlist_ids()
+    database.get_all_monitored_playlists()
+    database.get_seen_releases()
+    database.get_stats()
+    list(database.iter_seen_releases_by_artist())
+    database.get_future_releases()
+    # Latest transactions of the profile, read backwards from the end of the index
+    database.get_transactions()
+    database.rollback_last_refresh(1)
+
+
+def hot_queries(database):
+    """ Database methods that look rows up by a key other than the profile """
+    now = int(time.time())
+    database.get_monitored_artist_by_id(1)
+    database.get_monitored_artist_by_name("artist")
+    database.get_unrefreshed_artists()
+    database.get_monitored_playlist_by_id(1)
+    database.get_monitored_playlist_by_name("playlist")
+    database.get_unrefreshed_playlists()
+    database.get_playlist_tracks(1)
+    database.get_track_from_playlist(1, 1)
+    database.get_artist_releases(1)
+    database.get_seen_releases(1)
+    database.get_releases_by_album_ids([1, 2, 3])
+    database.get_album_by_id(1)
+    database.show_new_releases(now - 86400, now)
+    database.reset_future(1)
+    database.set_artist_refreshed(1)
+    database.set_playlist_refreshed(1)
+    database.set_all_artists_refreshed()
+    database.set_all_playlists_refreshed()
+    database.set_artist_watermarks([{'artist_id': 1, 'total': 1, 'hash': "", 'last_full': None}])
+    database.update_artist({'artist_id': 1, 'bitrate': "320", 'alerts': 0, 'record_type': "all",
+                            'download_path': "", 'profile_id': 1})
+    database.add_extra_release_info([{'id': 1, 'label': "label"}])
+    database.remove_specific_releases({'tm_day': 737425})
+    database.rollback_refresh(1)
+    database.remove_by_id([(1,)])
+    database.remove_by_name([("artist",)])
+    database.remove_monitored_artist(1)
+    database.remove_monitored_playlists(1)
+    database.get_pending_queue()
+    database.get_failed_queue()
+    database.set_queue_status(1, "done")
+    database.purge_finished_queue()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-v", "--verbose", action="store_true", help="print the plan of every query")
+    args = parser.parse_args()
+
+    config()
+    config.set('check_account_status', False)
+    config.set('profile_id', 1, validate=False)
+    config.set('tid', 1, validate=False)
+
+    from deemon.core import db
+    database = db.Database()
+
+    failures = 0
+    checked = set()
+    for queries, keyed in ((profile_queries, False), (hot_queries, True)):
+        statements = []
+        database.conn.set_trace_callback(statements.append)
+        queries(database)
+        database.conn.set_trace_callback(None)
+
+        for sql in statements:
+            sql = sql.strip()
+            if not sql.upper().startswith(STATEMENTS) or sql in checked:
+                continue
+            checked.add(sql)
+            plan = [row[3] for row in database.query_raw(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+            problem = full_scan(plan) or (keyed and profile_scan(plan))
+            if problem:
+                failures += 1
+                print(f"{problem}: {sql}")
+                for step in plan:
+                    print(f"    {step}")
+            elif args.verbose:
+                print(f"ok: {sql}")
+                for step in plan:
+                    print(f"    {step}")
+    database.close()
+
+    print(f"\n{len(checked)} queries checked, {failures} full table or profile scan(s)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
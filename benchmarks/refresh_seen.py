@@ -0,0 +1,65 @@
+"""
+Refresh CPU time against library size: list scan vs. SeenReleases index
+
+    python benchmarks/refresh_seen.py
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.core.seen import SeenReleases
+
+ARTISTS = 500
+RELEASES_PER_ARTIST = 40
+LIBRARY_SIZES = [10_000, 50_000, 100_000, 400_000]
+LEGACY_MAX_SIZE = 50_000
+
+
+def legacy_remove_existing(payload, seen):
+    seen_releases = [v for x in seen for k, v in x.items() if not x.get('future_release', 0)]
+    return [x for x in payload['releases'] if type(x) == dict for k, v in x.items()
+            if k == "id" and v not in seen_releases]
+
+
+def make_library(size):
+    rows = [{'album_id': i, 'future_release': 1 if i % 50 == 0 else 0} for i in range(size)]
+    payloads = []
+    for _ in range(ARTISTS):
+        releases = [{'id': random.randrange(size * 2), 'title': "x"} for _ in range(RELEASES_PER_ARTIST)]
+        payloads.append({'artist_id': 1, 'releases': releases})
+    return rows, payloads
+
+
+def run_legacy(rows, payloads):
+    start = time.process_time()
+    for payload in payloads:
+        legacy_remove_existing(payload, rows)
+    return time.process_time() - start
+
+
+def run_index(rows, payloads):
+    start = time.process_time()
+    seen = SeenReleases(rows)
+    for payload in payloads:
+        seen.unseen(payload['releases'])
+    return time.process_time() - start
+
+
+def main():
+    print(f"{ARTISTS} artists x {RELEASES_PER_ARTIST} releases per refresh\n")
+    print(f"{'library size':>12} | {'legacy (s)':>10} | {'index (s)':>10}")
+    print("-" * 38)
+    for size in LIBRARY_SIZES:
+        rows, payloads = make_library(size)
+        legacy = f"{run_legacy(rows, payloads):10.3f}" if size <= LEGACY_MAX_SIZE else f"{'skipped':>10}"
+        print(f"{size:>12,} | {legacy} | {run_index(rows, payloads):10.3f}")
+
+
+if __name__ == "__main__":
+    main()
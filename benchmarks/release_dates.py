@@ -0,0 +1,90 @@
+"""
+Release date filtering of synthetic releases: the previous per-release
+strptime/datetime.now() checks vs. cached day numbers compared against
+cutoffs computed once per refresh.
+
+Results of both are compared so the benchmark also checks that the future
+and too-old decisions are unchanged.
+
+    python benchmarks/release_dates.py [--releases N] [--max-age DAYS] [--rounds N]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.utils import dates
+
+
+def legacy_filter(releases: list, refresh_date: datetime, max_age: int) -> list:
+    """ Previous Refresh.is_future_release and Refresh.release_too_old """
+    result = []
+    for release in releases:
+        future = 1 if dates.str_to_datetime_obj(release) > datetime.now() else 0
+        too_old = dates.str_to_datetime_obj(release) < (refresh_date - timedelta(max_age))
+        result.append((future, bool(too_old)))
+    return result
+
+
+def day_filter(releases: list, refresh_date: datetime, max_age: int) -> list:
+    today = dates.day_of(refresh_date)
+    max_age_day = dates.day_of(refresh_date - timedelta(max_age))
+    result = []
+    for release in releases:
+        day = dates.release_day(release)
+        result.append((1 if day > today else 0, day <= max_age_day))
+    return result
+
+
+def make_releases(count: int) -> list:
+    rng = random.Random(0)
+    today = date.today()
+    releases = [(today + timedelta(days=rng.randint(-3650, 30))).isoformat() for _ in range(count)]
+    releases[::1000] = ["0000-00-00"] * len(releases[::1000])
+    return releases
+
+
+def timed(func, rounds: int):
+    best, result = None, None
+    for _ in range(rounds):
+        dates.release_day.cache_clear()
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--releases", type=int, default=500_000)
+    parser.add_argument("--max-age", type=int, default=90)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    releases = make_releases(args.releases)
+    refresh_date = datetime.now()
+
+    legacy_time, legacy = timed(lambda: legacy_filter(releases, refresh_date, args.max_age), args.rounds)
+    day_time, days = timed(lambda: day_filter(releases, refresh_date, args.max_age), args.rounds)
+
+    if legacy != days:
+        print("MISMATCH: day number filtering differs from the previous implementation")
+        sys.exit(1)
+
+    print(f"{args.releases:,} releases, release_max_age {args.max_age} day(s)\n")
+    print(f"{'filter':>8} | {'time (ms)':>9} | {'releases/s':>12} | {'speedup':>7}")
+    print("-" * 46)
+    for label, elapsed in (("legacy", legacy_time), ("day", day_time)):
+        print(f"{label:>8} | {elapsed * 1000:9.1f} | {args.releases / elapsed:12,.0f} | {legacy_time / elapsed:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Finding the audio files of a synthetic artist/album library: the previous
+sequential Path.glob("**/*.mp3") vs. scanner.scan with parallel workers.
+
+Local disks answer directory listings from the page cache, so --latency
+adds a delay to every os.scandir call to approximate a network mount
+(NFS/SMB), which is where the parallel scan pays off. The file sets found
+are compared so the benchmark also checks both agree.
+
+    python benchmarks/scanner.py [--albums N] [--latency MS] [--workers N ...]
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("XDG_CONFIG_HOME", tempfile.mkdtemp())
+
+from deemon.utils import scanner
+
+ALBUMS_PER_ARTIST = 6
+TRACKS_PER_ALBUM = 10
+
+
+def make_library(root: Path, albums: int, rng: random.Random):
+    for i in range(albums // ALBUMS_PER_ARTIST):
+        for j in range(ALBUMS_PER_ARTIST):
+            album_dir = root / f"Artist {i}" / f"{1970 + rng.randrange(50)} - Album {j}"
+            album_dir.mkdir(parents=True)
+            for track in range(1, TRACKS_PER_ALBUM + 1):
+                (album_dir / f"{track:02d} - Track {track}.mp3").touch()
+            (album_dir / "cover.jpg").touch()
+
+
+def add_latency(seconds: float):
+    """ Delay every directory listing, glob and scanner both go through os.scandir """
+    scandir = os.scandir
+
+    def slow_scandir(path="."):
+        time.sleep(seconds)
+        return scandir(path)
+
+    os.scandir = slow_scandir
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--albums", type=int, default=3_000)
+    parser.add_argument("--latency", type=float, default=2.0, help="milliseconds added to each directory listing")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, scanner.DEFAULT_WORKERS])
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp()) / "library"
+    print(f"Generating {args.albums:,} albums...")
+    make_library(root, args.albums, random.Random(0))
+    if args.latency:
+        add_latency(args.latency / 1000)
+
+    glob_time, expected = timed(lambda: sorted(root.glob("**/*.mp3")))
+    runs = [("glob", glob_time)]
+    for workers in args.workers:
+        elapsed, files = timed(lambda: sorted(Path(entry.path) for entry in
+                                              scanner.scan(root, extensions={'.mp3'}, workers=workers)))
+        if files != expected:
+            print(f"MISMATCH: scanner with {workers} worker(s) found different files than glob")
+            sys.exit(1)
+        runs.append((f"{workers} workers", elapsed))
+
+    print(f"\n{len(expected):,} files, {args.latency:g} ms per directory listing\n")
+    print(f"{'scan':>11} | {'time (ms)':>9} | {'speedup':>7}")
+    print("-" * 35)
+    for label, elapsed in runs:
+        print(f"{label:>11} | {elapsed * 1000:9.1f} | {glob_time / elapsed:6.1f}x")
+    shutil.rmtree(root.parent)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+CLI cold-start time. Each command runs in a fresh interpreter with
+`python -X importtime` against a temporary appdata directory; the wall time
+and the slowest top-level imports are reported.
+
+    python benchmarks/startup.py [--runs N] [--top N] [-- COMMAND ...]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+COMMANDS = [
+    ["--help"],
+    ["show", "artists"],
+    ["show", "releases"],
+    ["refresh", "--help"],
+    ["download", "--help"],
+]
+
+
+def run(command: list, env: dict):
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "deemon"] + command, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    elapsed = time.perf_counter() - start
+    if result.returncode:
+        print(f"deemon {' '.join(command)} exited with {result.returncode}")
+    return elapsed, result.stderr
+
+
+def top_imports(importtime: str, count: int) -> list:
+    """ Slowest imports (cumulative microseconds) directly below deemon.cli or __main__ """
+    imports = []
+    for line in importtime.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Depth is the indentation of the module name, 1 space for top-level imports
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 1:
+            imports.append((int(cumulative), name.strip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="number of slowest imports to list per command")
+    parser.add_argument("command", nargs="*", help="deemon arguments to time instead of the defaults")
+    args = parser.parse_args()
+
+    env = dict(os.environ, XDG_CONFIG_HOME=tempfile.mkdtemp(), PYTHONPATH=str(ROOT))
+    # First run creates the config and database
+    run(["--help"], env)
+
+    for command in ([args.command] if args.command else COMMANDS):
+        timings, importtime = [], ""
+        for _ in range(args.runs):
+            elapsed, importtime = run(command, env)
+            timings.append(elapsed)
+        print(f"deemon {' '.join(command)}: {statistics.median(timings) * 1000:.0f} ms "
+              f"(median of {args.runs})")
+        for cumulative, name in top_imports(importtime, args.top):
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,7 @@
 from deemon.utils import startup
 
 __version__ = '3.0'
-__dbversion__ = '3.7'
+__dbversion__ = '3.12'
 
 appdata = startup.get_appdata_dir()
 startup.init_appdata_dir(appdata)
@@ -5,21 +5,11 @@ import time
 from pathlib import Path
 
 import click
-import inquirer
 from packaging.version import parse as parse_version
-import requests
 
 from os import system
 
 from deemon import __version__
-from deemon.cmd import download, rollback, backup, extra, tests, upgradelib
-from deemon.cmd.artistconfig import artist_lookup
-from deemon.cmd.monitor import Monitor
-from deemon.cmd.profile import ProfileConfig
-from deemon.cmd.refresh import Refresh
-from deemon.cmd.search import Search
-from deemon.cmd.show import Show
-from deemon.core import notifier
 from deemon.core.config import Config, LoadProfile
 from deemon.core.db import Database
 from deemon.core.logger import setup_logger
@@ -40,6 +30,8 @@ def clear_screen():
 
 def interactive_menu():
     """Interactive menu for deemon"""
+    from deemon.cmd.search import Search
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -164,6 +156,8 @@ def config_sub_menu():
 
 def monitor_menu():
     """Monitor artists menu"""
+    from deemon.cmd.monitor import Monitor
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -264,6 +258,8 @@ def monitor_menu():
 
 def playlist_menu():
     """Playlist download menu"""
+    from deemon.cmd import download
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -306,6 +302,8 @@ def playlist_menu():
 
 def file_menu():
     """File import menu"""
+    from deemon.cmd import download
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -356,6 +354,8 @@ def file_menu():
 
 def id_menu():
     """ID download menu"""
+    from deemon.cmd import download
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -412,6 +412,8 @@ def id_menu():
 
 def download_menu():
     """Download menu"""
+    from deemon.cmd import download
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -473,6 +475,7 @@ def download_menu():
 
 def download_artist_album_menu():
     """Download Artist - Album menu with search results"""
+    from deemon.cmd import download
     from deemon.core import api
     from deemon.cmd.search import Search
     COLOR_RESET = "\033[0m"
@@ -551,6 +554,7 @@ def download_artist_album_menu():
 
 def download_artist_menu():
     """Download Artist menu with search results"""
+    from deemon.cmd import download
     from deemon.core import api
     from deemon.cmd.search import Search
     COLOR_RESET = "\033[0m"
@@ -637,6 +641,8 @@ def download_artist_menu():
 
 def refresh_menu():
     """Refresh menu"""
+    from deemon.cmd.refresh import Refresh
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -701,6 +707,8 @@ def refresh_menu():
 
 def show_monitored_menu():
     """Show monitored menu"""
+    from deemon.cmd.show import Show
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -833,6 +841,8 @@ def show_monitored_menu():
 
 def artist_menu(show, artist_item):
     """Menu for a single monitored artist"""
+    from deemon.cmd.artistconfig import artist_lookup
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -1229,6 +1239,8 @@ def show_monitoring_styled(show_instance, artist: bool = True, query: str = None
 
 def show_releases_menu():
     """Show releases menu"""
+    from deemon.cmd.show import Show
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -1273,6 +1285,8 @@ def show_releases_menu():
 
 def config_menu():
     """Configuration menu"""
+    from deemon.cmd.artistconfig import artist_lookup
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -1315,6 +1329,8 @@ def config_menu():
 
 def backup_menu():
     """Backup menu"""
+    from deemon.cmd import backup
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -1364,6 +1380,8 @@ def backup_menu():
 
 def profile_menu():
     """Profile menu"""
+    from deemon.cmd.profile import ProfileConfig
+
     COLOR_RESET = "\033[0m"
     COLOR_BOLD = "\033[1m"
     COLOR_CYAN = "\033[36m"
@@ -1442,8 +1460,9 @@ CONTEXT_SETTINGS = dict(help_option_names=['-h', '--help'])
 @click.option('-P', '--profile', help="Specify profile to run deemon as")
 @click.version_option(__version__, '-V', '--version', message='deemon %(version)s')
 @click.option('-v', '--verbose', is_flag=True, help="Show debug output")
+@click.option('--no-cache', is_flag=True, help="Bypass the API response cache")
 @click.pass_context
-def run(ctx, whats_new, init, arl, verbose, profile):
+def run(ctx, whats_new, init, arl, verbose, profile, no_cache):
     """Monitoring and alerting tool for new music releases using the Deezer API.
 
     deemon is a free and open source tool. To report issues or to contribute,
@@ -1474,6 +1493,7 @@ def run(ctx, whats_new, init, arl, verbose, profile):
     db.do_upgrade()
     tid = db.get_next_transaction_id()
     config.set('tid', tid, validate=False)
+    config.set('no_cache', no_cache, validate=False)
     
     if arl:
         if config.set("arl", arl):
@@ -1503,15 +1523,13 @@ def run(ctx, whats_new, init, arl, verbose, profile):
             logger.debug(f"Release channel changed to '{config.release_channel()}'")
             db.set_release_channel()
             last_checked = 0
-        if time.time() >= next_check or last_checked == 0:
-            logger.info(f"Checking for updates ({config.release_channel()})...")
-            config.set('update_available', 0, False)
-            latest_ver = str(startup.get_latest_version(config.release_channel()))
-            if latest_ver:
-                db.set_latest_version(latest_ver)
-            db.set_last_update_check()
+        if config.check_update() and (time.time() >= next_check or last_checked == 0):
+            logger.debug(f"Checking for updates ({config.release_channel()}) in the background")
+            update_check = startup.UpdateCheck(config.release_channel())
+            update_check.start()
+            ctx.call_on_close(lambda: save_update_check(update_check))
         new_version = db.get_latest_ver()
-        if parse_version(new_version) > parse_version(__version__):
+        if new_version and parse_version(new_version) > parse_version(__version__):
             if parse_version(new_version).major > parse_version(__version__).major:
                 config.set('update_available', new_version, False)
                 print("*" * 80)
@@ -1536,11 +1554,28 @@ def run(ctx, whats_new, init, arl, verbose, profile):
         interactive_menu()
 
 
+def save_update_check(update_check):
+    """
+    Store the result of the background update check, it is shown on the next
+    run. A check that is still running is abandoned rather than waited on and
+    last_update_check is left unchanged so the next run checks again.
+    """
+    if update_check.is_alive():
+        logger.debug("Update check has not finished, it will be retried on the next run")
+        return
+    if update_check.latest_ver:
+        db.set_latest_version(str(update_check.latest_ver))
+    db.set_last_update_check()
+
+
 @run.command(name='test')
 @click.option('-e', '--email', is_flag=True, help="Send test notification to configured email")
 @click.option('-E', '--exclusions', metavar="URL", type=str, help="Test exclude regex pattern against URL")
 def test(email, exclusions):
     """Run tests on email configuration, exclusion filters, etc."""
+    from deemon.cmd import tests
+    from deemon.core import notifier
+
     if email:
         notification = notifier.Notify()
         notification.test()
@@ -1564,6 +1599,8 @@ def global_command(url, bitrate, download_path):
         global https://open.spotify.com/track/xyz
         global "https://deezer.com/artist/456 -b 9"
     """
+    from deemon.cmd import download
+
     if bitrate:
         config.set('bitrate', bitrate)
     if download_path:
@@ -1602,10 +1639,11 @@ def global_command(url, bitrate, download_path):
 @click.option('-c', '--collection-matcher', is_flag=True, help='Use collection matcher for playlists (skip existing tracks)')
 @click.option('--band', metavar='BAND', type=str, help='Band/Artist name (for use with --album)')
 @click.option('--album', metavar='ALBUM', type=str, help='Album name (for use with --band)')
+@click.option('--resume', is_flag=True, help='Also download releases left in the queue by interrupted runs')
 def download_command(artist, artist_id, album_id, url, file, bitrate,
                      record_type, download_path, from_date, to_date,
                      monitored, track_id, track_file, artist_file,
-                     album_file, collection_matcher, band, album):
+                     album_file, collection_matcher, band, album, resume):
     """
     Download specific artist, album ID or by URL
 
@@ -1615,6 +1653,7 @@ def download_command(artist, artist_id, album_id, url, file, bitrate,
         download -i 100 -t album -b 9
         download --band "Slayer" --album "South of Heaven"
     """
+    from deemon.cmd import download
 
     if bitrate:
         config.set('bitrate', bitrate)
@@ -1653,6 +1692,7 @@ def download_command(artist, artist_id, album_id, url, file, bitrate,
             return logger.error(f"Invalid download path: {download_path}")
 
     dl = download.Download()
+    dl.resume = resume
     dl.set_dates(from_date, to_date)
     dl.download(artists, artist_ids, album_ids, urls, artist_file, track_file, album_file, track_ids, monitored=monitored)
 
@@ -1683,6 +1723,8 @@ def monitor_command(artist, im, playlist, include_artists, bitrate, record_type,
         monitor --artist-id 100
         monitor --url https://www.deezer.com/us/artist/000
     """
+    from deemon.cmd.monitor import Monitor
+
     monitor = Monitor()
     if download_path:
         if not Path(download_path).exists():
@@ -1748,6 +1790,8 @@ def playlist_command(url, collection_matcher):
         playlist https://www.deezer.com/playlist/123456
         playlist -c https://www.deezer.com/playlist/123456
     """
+    from deemon.cmd import download
+
     dl = download.Download()
     dl.download_playlist(url, use_collection_matcher=collection_matcher)
 
@@ -1757,8 +1801,10 @@ def playlist_command(url, collection_matcher):
 @click.option('-p', '--playlist', is_flag=True, help="Refresh a specific playlist by name")
 @click.option('-s', '--skip-download', is_flag=True, help="Skips downloading of new releases")
 @click.option('-T', '--time-machine', metavar='DATE', type=str, help='Refresh as if it were this date (YYYY-MM-DD)')
-def refresh_command(name, playlist, skip_download, time_machine):
+@click.option('--resume', is_flag=True, help='Also download releases left in the queue by interrupted runs')
+def refresh_command(name, playlist, skip_download, time_machine, resume):
     """Check artists for new releases"""
+    from deemon.cmd.refresh import Refresh
 
     if time_machine:
         time_machine = validate.validate_date(time_machine)
@@ -1766,7 +1812,7 @@ def refresh_command(name, playlist, skip_download, time_machine):
             return logger.error("Date for time machine is invalid")
 
     logger.info(":: Starting database refresh")
-    refresh = Refresh(time_machine, skip_download)
+    refresh = Refresh(time_machine, skip_download, resume=resume)
     if playlist:
         if not len(name):
             return logger.warning("You must provide the name of a playlist")
@@ -1793,6 +1839,8 @@ def show_command():
 @click.option('-b', '--backup', type=Path, help='Backup artist IDs to CSV, same as -cHf id -e ...')
 def show_artists(artist, csv, export, filter, hide_header, backup):
     """Show artist info monitored by profile"""
+    from deemon.cmd.show import Show
+
     if artist:
         artist = ' '.join([x for x in artist])
 
@@ -1809,6 +1857,8 @@ def show_artists(artist, csv, export, filter, hide_header, backup):
 @click.option('-i', '--playlist-id', is_flag=True, help='Show playlist info by playlist ID')
 def show_artists(title, playlist_id, csv, filter, hide_header):
     """Show playlist info monitored by profile"""
+    from deemon.cmd.show import Show
+
     if title:
         title = ' '.join([x for x in title])
 
@@ -1823,6 +1873,8 @@ def show_releases(n, future):
     """
     Show list of new or future releases
     """
+    from deemon.cmd.show import Show
+
     show = Show()
     show.releases(n, future)
 
@@ -1835,6 +1887,7 @@ run.add_command(show_command)
 @click.option('-r', '--restore', is_flag=True, help='Restore from existing backup')
 def backup_command(restore, include_logs):
     """Backup configuration and database to a tar file"""
+    from deemon.cmd import backup
 
     if restore:
         backup.restore()
@@ -1916,6 +1969,7 @@ def reset_db():
 @click.option('-e', '--edit', is_flag=True, help="Edit an existing profile")
 def profile_command(profile, add, clear, delete, edit):
     """Add, modify and delete configuration profiles"""
+    from deemon.cmd.profile import ProfileConfig
 
     pc = ProfileConfig(profile)
     if profile:
@@ -1936,6 +1990,8 @@ def profile_command(profile, add, clear, delete, edit):
 @run.command(name="extra")
 def extra_command():
     """Fetch extra release info"""
+    from deemon.cmd import extra
+
     extra.main()
 
 
@@ -1943,6 +1999,8 @@ def extra_command():
 @click.argument('query', nargs=-1, required=False)
 def search(query):
     """Interactively search and download/monitor artists"""
+    from deemon.cmd.search import Search
+
     if query:
         query = ' '.join(query)
 
@@ -2020,6 +2078,8 @@ def cheatsheet_command():
 @click.argument('artist', nargs=-1, required=True)
 def config_command(artist):
     """Configure per-artist settings by name or ID"""
+    from deemon.cmd.artistconfig import artist_lookup
+
     artist = ' '.join([x for x in artist])
     artist_lookup(artist)
 
@@ -2029,6 +2089,8 @@ def config_command(artist):
 @click.option('-v', '--view', is_flag=True, help="View recent refresh transactions")
 def rollback_command(num, view):
     """Rollback a previous monitor or refresh transaction"""
+    from deemon.cmd import rollback
+
     if view:
         rollback.view_transactions()
     elif num:
@@ -2041,6 +2103,9 @@ def rollback_command(num, view):
 @click.option('--include-singles', is_flag=True, help='Include singles in discography')
 @click.option('--print-only', is_flag=True, help='Print album URLs instead of queueing downloads')
 def discography_command(band, album, include_singles, print_only):
+    import requests
+    from deemon.cmd import download
+
     if not band or not album:
         if sys.stdin.isatty():
             user_input = input("Enter band and album (Band Name - Album Name): ").strip()
@@ -2142,11 +2207,15 @@ def library_command():
 @click.option('-A', '--album-only', is_flag=True, help="Get album IDs instead of track IDs (Fastest)")
 @click.option('-E', '--allow-exclusions', is_flag=True, help="Allow exclusions to be applied")
 @click.option('-O', '--output', metavar='PATH', help="Output file to save IDs (default: current directory)")
-def library_upgrade_command(library, output, album_only, allow_exclusions):
+@click.option('-p', '--processes', type=click.IntRange(min=0), default=0, metavar='N',
+              help="Read metadata with N worker processes instead of threads (large libraries)")
+def library_upgrade_command(library, output, album_only, allow_exclusions, processes):
     """ (BETA) Scans MP3 files in PATH and generates a text file containing album/track IDs """
+    from deemon.cmd import upgradelib
+
     if not output:
         output = Path.cwd()
-    upgradelib.upgrade(library, output, album_only, allow_exclusions)
+    upgradelib.upgrade(library, output, album_only, allow_exclusions, processes)
 
 
 run.add_command(library_command)
@@ -4,7 +4,6 @@ from deemon.core.config import Config as config
 from deemon.core.db import Database
 
 logger = logging.getLogger(__name__)
-db = Database()
 
 
 def print_header(message: str = None):
@@ -20,7 +19,7 @@ def print_header(message: str = None):
         print("")
 
 
-def get_artist(query: str):
+def get_artist(query: str, db: Database):
     artist_as_id = False
     artist_fromdb = None
 
@@ -61,7 +60,8 @@ def get_artist(query: str):
 
 
 def artist_lookup(query):
-    result = get_artist(query)
+    db = Database()
+    result = get_artist(query, db)
     if not result:
         return
     print_header(f"Configuring '{result['artist_name']}' (Artist ID: {result['artist_id']})")
@@ -8,6 +8,7 @@ from packaging.version import parse as parse_version
 from tqdm import tqdm
 
 from deemon import __version__
+from deemon.core import db
 from deemon.utils import startup, dates
 
 logger = logging.getLogger(__name__)
@@ -25,6 +26,11 @@ def run(include_logs: bool = False):
     backup_tar = dates.generate_date_filename("backup-" + __version__ + "-") + ".tar"
     backup_path = startup.get_backup_dir()
 
+    # Pending WAL pages are not part of deemon.db until they are checkpointed
+    database = db.Database()
+    database.checkpoint()
+    database.close()
+
     with tarfile.open(backup_path / backup_tar, "w") as tar:
         tar.add(startup.get_appdata_dir(), arcname='deemon', filter=filter_func)
         logger.info(f"Backed up to {backup_path / backup_tar}")
@@ -76,6 +82,9 @@ def restore():
     def restore_tarfile(archive: dict):
         logger.debug("Restoring backup from `" + str(archive['filename'].name + "`"))
         extract_dir = startup.get_appdata_dir()
+        # A WAL left behind by the current database would be replayed onto the restored one
+        for suffix in ("-wal", "-shm"):
+            Path(str(startup.get_database()) + suffix).unlink(missing_ok=True)
         tar = tarfile.open(archive['filename'])
         progress = tqdm(tar.getmembers(), ascii=" #",
                         bar_format='{desc}  [{bar}] {percentage:3.0f}%')
@@ -1,9 +1,11 @@
 import logging
 import os
 import sys
+import threading
+import time
 
 import requests
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 from pathlib import Path
 from tqdm import tqdm
 
@@ -14,9 +16,9 @@ import plexapi.exceptions
 from plexapi.server import PlexServer
 
 from deemon import utils
-from deemon.core import dmi, db, api, common
+from deemon.core import dmi, db, api, common, ratelimit
 from deemon.core.config import Config as config
-from deemon.utils import ui, dataprocessor, startup, dates
+from deemon.utils import ui, dataprocessor, startup, dates, normalize
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +30,10 @@ COLOR_RESET = "\033[0m"
 COLOR_BOLD = "\033[1m"
 COLOR_DIM = "\033[2m"
 
+# Queue item fields stored in the queue table and exported to failed.csv
+QUEUE_CSV_FIELDS = ['artist_name', 'album_id', 'album_title', 'track_id', 'track_title', 'url',
+                    'playlist_title', 'bitrate', 'download_path', 'release_type']
+
 
 class QueueItem:
     # TODO - Accept new playlist tracks for output/alerts
@@ -44,7 +50,8 @@ class QueueItem:
         self.bitrate = bitrate or config.bitrate()
         self.download_path = download_path or config.download_path()
         self.release_type = None
-        
+        self.queue_id = None
+
         if release_full:
             self.artist_name = release_full['artist_name']
             self.album_id = release_full['id']
@@ -86,6 +93,15 @@ class QueueItem:
                 self.url = playlist.get("url", None)
             self.playlist_title = playlist["title"]
 
+    @classmethod
+    def from_row(cls, row: dict):
+        """ Rebuild a queue item stored in the queue table """
+        item = cls(bitrate=row['bitrate'], download_path=row['download_path'])
+        for key in QUEUE_CSV_FIELDS:
+            setattr(item, key, row[key])
+        item.queue_id = row['id']
+        return item
+
 
 def get_deemix_bitrate(bitrate: str):
     for bitrate_id, bitrate_name in config.allowed_values('bitrate').items():
@@ -133,12 +149,17 @@ class Download:
         self.dz = deezer.Deezer()
         self.di = dmi.DeemixInterface()
         self.queue_list = []
+        # Album IDs in queue_list, only changed together with it under queue_lock
+        self.queued = set()
+        self.queue_lock = threading.Lock()
         self.db = db.Database()
         self.bitrate = None
         self.release_from = None
         self.release_to = None
         self.verbose = os.environ.get("VERBOSE")
         self.duplicate_id_count = 0
+        # Also download items left in the queue table by interrupted runs
+        self.resume = False
 
     def set_dates(self, from_date: str = None, to_date: str = None) -> None:
         """Set to/from dates to get while downloading"""
@@ -380,22 +401,25 @@ class Download:
                 
                 filtered_albums = []
                 skipped_albums = []
+                to_check = []
                 
                 for album_id in album_ids:
                     try:
                         album_info = self.api.get_album(album_id)
-                        artist_name = album_info['artist']['name']
-                        album_name = album_info['title']
-                        
-                        if matcher.is_album_in_collection(artist_name, album_name):
-                            logger.info(f"Skipping (already in collection): {artist_name} - {album_name}")
-                            skipped_albums.append((artist_name, album_name))
-                        else:
-                            filtered_albums.append(album_id)
+                        to_check.append((album_id, album_info['artist']['name'], album_info['title']))
                     except Exception as e:
                         logger.debug(f"Error checking album {album_id}: {e}")
                         filtered_albums.append(album_id)
                 
+                # The whole playlist is matched in one batch
+                matches = matcher.match_albums([(artist_name, album_name) for _, artist_name, album_name in to_check])
+                for (album_id, artist_name, album_name), in_collection in zip(to_check, matches):
+                    if in_collection:
+                        logger.info(f"Skipping (already in collection): {artist_name} - {album_name}")
+                        skipped_albums.append((artist_name, album_name))
+                    else:
+                        filtered_albums.append(album_id)
+                
                 logger.info(f"Skipped {len(skipped_albums)} albums already in collection")
                 logger.info(f"Downloading {len(filtered_albums)} new albums")
                 album_ids = filtered_albums
@@ -422,98 +446,157 @@ class Download:
             return False
 
         if self.queue_list:
+            logger.debug(f"Adding {len(self.queue_list)} item(s) to the download queue")
+            self.db.add_to_queue([vars(q) for q in self.queue_list])
+            self.db.commit()
+
+        # Only this run's items unless resuming, the queue table may also hold
+        # items left over by interrupted runs of other commands
+        urls = {q.url for q in self.queue_list}
+        queue, left_over = [], 0
+        for row in self.db.get_pending_queue():
+            if row['url'] in urls or self.resume:
+                queue.append(QueueItem.from_row(row))
+            if row['url'] not in urls:
+                left_over += 1
+
+        if left_over and not self.resume:
+            logger.info(f"   [!] {left_over} release(s) from an interrupted run are still queued, "
+                        "use --resume to download them")
+
+        if queue:
             plex = get_plex_server()
             print("")
-            logger.info(f"{COLOR_CYAN}:: Sending {len(self.queue_list)} release(s) to deemix for download:{COLOR_RESET}")
-
-            with open(startup.get_appdata_dir() / "queue.csv", "w", encoding="utf-8") as f:
-                f.writelines(','.join([str(x) for x in vars(self.queue_list[0]).keys()]) + "\n")
-                logger.debug(f"Writing queue to CSV file - {len(self.queue_list)} items in queue")
-                for q in self.queue_list:
-                    raw_values = [str(x) for x in vars(q).values()]
-                    # TODO move this to shared function
-                    for i, v in enumerate(raw_values):
-                        if '"' in v:
-                            raw_values[i] = v.replace('"', "'")
-                        if ',' in v:
-                            raw_values[i] = f'"{v}"'
-                    f.writelines(','.join(raw_values) + "\n")
-            logger.debug(f"Queue exported to {startup.get_appdata_dir()}/queue.csv")
-
-            failed_count = []
+            if left_over and self.resume:
+                logger.info(f"   [!] Resuming {left_over} release(s) left in the queue from a previous run")
+            logger.info(f"{COLOR_CYAN}:: Sending {len(queue)} release(s) to deemix for download:{COLOR_RESET}")
+
+            workers = min(max(config.concurrent_downloads(), 1), len(queue))
+            track_concurrency = None
+            if config.concurrent_tracks():
+                track_concurrency = max(config.concurrent_tracks() // workers, 1)
+            logger.debug(f"Downloading with {workers} worker(s), track concurrency: "
+                         f"{track_concurrency or 'deemix default'}")
+
+            run_started = int(time.time())
+            failed_count = 0
             download_progress = tqdm(
-                self.queue_list,
-                total=len(self.queue_list),
+                total=len(queue),
                 desc="Downloading releases...",
                 ascii=" #",
                 bar_format=ui.TQDM_FORMAT
             )
-            for index, item in enumerate(download_progress):
-                i = str(index + 1)
-                t = str(len(download_progress))
-                download_progress.set_description_str(f"Downloading release {i} of {t}...")
-                dx_bitrate = get_deemix_bitrate(item.bitrate)
-                if self.verbose == "true":
-                    logger.debug(f"Processing queue item {vars(item)}")
-                try:
-                    if item.download_path:
-                        download_path = item.download_path
-                    else:
-                        download_path = None
-
-                    if item.artist_name:
-                        if item.album_title:
-                            logger.info(f"   > {item.artist_name} - {item.album_title}... ")
-                            self.di.download_url([item.url], dx_bitrate, download_path)
+            # Only as many items as there are workers are marked in progress at a
+            # time, and all queue table updates are made from this thread
+            pending = iter(queue)
+            in_flight = {}
+
+            def submit_next():
+                item = next(pending, None)
+                if item:
+                    self.db.set_queue_status(item.queue_id, "in_progress")
+                    self.db.commit()
+                    in_flight[ex.submit(self.download_item, item, track_concurrency)] = item
+
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                for _ in range(workers):
+                    submit_next()
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        item = in_flight.pop(future)
+                        # SystemExit (halt_download_on_error) propagates from here, leaving
+                        # the remaining items in the queue for the next run
+                        result = future.result()
+                        if result:
+                            status, reason = result
+                            if status == "failed":
+                                failed_count += 1
+                            self.db.set_queue_status(item.queue_id, status, reason)
                         else:
-                            logger.info(f"   > {item.artist_name} - {item.track_title}... ")
-                            self.di.download_url([item.url], dx_bitrate, download_path)
-                    else:
-                        logger.info(f"   > {item.playlist_title} (playlist)...")
-                        self.di.download_url([item.url], dx_bitrate, download_path, override_deemix=True)
-                except (deemix.errors.GenerationError, errors.WrongGeolocation) as e:
-                    logger.debug(e)
-                    failed_count.append([(item, "No tracks listed or unavailable in your country")])
-                except Exception as e:
-                    if item.artist_name and item.album_title:
-                        logger.info(f"The following error occured while downloading {item.artist_name} - {item.album_title}: {e}")
-                    elif item.artist_name and item.track_title:
-                        logger.info(f"The following error occured while downloading {item.artist_name} - {item.track_title}: {e}")
-                    else:
-                        logger.info(f"The following error occured while downloading {item.playlist_title}: {e}")
-                    pass
-
-
-            failed_count = [x for x in failed_count if x]
+                            self.db.set_queue_status(item.queue_id, "done")
+                        self.db.commit()
+                        download_progress.set_description_str(
+                            f"Downloading release {download_progress.n + 1} of {download_progress.total}...")
+                        download_progress.update(1)
+                        submit_next()
+            download_progress.close()
 
             print("")
-            if len(failed_count):
-                logger.info(f"   [!] Downloads completed with {len(failed_count)} error(s):")
-                with open(startup.get_appdata_dir() / "failed.csv", "w", encoding="utf-8") as f:
-                    f.writelines(','.join([str(x) for x in vars(self.queue_list[0]).keys()]) + "\n")
-                    for failed in failed_count:
-                        try:
-                            raw_values = [str(x) for x in vars(failed[0]).values()]
-                        except TypeError as e:
-                            print(f"Error reading from failed.csv. Entry that failed was either invalid or empty: {failed}")
-                            logger.error(e)
-                        else:
-                            # TODO move this to shared function
-                            for i, v in enumerate(raw_values):
-                                if '"' in v:
-                                    raw_values[i] = v.replace('"', "'")
-                                if ',' in v:
-                                    raw_values[i] = f'"{v}"'
-                            f.writelines(','.join(raw_values) + "\n")
-                            print(f"+ {failed[0].artist_name} - {failed[0].album_title} --- Reason: {failed[1]}")
+            if failed_count:
+                logger.info(f"   [!] Downloads completed with {failed_count} error(s):")
+                self.export_failed(run_started)
                 print("")
                 logger.info(f":: Failed downloads exported to: {startup.get_appdata_dir()}/failed.csv")
             else:
                 logger.info("   Downloads complete!")
+            # Failed items have been exported by now, only pending items are kept for --resume
+            self.db.purge_finished_queue()
+            self.db.commit()
             if plex and (config.plex_library() != ""):
                 refresh_plex(plex)
         return True
 
+    def export_failed(self, since: int = 0):
+        """ Write items that failed since the given timestamp from the queue table to failed.csv """
+        with open(startup.get_appdata_dir() / "failed.csv", "w", encoding="utf-8") as f:
+            f.writelines(','.join(QUEUE_CSV_FIELDS) + "\n")
+            for failed in self.db.get_failed_queue(since):
+                raw_values = [str(failed[x]) for x in QUEUE_CSV_FIELDS]
+                # TODO move this to shared function
+                for i, v in enumerate(raw_values):
+                    if '"' in v:
+                        raw_values[i] = v.replace('"', "'")
+                    if ',' in v:
+                        raw_values[i] = f'"{v}"'
+                f.writelines(','.join(raw_values) + "\n")
+                print(f"+ {failed['artist_name']} - {failed['album_title'] or failed['track_title'] or failed['playlist_title']}"
+                      f" --- Reason: {failed['reason']}")
+
+    def download_item(self, item: QueueItem, track_concurrency: int = None):
+        """
+        Download a single queue item, retrying unexpected errors with backoff.
+        Returns None on success, otherwise (status, reason): "failed" for releases
+        that are unavailable and exported to failed.csv, "error" for unexpected
+        errors that are only logged.
+        """
+        dx_bitrate = get_deemix_bitrate(item.bitrate)
+        if self.verbose == "true":
+            logger.debug(f"Processing queue item {vars(item)}")
+        download_path = item.download_path or None
+
+        if item.artist_name:
+            if item.album_title:
+                logger.info(f"   > {item.artist_name} - {item.album_title}... ")
+            else:
+                logger.info(f"   > {item.artist_name} - {item.track_title}... ")
+        else:
+            logger.info(f"   > {item.playlist_title} (playlist)...")
+
+        attempt = 0
+        while True:
+            try:
+                self.di.download_url([item.url], dx_bitrate, download_path,
+                                     override_deemix=True, track_concurrency=track_concurrency)
+                return
+            except (deemix.errors.GenerationError, errors.WrongGeolocation) as e:
+                logger.debug(e)
+                return "failed", "No tracks listed or unavailable in your country"
+            except Exception as e:
+                if attempt < config.download_retries():
+                    delay = ratelimit.backoff(attempt, base=2)
+                    logger.debug(f"Download of {item.url} failed ({e}), retrying in {delay:.1f}s")
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                if item.artist_name and item.album_title:
+                    logger.info(f"The following error occured while downloading {item.artist_name} - {item.album_title}: {e}")
+                elif item.artist_name and item.track_title:
+                    logger.info(f"The following error occured while downloading {item.artist_name} - {item.track_title}: {e}")
+                else:
+                    logger.info(f"The following error occured while downloading {item.playlist_title}: {e}")
+                return "error", str(e)
+
     def download(self, artist, artist_id, album_id, url,
                  artist_file, track_file, album_file, track_id, auto=True, monitored=False):
 
@@ -563,54 +646,20 @@ class Download:
             filtered = common.exclude_filtered_versions(filtered)
 
             for album in filtered:
-                if not queue_item_exists(album['id']):
+                if queue_item(QueueItem(artist=api_object, album=album), album['id']):
                     logger.info(f"{COLOR_CYAN}[+] Queueing: {api_object['name']} - {album['title']}{COLOR_RESET}")
-                    self.queue_list.append(QueueItem(artist=api_object, album=album))
 
-        def queue_item_exists(i):
-            for q in self.queue_list:
-                if q.album_id == i:
+        def queue_item(item: QueueItem, i) -> bool:
+            # Check and append in one step, worker threads queue concurrently
+            with self.queue_lock:
+                if i in self.queued:
                     logger.debug(f"Album ID {i} is already in queue")
                     self.duplicate_id_count += 1
-                    return True
-            return False
-        
-        def normalize_title(title: str) -> str:
-            import re
-            title = title.lower().strip()
-            suffixes = [
-                r'\s*-\s*remastered.*',
-                r'\s*\(remastered.*\)',
-                r'\s*\[remastered.*\]',
-                r'\s*-\s*deluxe.*',
-                r'\s*\(deluxe.*\)',
-                r'\s*\[deluxe.*\]',
-                r'\s*-\s*expanded.*',
-                r'\s*\(expanded.*\)',
-                r'\s*\[expanded.*\]',
-                r'\s*-\s*bonus.*',
-                r'\s*\(bonus.*\)',
-                r'\s*\[bonus.*\]',
-                r'\s*\[explicit\]',
-                r'\s*\(explicit\)',
-                r'\s*\(\d{4}\)',
-                r'\s*\[\d{4}\]',
-                r'\s*-\s*\d{4}.*',
-                r'\s*\(\d{4}.*\)',
-                r'\s*\[\d{4}.*\]',
-                r'\s*-\s*reissue.*',
-                r'\s*\(reissue.*\)',
-                r'\s*\[reissue.*\]',
-                r'\s*-\s*anniversary.*',
-                r'\s*\(anniversary.*\)',
-                r'\s*\[anniversary.*\]',
-                r'\s*-\s*edition.*',
-                r'\s*\(edition.*\)',
-                r'\s*\[edition.*\]',
-            ]
-            for suffix in suffixes:
-                title = re.sub(suffix, '', title, flags=re.IGNORECASE)
-            return title.strip()
+                    return False
+                if item.album_id:
+                    self.queued.add(item.album_id)
+                self.queue_list.append(item)
+                return True
         
         def process_artist_by_name(name):
             if ' - ' in name:
@@ -623,7 +672,7 @@ class Download:
                     logger.warning(f"{COLOR_YELLOW}Artist not found:{COLOR_RESET} {artist_part}")
                     return
 
-                normalized_query = normalize_title(album_part)
+                normalized_query = normalize.strip_edition_key(album_part)
                 found_album = None
 
                 for artist in artist_results['results']:
@@ -642,7 +691,7 @@ class Download:
 
                     # Then try normalized match
                     for album in artist_albums:
-                        normalized_album = normalize_title(album['title'])
+                        normalized_album = normalize.strip_edition_key(album['title'])
                         if normalized_query in normalized_album or normalized_album in normalized_query:
                             found_album = (artist, album)
                             break
@@ -656,8 +705,7 @@ class Download:
                     print(f"{COLOR_CYAN}Release Date:{COLOR_RESET} {dates.get_year(album['release_date'])}")
                     print(f"{COLOR_CYAN}Type:{COLOR_RESET} {album['record_type'].title()}")
                     print(f"{COLOR_CYAN}Starting download...{COLOR_RESET}\n")
-                    if not queue_item_exists(album['id']):
-                        self.queue_list.append(QueueItem(artist=artist, album=album))
+                    queue_item(QueueItem(artist=artist, album=album), album['id'])
                     return
                 else:
                     logger.warning(f"{COLOR_YELLOW}Album '{album_part}' not found for artist '{artist_part}'{COLOR_RESET}")
@@ -687,9 +735,8 @@ class Download:
                 return
             logger.debug(f"Requested album: {i}, "
                          f"Found: {album_id_result['artist']['name']} - {album_id_result['title']}")
-            if album_id_result and not queue_item_exists(album_id_result['id']):
+            if album_id_result and queue_item(QueueItem(album=album_id_result), album_id_result['id']):
                 logger.info(f"{COLOR_CYAN}[+] Queueing: {album_id_result['artist']['name']} - {album_id_result['title']}{COLOR_RESET}")
-                self.queue_list.append(QueueItem(album=album_id_result))
 
         def process_track_by_id(id):
             logger.debug("Processing track by ID")
@@ -698,19 +745,18 @@ class Download:
                 return
             logger.debug(f"Requested track: {id}, "
                          f"Found: {track_id_result['artist']['name']} - {track_id_result['title']}")
-            if track_id_result and not queue_item_exists(id):
-                self.queue_list.append(QueueItem(track=track_id_result))
+            if track_id_result:
+                queue_item(QueueItem(track=track_id_result), id)
 
         def process_track_file(id):
-            if not queue_item_exists(id):
-                track_data = {
-                    "artist": {
-                        "name": "TRACK ID"
-                    },
-                    "id": id,
-                    "title": id
-                }
-                self.queue_list.append(QueueItem(track=track_data))
+            track_data = {
+                "artist": {
+                    "name": "TRACK ID"
+                },
+                "id": id,
+                "title": id
+            }
+            queue_item(QueueItem(track=track_data), id)
 
         def process_playlist_by_id(id):
             playlist_api = self.api.get_playlist(id)
@@ -735,9 +781,9 @@ class Download:
             for album in artist_albums:
                 if album_part.lower() in album['title'].lower():
                     logger.info(f"Found: {artist['name']} - {album['title']}")
-                    if not queue_item_exists(album['id']):
+                    queued = queue_item(QueueItem(artist={'artist_name': artist['name'], 'name': artist['name'], 'link': f"https://www.deezer.com/artist/{artist['id']}"}, album=album), album['id'])
+                    if queued:
                         logger.info(f"{COLOR_CYAN}[+] Queueing: {artist['name']} - {album['title']}{COLOR_RESET}")
-                        self.queue_list.append(QueueItem(artist={'artist_name': artist['name'], 'name': artist['name'], 'link': f"https://www.deezer.com/artist/{artist['id']}"}, album=album))
                     else:
                         logger.debug(f"Album already in queue: {artist['name']} - {album['title']}")
                     return
@@ -1304,7 +1350,7 @@ class Download:
             logger.info(f"Cleaned up {self.duplicate_id_count} duplicate release(s). See log for additional info.")
 
         if auto:
-            if len(self.queue_list):
+            if len(self.queue_list) or (self.resume and self.db.get_pending_queue()):
                 self.download_queue()
             else:
                 print("")
@@ -1,5 +1,4 @@
 import logging
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from tqdm import tqdm
@@ -9,7 +8,7 @@ from deemon.cmd.refresh import Refresh
 from deemon.core.api import PlatformAPI
 from deemon.core.config import Config as config
 from deemon.core.db import Database
-from deemon.utils import dataprocessor, ui
+from deemon.utils import dataprocessor, scanner, ui
 
 logger = logging.getLogger(__name__)
 
@@ -102,7 +101,7 @@ class Monitor:
 
     # @performance.timeit
     def build_artist_query(self, api_result: list):
-        existing = self.db.get_all_monitored_artist_ids()
+        existing = set(self.db.get_all_monitored_artist_ids())
         artists_to_add = []
         pbar = tqdm(api_result, total=len(api_result), desc="Setting up artists for monitoring...", ascii=" #",
                     bar_format=ui.TQDM_FORMAT)
@@ -128,7 +127,7 @@ class Monitor:
         if include_artists:
             include_artists = '1'
 
-        existing = self.db.get_all_monitored_playlist_ids() or []
+        existing = set(self.db.get_all_monitored_playlist_ids())
         playlists_to_add = []
         pbar = tqdm(api_result, total=len(api_result), desc="Setting up playlists for monitoring...", ascii=" #",
                     bar_format=ui.TQDM_FORMAT)
@@ -167,12 +166,11 @@ class Monitor:
         """
         if self.remove:
             return self.purge_artists(names=names)
-        self.debugger("SpawningThreads", self.api.max_threads)
-        with ThreadPoolExecutor(max_workers=self.api.max_threads) as ex:
-            api_result = list(
-                tqdm(ex.map(self.api.search_artist, names), total=len(names),
-                     desc=f"Fetching artist data for {len(names):,} artist(s), please wait...",
-                     ascii=" #", bar_format=ui.TQDM_FORMAT))
+        self.debugger("SpawningThreads", self.api.concurrency)
+        api_result = list(
+            tqdm(self.api.map(self.api.search_artist, names), total=len(names),
+                 desc=f"Fetching artist data for {len(names):,} artist(s), please wait...",
+                 ascii=" #", bar_format=ui.TQDM_FORMAT))
 
         select_artist = tqdm(api_result, total=len(api_result), desc="Examining results for best match...", ascii=" #",
                              bar_format=ui.TQDM_FORMAT)
@@ -195,12 +193,11 @@ class Monitor:
         ids = [int(x) for x in ids]
         if self.remove:
             return self.purge_artists(ids=ids)
-        self.debugger("SpawningThreads", self.api.max_threads)
-        with ThreadPoolExecutor(max_workers=self.api.max_threads) as ex:
-            api_result = list(
-                tqdm(ex.map(self.api.get_artist_by_id, ids), total=len(ids),
-                     desc=f"Fetching artist data for {len(ids):,} artist(s), please wait...",
-                     ascii=" #", bar_format=ui.TQDM_FORMAT))
+        self.debugger("SpawningThreads", self.api.concurrency)
+        api_result = list(
+            tqdm(self.api.map(self.api.get_artist_by_id, ids), total=len(ids),
+                 desc=f"Fetching artist data for {len(ids):,} artist(s), please wait...",
+                 ascii=" #", bar_format=ui.TQDM_FORMAT))
 
         if self.build_artist_query(api_result):
             self.call_refresh()
@@ -218,7 +215,9 @@ class Monitor:
             else:
                 self.artists(artist_list)
         elif Path(import_path).is_dir():
-            import_list = [x.relative_to(import_path).name for x in sorted(Path(import_path).iterdir()) if x.is_dir()]
+            artist_dirs = scanner.scan(import_path, recursive=False, files=False, dirs=True,
+                                       skip_hidden=False, follow_symlinks=True)
+            import_list = sorted(entry.name for entry in artist_dirs)
             if import_list:
                 self.artists(import_list)
         else:
@@ -230,12 +229,11 @@ class Monitor:
         if self.remove:
             return self.purge_playlists(ids=playlists)
         ids = [int(x) for x in playlists]
-        self.debugger("SpawningThreads", self.api.max_threads)
-        with ThreadPoolExecutor(max_workers=self.api.max_threads) as ex:
-            api_result = list(
-                tqdm(ex.map(self.api.get_playlist, ids), total=len(ids),
-                     desc=f"Fetching playlist data for {len(ids):,} playlist(s), please wait...",
-                     ascii=" #", bar_format=ui.TQDM_FORMAT))
+        self.debugger("SpawningThreads", self.api.concurrency)
+        api_result = list(
+            tqdm(self.api.map(self.api.get_playlist, ids), total=len(ids),
+                 desc=f"Fetching playlist data for {len(ids):,} playlist(s), please wait...",
+                 ascii=" #", bar_format=ui.TQDM_FORMAT))
 
         if self.build_playlist_query(api_result, include_artists):
             self.call_refresh()
@@ -1,42 +1,54 @@
 import logging
 import re
 import time
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from tqdm import tqdm
 
 from deemon.cmd.download import QueueItem, Download
 from deemon.core import db, api, notifier, common
 from deemon.core.config import Config as config
+from deemon.core.seen import SeenReleases
 from deemon.utils import dates, ui, performance
 
 logger = logging.getLogger(__name__)
 
 
 class Refresh:
-    def __init__(self, time_machine: datetime = None, skip_download: bool = False, ignore_filters: bool = False, active_api=None):
+    def __init__(self, time_machine: datetime = None, skip_download: bool = False, ignore_filters: bool = False,
+                 active_api=None, resume: bool = False):
         self.db = db.Database()
         self.refresh_date = datetime.now()
         self.max_refresh_date = None
         self.api = active_api or api.PlatformAPI()
         self.new_releases = []
-        self.new_releases_alert = []
+        self.new_releases_alert = notifier.AlertDigest()
         self.new_playlist_releases = []
         self.time_machine = time_machine
         self.total_new_releases = 0
         self.queue_list = []
         self.skip_download = skip_download
         self.download_all = ignore_filters
+        self.resume = resume
         self.seen = None
+        self.watermarks = []
 
         if self.time_machine:
             logger.info(f":: Time Machine active: {datetime.strftime(self.time_machine, '%b %d, %Y')}!")
             config._CONFIG['new_releases']['release_max_age'] = 0
+            config._CONFIG['incremental_refresh'] = False
             if not self.waiting_for_refresh():
-                self.db.remove_specific_releases({'tm_date': str(self.time_machine)})
+                self.db.remove_specific_releases({'tm_day': dates.day_of(self.time_machine)})
                 self.db.commit()
 
+        # Release dates are compared as day numbers against cutoffs fixed for this refresh
+        self.today = dates.day_of(self.refresh_date)
+        self.time_machine_day = dates.day_of(self.time_machine) if self.time_machine else None
+        if config.release_max_age():
+            self.max_age_day = dates.day_of(self.refresh_date - timedelta(config.release_max_age()))
+        else:
+            self.max_age_day = None
+
     @staticmethod
     def debugger(message: str, payload = None):
         if config.debug_mode():
@@ -44,44 +56,35 @@ class Refresh:
                 payload = ""
             logger.debug(f"DEBUG_MODE: {message} {str(payload)}")
 
-    def remove_existing_releases(self, payload: dict, seen: dict) -> list:
+    def remove_existing_releases(self, payload: dict, seen) -> list:
         """
         Return list of releases that have not been stored in the database
         """
-        new_releases = []
-
         if payload.get('artist_id'):
-            seen_releases = seen
-            if seen_releases:
-                seen_releases = [v for x in seen_releases for k, v in x.items() if not x.get('future_release', 0)]
-                new_releases = [x for x in payload['releases'] if type(x) == dict for k, v in x.items() if
-                                k == "id" and v not in seen_releases]
-                return new_releases
+            if seen:
+                return seen.unseen(payload['releases'])
             return [x for x in payload['releases']]
 
         if payload.get('tracks'):
-            playlist_id = payload['id']
-            seen_releases = self.db.get_playlist_tracks(playlist_id)
-            if seen_releases:
-                seen_releases = [v for x in seen_releases for k, v in x.items()]
-                new_releases = [x for x in payload['tracks']
-                                if type(x) == dict for k, v in x.items()
-                                if k == "id" and v not in seen_releases]
-                return new_releases
+            if seen:
+                return [x for x in payload['tracks'] if x['id'] not in seen]
             return [x for x in payload['tracks']]
 
-        return new_releases
+        return []
 
     def filter_artist_releases(self, payload: dict):
         """ Inspect artist releases and decide what to do with each release """
         self.debugger(f"{payload['artist_name']} has {len(payload['releases'])} new releases")
+        exclusions = common.exclusion_filter()
+        explicit_releases = common.explicit_index(payload['releases'])
 
         for release in payload['releases']:
             release['artist_id'] = payload['artist_id']
             release['artist_name'] = payload['artist_name']
             release['bitrate'] = payload['bitrate'] or config.bitrate()
             release['download_path'] = payload['download_path'] or config.download_path()
-            release['future'] = self.is_future_release(release['release_date'])
+            release['release_day'] = dates.release_day(release['release_date'])
+            release['future'] = self.is_future_release(release['release_day'])
             release['alerts'] = payload['alerts']
             
             if release['explicit_lyrics'] != 1:
@@ -92,11 +95,10 @@ class Refresh:
             if release['future']:
                 continue
 
-            if not common.exclude_filtered_versions([{'title': release['title']}]):
-                # exclude_filtered_versions returns empty list if excluded
+            if exclusions and exclusions.is_excluded(release['title']):
                 continue
 
-            explicit_album_id = self.explicit_id(release['title'], payload['releases'])
+            explicit_album_id = explicit_releases.get(common.title_key(release['title']))
             if explicit_album_id:
                 if explicit_album_id == release['id']:
                     logger.debug(f"An explicit release was found for {release['title']}")
@@ -112,7 +114,7 @@ class Refresh:
                              f"{release['id']}")
                 continue
 
-            if self.release_too_old(release['release_date']):
+            if self.release_too_old(release['release_day']):
                 logger.debug(f"Release {release['id']} is too old, skipping it.")
                 continue
 
@@ -124,30 +126,19 @@ class Refresh:
     def append_database_release(self, new_release: dict):
         self.new_releases.append(new_release)
                 
-    @staticmethod
-    def explicit_id(release_title: str, payload: list):
-        for release in payload:
-            if release['title'] == release_title:
-                if release['explicit_lyrics'] == 1:
-                    return release['id']
-
-    def release_too_old(self, release_date: str):
-        release_date_dt = dates.str_to_datetime_obj(release_date)
-        if self.time_machine:
-            if release_date_dt <= self.time_machine:
-                self.debugger(f"Release date \"{release_date}\" is older than TIME_MACHINE ({str(dates.ui_date(self.time_machine))})")
+    def release_too_old(self, release_day: int):
+        if self.time_machine_day is not None:
+            if release_day <= self.time_machine_day:
+                self.debugger(f"Release date \"{date.fromordinal(release_day)}\" is older than TIME_MACHINE ({str(dates.ui_date(self.time_machine))})")
                 return True
-        if config.release_max_age():
-            if release_date_dt < (self.refresh_date - timedelta(config.release_max_age())):
-                self.debugger(f"Release date \"{release_date}\" is older than RELEASE_MAX_AGE ({config.release_max_age()} day(s))")
+        if self.max_age_day is not None:
+            if release_day <= self.max_age_day:
+                self.debugger(f"Release date \"{date.fromordinal(release_day)}\" is older than RELEASE_MAX_AGE ({config.release_max_age()} day(s))")
                 return True
-            
 
-    @staticmethod
-    def is_future_release(release_date: str):
+    def is_future_release(self, release_day: int):
         """ Return 1 if release date is in future, otherwise return 0 """
-        release_date_dt = dates.str_to_datetime_obj(release_date)
-        if release_date_dt > datetime.now():
+        if release_day > self.today:
             return 1
         else:
             return 0
@@ -198,6 +189,8 @@ class Refresh:
 
     def prep_payload(self, p):
         if len(p):
+            if p.get('watermark'):
+                self.watermarks.append(p['watermark'])
             p['releases'] = self.remove_existing_releases(p, self.seen)
             self.filter_artist_releases(p)
         else:
@@ -240,8 +233,10 @@ class Refresh:
                     return logger.warning("No artists found to refresh")
                 api_result = self.get_release_data({'artists': monitored_artists, 'playlists': monitored_playlists})
 
-        if len(api_result):
-            self.seen = self.db.get_artist_releases()
+        if api_result.get('stream'):
+            self.stream_artist_releases(api_result['stream'])
+        elif len(api_result):
+            self.seen = self.db.get_seen_releases()
             payload_container = tqdm(api_result['artists'], total=len(api_result['artists']),
                                      desc=f"Scanning release data for new releases...",
                                      ascii=" #",
@@ -252,7 +247,7 @@ class Refresh:
         playlist_monitor_artists = []
         for payload in api_result['playlists']:
             if payload and len(payload):
-                self.seen = self.db.get_playlist_tracks(payload['id'])
+                self.seen = {x['track_id'] for x in self.db.get_playlist_tracks(payload['id'])}
                 payload['tracks'] = self.remove_existing_releases(payload, self.seen)
                 self.filter_playlist_releases(payload)
 
@@ -267,10 +262,16 @@ class Refresh:
             self.queue_list.clear()
             self.new_releases_alert.clear()
 
-        if len(self.queue_list):
+        if len(self.queue_list) or (self.resume and not self.skip_download and self.db.get_pending_queue()):
             dl = Download(active_api=self.api)
+            dl.resume = self.resume
             dl.download_queue(self.queue_list)
 
+        if self.watermarks:
+            logger.debug("Updating discography watermarks in database...")
+            self.db.set_artist_watermarks(self.watermarks)
+            self.db.commit()
+
         if len(self.new_playlist_releases) or len(self.new_releases):
             if len(self.new_playlist_releases):
                 logger.debug("Updating playlist releases in database...")
@@ -299,17 +300,48 @@ class Refresh:
             monitor = Monitor(active_api=self.api)
             monitor.artist_ids(playlist_monitor_artists)
 
+    def stream_artist_releases(self, artists: list):
+        """
+        Merge-join API results with releases stored in the database, one artist
+        at a time. Artists are fetched in artist_id order so that the releases
+        table can be read in a single ordered pass alongside the API results.
+        """
+        artists = sorted(artists, key=lambda x: x['artist_id'])
+        stored = self.db.iter_seen_releases_by_artist()
+        current = next(stored, None)
+
+        payload_container = tqdm(self.api.map(self.api.get_artist_albums, artists),
+                                 total=len(artists),
+                                 desc=f"Fetching artist release data for {len(artists):,} artist(s), please wait...",
+                                 ascii=" #",
+                                 bar_format=ui.TQDM_FORMAT)
+        for payload in payload_container:
+            while current and current[0] < payload['artist_id']:
+                current = next(stored, None)
+            if current and current[0] == payload['artist_id']:
+                self.seen = current[1]
+            else:
+                self.seen = SeenReleases()
+
+            # Releases may already be stored under another artist (e.g. features)
+            unseen = [r['id'] for r in self.seen.unseen(payload['releases'])]
+            if unseen:
+                self.seen.update(self.db.get_releases_by_album_ids(unseen))
+            self.prep_payload(payload)
+        stored.close()
+
     def db_stats(self):
-        artists = len(self.db.get_all_monitored_artist_ids())
-        playlists = len(self.db.get_all_monitored_playlist_ids())
-        releases = len(self.db.get_artist_releases())
-        future = len(self.db.get_future_releases())
+        stats = self.db.get_stats()
 
         print("")
-        print(f"+ Artists monitored: {artists:,}")
-        print(f"+ Playlists monitored: {playlists:,}")
-        print(f"+ Releases seen: {releases:,}")
-        print(f"+ Pending future releases: {future:,}")
+        print(f"+ Artists monitored: {stats['artists']:,}")
+        print(f"+ Playlists monitored: {stats['playlists']:,}")
+        print(f"+ Releases seen: {stats['releases']:,}")
+        print(f"+ Pending future releases: {stats['future_releases']:,}")
+        if self.api.limiter.requests:
+            print(f"+ API requests: {self.api.limiter.requests:,} "
+                  f"({self.api.limiter.requests_per_second():.1f}/s, "
+                  f"{self.api.limiter.throttled_count:,} throttled)")
         print("")
 
     def get_release_data(self, to_refresh: dict) -> dict:
@@ -324,59 +356,30 @@ class Refresh:
 
         if to_refresh.get('playlists') and len(to_refresh.get('playlists')):
             logger.debug("Fetching playlist track data...")
-            self.debugger("SpawningThreads", self.api.max_threads)
-            with ThreadPoolExecutor(max_workers=self.api.max_threads) as ex:
-                api_result['playlists'] = list(
-                    tqdm(ex.map(self.api.get_playlist_tracks,
-                                to_refresh['playlists']),
-                         total=len(to_refresh['playlists']),
-                         desc=f"Fetching playlist track data for "
-                              f"{len(to_refresh['playlists'])} playlist(s), "
-                              "please wait...",
-                         ascii=" #",
-                         bar_format=ui.TQDM_FORMAT)
-                )
-
-        if to_refresh.get('artists') and len(to_refresh['artists']):
+            self.debugger("SpawningThreads", self.api.concurrency)
+            api_result['playlists'] = list(
+                tqdm(self.api.map(self.api.get_playlist_tracks,
+                                  to_refresh['playlists']),
+                     total=len(to_refresh['playlists']),
+                     desc=f"Fetching playlist track data for "
+                          f"{len(to_refresh['playlists'])} playlist(s), "
+                          "please wait...",
+                     ascii=" #",
+                     bar_format=ui.TQDM_FORMAT)
+            )
+
+        if to_refresh.get('artists') and len(to_refresh['artists']) and config.low_memory_refresh():
+            logger.debug("Low memory refresh enabled, artist release data will be streamed")
+            api_result['stream'] = to_refresh['artists']
+        elif to_refresh.get('artists') and len(to_refresh['artists']):
             logger.debug("Fetching artist release data...")
-            self.debugger("SpawningThreads", self.api.max_threads)
-            with ThreadPoolExecutor(max_workers=self.api.max_threads) as ex:
-                api_result['artists'] = list(
-                    tqdm(ex.map(self.api.get_artist_albums, to_refresh['artists']),
-                         total=len(to_refresh['artists']), desc=f"Fetching artist release data for {len(to_refresh['artists']):,} artist(s), please wait...", ascii=" #",
-                         bar_format=ui.TQDM_FORMAT)
-                )
+            self.debugger("SpawningThreads", self.api.concurrency)
+            api_result['artists'] = list(
+                tqdm(self.api.map(self.api.get_artist_albums, to_refresh['artists']),
+                     total=len(to_refresh['artists']), desc=f"Fetching artist release data for {len(to_refresh['artists']):,} artist(s), please wait...", ascii=" #",
+                     bar_format=ui.TQDM_FORMAT)
+            )
         return api_result
 
     def create_notification(self, release: dict):
-        for days in self.new_releases_alert:
-            for key in days:
-                if key == "release_date":
-                    if release['release_date'] in days[key]:
-                        days["releases"].append(
-                            {
-                                'artist': release['artist_name'],
-                                'album': release['title'],
-                                'cover': release['cover_big'],
-                                'url': release['link'],
-                                'track_num': release.get('nb_tracks', None),
-                                'record_type': release['record_type'],
-                            }
-                        )
-                        return
-
-        self.new_releases_alert.append(
-            {
-                'release_date': release['release_date'], 
-                'releases': [
-                    {
-                        'artist': release['artist_name'],
-                        'album': release['title'],
-                        'cover': release['cover_big'],
-                        'url': release['link'],
-                        'track_num': release.get('nb_tracks', None),
-                        'record_type': release['record_type'],
-                    }
-                ]
-            }
-        )
+        self.new_releases_alert.add(release)
@@ -4,65 +4,44 @@ from deemon.core.db import Database
 from deemon.utils import dates
 
 logger = logging.getLogger(__name__)
-db = Database()
 
 
 def view_transactions():
+    db = Database()
     transactions = db.get_transactions()
     if not transactions:
         return logger.info("No transactions are available to be rolled back.")
 
     for i, transaction in enumerate(transactions, start=1):
-        release_id = []
-        artist_names = []
-        playlist_titles = []
+        release_count = transaction['release_count']
+        artist_count = transaction['artist_count']
+        playlist_count = transaction['playlist_count']
 
-        for k, v in transaction.items():
-            if (k == "releases" or k == "playlist_tracks") and transaction[k]:
-                for item in transaction[k]:
-                    for key, val in item.items():
-                        if key == "album_id" or key == "track_id":
-                            if item[key] not in release_id:
-                                release_id.append(item[key])
-            if k == "monitor" and transaction[k]:
-                if transaction[k] not in artist_names:
-                    artist_names = [x['artist_name'] for x in transaction[k]]
-            if k == "playlists" and transaction[k]:
-                if transaction[k] not in playlist_titles:
-                    playlist_titles.append(transaction[k][0]['title'])
-
-        release_id_len = len(release_id)
-
-        if release_id_len == 1:
-            release_text = f" and {release_id_len} release"
-        elif release_id_len > 1:
-            release_text = f" and {release_id_len} releases"
+        if release_count == 1:
+            release_text = f" and {release_count} release"
+        elif release_count > 1:
+            release_text = f" and {release_count} releases"
         else:
             release_text = ""
 
-        if len(artist_names) > 1:
-            if len(playlist_titles) > 1:
-                playlist_text = f", {len(playlist_titles)} playlists"
-            elif len(playlist_titles) == 1:
-                playlist_text = f", {len(playlist_titles)} playlist"
-            else:
-                playlist_text = ""
-            output_text = f"Added {artist_names[0]} + {len(artist_names) - 1} artist(s){playlist_text}{release_text}"
-        elif len(artist_names) == 1:
-            if len(playlist_titles) > 1:
-                playlist_text = f", {len(playlist_titles)} playlists"
-            elif len(playlist_titles) == 1:
-                playlist_text = f", {len(playlist_titles)} playlist"
-            else:
-                playlist_text = ""
-            output_text = f"Added {artist_names[0]}{playlist_text}{release_text}"
+        if playlist_count > 1:
+            playlist_text = f", {playlist_count} playlists"
+        elif playlist_count == 1:
+            playlist_text = f", {playlist_count} playlist"
+        else:
+            playlist_text = ""
+
+        if artist_count > 1:
+            output_text = f"Added {transaction['artist_name']} + {artist_count - 1} artist(s){playlist_text}{release_text}"
+        elif artist_count == 1:
+            output_text = f"Added {transaction['artist_name']}{playlist_text}{release_text}"
         else:
-            if len(playlist_titles) > 1:
-                output_text = f"Added {playlist_titles[0]} + {len(playlist_titles) - 1}{release_text}"
-            elif len(playlist_titles) == 1:
-                output_text = f"Added {playlist_titles[0]}{release_text}"
+            if playlist_count > 1:
+                output_text = f"Added {transaction['playlist_title']} + {playlist_count - 1}{release_text}"
+            elif playlist_count == 1:
+                output_text = f"Added {transaction['playlist_title']}{release_text}"
             else:
-                output_text = f"Added {release_text[4:]}"
+                output_text = f"Added {release_text[5:]}"
 
         print(f"{i}. {dates.get_friendly_date(transaction['timestamp'])} - {output_text}")
 
@@ -82,5 +61,6 @@ def view_transactions():
 
 
 def rollback_last(i: int):
+    db = Database()
     db.rollback_last_refresh(i)
     logger.info(f"Rolled back the last {i} transaction(s).")
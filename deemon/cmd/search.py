@@ -7,7 +7,7 @@ from deemon.cmd import download
 from deemon.cmd import monitor as mon
 from deemon.core import db, api
 from deemon.core.config import Config as config
-from deemon.utils import dates
+from deemon.utils import dates, normalize
 
 logger = logging.getLogger(__name__)
 
@@ -292,45 +292,7 @@ class Search:
     @staticmethod
     def normalize_title(title: str) -> str:
         """Normalize title for fuzzy matching by removing common suffixes and normalizing case"""
-        import re
-        
-        title = title.lower().strip()
-        
-        suffixes = [
-            r'\s*-\s*remastered.*',
-            r'\s*\(remastered.*\)',
-            r'\s*\[remastered.*\]',
-            r'\s*-\s*deluxe.*',
-            r'\s*\(deluxe.*\)',
-            r'\s*\[deluxe.*\]',
-            r'\s*-\s*expanded.*',
-            r'\s*\(expanded.*\)',
-            r'\s*\[expanded.*\]',
-            r'\s*-\s*bonus.*',
-            r'\s*\(bonus.*\)',
-            r'\s*\[bonus.*\]',
-            r'\s*\[explicit\]',
-            r'\s*\(explicit\)',
-            r'\s*\(\d{4}\)',
-            r'\s*\[\d{4}\]',
-            r'\s*-\s*\d{4}.*',
-            r'\s*\(\d{4}.*\)',
-            r'\s*\[\d{4}.*\]',
-            r'\s*-\s*reissue.*',
-            r'\s*\(reissue.*\)',
-            r'\s*\[reissue.*\]',
-            r'\s*-\s*anniversary.*',
-            r'\s*\(anniversary.*\)',
-            r'\s*\[anniversary.*\]',
-            r'\s*-\s*edition.*',
-            r'\s*\(edition.*\)',
-            r'\s*\[edition.*\]',
-        ]
-        
-        for suffix in suffixes:
-            title = re.sub(suffix, '', title, flags=re.IGNORECASE)
-        
-        return title.strip()
+        return normalize.strip_edition_key(title)
 
     def search_artist_album(self, artist_query: str, album_query: str):
         """Search for a specific album by an artist"""
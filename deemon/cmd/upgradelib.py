@@ -1,4 +1,6 @@
+import os
 import sys
+import json
 import time
 import logging
 from datetime import timedelta
@@ -7,11 +9,12 @@ from mutagen.easyid3 import EasyID3
 from itertools import groupby
 from operator import itemgetter
 from deezer import Deezer
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from unidecode import unidecode
 from tqdm import tqdm
-from deemon.core.common import exclude_filtered_versions
+from deemon.core.common import exclude_filtered_versions, group_by_title, title_key
 from deemon.core.config import Config as config
+from deemon.utils import scanner, startup
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +24,11 @@ LIBRARY_ROOT = None
 ALBUM_ONLY = None
 ALLOW_EXCLUSIONS = None
 
+# Bumped whenever the tags kept per file change
+ID3_CACHE_VERSION = 1
+# Files handed to a worker process at a time, keeps pickling overhead low
+PROCESS_CHUNK_SIZE = 64
+
 # TODO - Add an 'exclusions' key to albums/tracks for count
 # TODO - to improve album title matching, extract all a-zA-Z0-9 and compare (remove special chars)
 
@@ -59,28 +67,116 @@ class Performance:
             self.completeAPI = self.endAPI - self.startAPI
 
 
-def read_metadata(file):
-    metadata = {
-        'abs_path': file,
-        'rel_path': str(file).replace(LIBRARY_ROOT, ".."),
-        'error': None
-    }
-
+class TagCache:
+    """
+    Tags read from library files on previous runs, keyed by absolute path.
+    An entry is only used while the file's size and mtime are unchanged.
+    """
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = {}
+        self.seen = set()
+        self.hits = 0
+
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('version') == ID3_CACHE_VERSION:
+                self.entries = cache['files']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            logger.debug(f"Ignoring unreadable ID3 cache: {e}")
+
+    def get(self, file: str, stat: os.stat_result):
+        self.seen.add(file)
+        entry = self.entries.get(file)
+        if stat and entry and entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime_ns:
+            self.hits += 1
+            return entry['tags']
+
+    def set(self, file: str, stat: os.stat_result, tags: dict):
+        if stat:
+            self.entries[file] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'tags': tags}
+
+    def save(self, root: str):
+        """ Write the cache, dropping files under root that no longer exist """
+        root = os.path.join(os.path.abspath(root), '')
+        files = {file: entry for file, entry in self.entries.items()
+                 if file in self.seen or not file.startswith(root)}
+        tmp_path = self.path.with_suffix('.tmp')
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': ID3_CACHE_VERSION, 'files': files}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Unable to save ID3 cache: {e}")
+
+
+def read_tags(file) -> dict:
+    """ Artist, album and title of an MP3 file, or the reason they couldn't be read """
     try:
         _audio = EasyID3(file)
 
         # Remove featured artists from artist tag
-        metadata['artist'] = _audio['artist'][0].split("/")[0].strip()
+        artist = _audio['artist'][0].split("/")[0].strip()
 
         # Remove special character replacement for search query
-        metadata['album'] = _audio['album'][0].replace("_", " ").strip()
-        metadata['title'] = _audio['title'][0].strip()
+        album = _audio['album'][0].replace("_", " ").strip()
+        title = _audio['title'][0].strip()
     except Exception as e:
-        metadata['error'] = e
+        # Kept as text so results can be cached and sent back from worker processes
+        return {'error': str(e) or type(e).__name__}
+
+    return {'artist': artist, 'album': album, 'title': title}
+
 
+def read_metadata(file, tags: dict = None):
+    metadata = {
+        'abs_path': file,
+        'rel_path': str(file).replace(LIBRARY_ROOT, ".."),
+        'error': None
+    }
+    metadata.update(tags if tags is not None else read_tags(file))
     return metadata
 
 
+def read_library_tags(entries: list, processes: int = 0) -> list:
+    """
+    Tags for each scanned file, parsing only files that are new or changed
+    since the last run. Parsing is CPU bound, so with processes > 0 it runs
+    in a process pool instead of threads held back by the GIL.
+    """
+    cache = TagCache(startup.get_id3_cache())
+    files = [os.path.abspath(entry.path) for entry in entries]
+    stats = []
+    for entry in entries:
+        try:
+            stats.append(entry.stat())
+        except OSError:
+            stats.append(None)
+
+    tags = [cache.get(file, stat) for file, stat in zip(files, stats)]
+    pending = [i for i, file_tags in enumerate(tags) if file_tags is None]
+    if cache.hits:
+        print(f"Using cached metadata for {cache.hits} unchanged file(s)")
+
+    if pending:
+        if processes:
+            executor, chunksize = ProcessPoolExecutor(processes), PROCESS_CHUNK_SIZE
+        else:
+            executor, chunksize = ThreadPoolExecutor(10), 1
+        with executor:
+            results = executor.map(read_tags, [files[i] for i in pending], chunksize=chunksize)
+            for i, file_tags in zip(pending, tqdm(results, total=len(pending), desc="Reading metadata")):
+                tags[i] = file_tags
+                cache.set(files[i], stats[i], file_tags)
+
+    cache.save(LIBRARY_ROOT)
+    return tags
+
+
 def get_time_from_secs(secs):
     td_str = str(timedelta(seconds=secs))
     x = td_str.split(":")
@@ -124,6 +220,7 @@ def get_artist_discography_api(artist_name, artist_id) -> list:
     album_api = dz.api.get_artist_albums(artist_id)['data']
 
     albums = []
+    album_ids = set()
 
     for album in album_api:
         if album['record_type'] == 'single':
@@ -147,18 +244,21 @@ def get_artist_discography_api(artist_name, artist_id) -> list:
             'TYPE': album['record_type']
         }
         albums.append(alb)
+        album_ids.add(alb['ALB_ID'])
 
     for album in album_gw:
-        if album['ALB_ID'] not in [x['ALB_ID'] for x in albums]:
+        if album['ALB_ID'] not in album_ids:
             albums.append(album)
+            album_ids.add(album['ALB_ID'])
 
     for album in album_search:
         if album['ART_ID'] == artist_id:
-            if album['ALB_ID'] not in [x['ALB_ID'] for x in albums]:
+            if album['ALB_ID'] not in album_ids:
                 # Album returned via Search is missing EXPLICIT_LYRICS key
                 if not album.get('EXPLICIT_LYRICS'):
                     album['EXPLICIT_LYRICS'] = '0'
                 albums.append(album)
+                album_ids.add(album['ALB_ID'])
 
     return albums
 
@@ -198,14 +298,15 @@ def retrieve_track_ids_per_artist(discography: tuple):
             if duplicate_artists:
                 tqdm.write(f"Searching with: {api_artist['ART_NAME']} ({api_artist['ART_ID']})")
 
-            discog = get_artist_discography_api(api_artist['ART_NAME'], api_artist['ART_ID'])
+            discog = group_by_title(get_artist_discography_api(api_artist['ART_NAME'], api_artist['ART_ID']),
+                                    key='ALB_TITLE')
 
             for album, tracks in groupby(albums, key=itemgetter('album')):
 
                 # Convert itertools.groupby to list so we can use it more than once
                 tracks = [track for track in tracks]
 
-                api_album_matches = [alb for alb in discog if alb['ALB_TITLE'].lower() == album.lower()]
+                api_album_matches = discog.get(title_key(album), [])
 
                 if ALLOW_EXCLUSIONS:
                     filtered_album_matches = exclude_filtered_versions(api_album_matches)
@@ -304,7 +405,7 @@ def get_preferred_track_id(title: str, tracklist: list):
     return track_id
 
 
-def upgrade(library, output, albums=False, exclusions=False):
+def upgrade(library, output, albums=False, exclusions=False, processes=0):
 
     global ALBUM_ONLY
     global ALLOW_EXCLUSIONS
@@ -320,9 +421,8 @@ def upgrade(library, output, albums=False, exclusions=False):
     perf = Performance()
     logger.info("Scanning library, standby...")
     logger.debug(f"Library path: {LIBRARY_ROOT}")
-    library_files = Path(LIBRARY_ROOT).glob("**/*.mp3")
-    files = [file for file in library_files if not file.name.startswith(".")]
-    files.sort()
+    entries = sorted(scanner.scan(LIBRARY_ROOT, extensions={'.mp3'}), key=lambda entry: entry.path)
+    files = [Path(entry.path) for entry in entries]
 
     if files:
         print(f"Found {len(files)} MP3 files")
@@ -331,14 +431,8 @@ def upgrade(library, output, albums=False, exclusions=False):
         sys.exit()
 
     perf.start('ID3')
-    with ThreadPoolExecutor(10) as executor:
-        library_metadata = list(
-            tqdm(
-                executor.map(read_metadata, files),
-                total=(len(files)),
-                desc="Reading metadata",
-            )
-        )
+    library_tags = read_library_tags(entries, processes)
+    library_metadata = [read_metadata(file, tags) for file, tags in zip(files, library_tags)]
     perf.end('ID3')
 
     library_metadata_errors = [file for file in library_metadata if file.get('error')]
@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import threading
+
+from deezer import Deezer
+from deezer.errors import (APIError, DataException, GWAPIError, InvalidQueryException, InvalidTokenException,
+                           ItemsLimitExceededException, MissingParameterException, PermissionException,
+                           WrongParameterException, IndividualAccountChangedNotAllowedException)
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+GW_URL = "http://www.deezer.com/ajax/gw-light.php"
+API_URL = "https://api.deezer.com/"
+
+API_ERRORS = {
+    100: ItemsLimitExceededException,
+    200: PermissionException,
+    300: InvalidTokenException,
+    500: WrongParameterException,
+    501: MissingParameterException,
+    600: InvalidQueryException,
+    800: DataException,
+    901: IndividualAccountChangedNotAllowedException,
+}
+
+
+class QuotaExceeded(APIError):
+    """ Raised when the public API reports that the request quota was exceeded """
+
+
+def available() -> bool:
+    return aiohttp is not None
+
+
+def transient_errors() -> tuple:
+    """ Exceptions that should be retried with backoff by the caller """
+    if aiohttp is None:
+        return (QuotaExceeded,)
+    return QuotaExceeded, aiohttp.ClientError, asyncio.TimeoutError
+
+
+class AsyncGW:
+    """ Async counterpart of deezer.gw.GW for the calls used during refresh """
+
+    def __init__(self, client: 'AsyncDeezer', api_token: str = None):
+        self.client = client
+        self.api_token = api_token
+        self.token_request = None
+
+    async def api_call(self, method, args=None):
+        if args is None:
+            args = {}
+        if not self.api_token:
+            # Calls made before the token arrives all wait for the same request
+            if self.token_request is None:
+                self.token_request = asyncio.ensure_future(self.get_token())
+            try:
+                self.api_token = await self.token_request
+            finally:
+                self.token_request = None
+        params = {'api_version': "1.0", 'api_token': self.api_token, 'input': '3', 'method': method}
+        while True:
+            result_json = json.loads(await self.client.request("POST", GW_URL, params=params, json=args))
+            if len(result_json['error']):
+                if (
+                    result_json['error'] == {"GATEWAY_ERROR": "invalid api token"} or
+                    result_json['error'] == {"VALID_TOKEN_REQUIRED": "Invalid CSRF token"}
+                ):
+                    self.api_token = await self.get_token()
+                    params['api_token'] = self.api_token
+                    continue
+                if result_json.get('payload', {}) and result_json['payload'].get('FALLBACK', {}):
+                    args.update(result_json['payload']['FALLBACK'])
+                    continue
+                raise GWAPIError(json.dumps(result_json['error']))
+            return result_json['results']
+
+    async def get_token(self):
+        params = {'api_version': "1.0", 'api_token': 'null', 'input': '3', 'method': 'deezer.getUserData'}
+        result_json = json.loads(await self.client.request("POST", GW_URL, params=params, json={}))
+        return result_json['results']['checkForm']
+
+    async def get_artist(self, art_id):
+        return await self.api_call('artist.getData', {'ART_ID': art_id})
+
+    async def get_artist_discography(self, art_id, index=0, limit=25):
+        return await self.api_call('album.getDiscography', {
+            'ART_ID': art_id,
+            "discography_mode": "all",
+            'nb': limit,
+            'nb_songs': 0,
+            'start': index
+        })
+
+    async def search(self, query, index=0, limit=10, suggest=True, artist_suggest=True, top_tracks=True):
+        return await self.api_call('deezer.pageSearch', {
+            "query": query,
+            "start": index,
+            "nb": limit,
+            "suggest": suggest,
+            "artist_suggest": artist_suggest,
+            "top_tracks": top_tracks
+        })
+
+
+class AsyncAPI:
+    """ Async counterpart of deezer.api.API for the calls used during refresh """
+
+    def __init__(self, client: 'AsyncDeezer'):
+        self.client = client
+
+    async def api_call(self, method, args=None):
+        params = {k: str(v) for k, v in (args or {}).items()}
+        result_json = json.loads(await self.client.request("GET", API_URL + method, params=params))
+        if 'error' in result_json.keys():
+            code = result_json['error'].get('code')
+            if code in [4, 700]:
+                raise QuotaExceeded(f"QuotaExceeded: {method} {result_json['error'].get('message', '')}")
+            if code in API_ERRORS:
+                raise API_ERRORS[code](f"{API_ERRORS[code].__name__}: {method} "
+                                       f"{result_json['error'].get('message', '')}")
+            raise APIError(json.dumps(result_json['error']))
+        return result_json
+
+    async def get_artist(self, artist_id):
+        return await self.api_call(f'artist/{str(artist_id)}')
+
+    async def get_artist_albums(self, artist_id, index=0, limit=-1):
+        return await self.api_call(f'artist/{str(artist_id)}/albums', {'index': index, 'limit': limit})
+
+    async def get_playlist(self, playlist_id):
+        return await self.api_call(f'playlist/{str(playlist_id)}')
+
+    async def get_playlist_tracks(self, playlist_id, index=0, limit=-1):
+        return await self.api_call(f'playlist/{str(playlist_id)}/tracks', {'index': index, 'limit': limit})
+
+    async def search_artist(self, query, index=0, limit=25):
+        return await self.api_call('search/artist', {'q': query, 'index': index, 'limit': limit})
+
+
+class AsyncDeezer:
+    """
+    Event loop running in a background thread that multiplexes requests over a
+    single pooled aiohttp session. The number of open connections is bounded
+    by `concurrency`, which acts as the concurrency budget for all requests.
+
+    Connection errors and quota responses are raised rather than retried here
+    so that PlatformAPI can apply its rate limiter and backoff.
+
+    Coroutines are scheduled with submit() which returns a
+    concurrent.futures.Future, so it can be used in place of a
+    ThreadPoolExecutor.
+    """
+
+    def __init__(self, dz: Deezer, concurrency: int):
+        self.dz = dz
+        self.concurrency = concurrency
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.session = None
+        self.gw = None
+        self.api = AsyncAPI(self)
+
+    def __enter__(self):
+        # The GW token is only requested once a GW call is made, as deezer.gw.GW does
+        self.gw = AsyncGW(self, self.dz.gw.api_token)
+        self.thread.start()
+        self.submit(self._open()).result()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.submit(self.session.close()).result()
+        # Worker threads used by PlatformAPI for response cache reads and writes
+        self.submit(self.loop.shutdown_default_executor()).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    async def _open(self):
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.dz.http_headers,
+            cookies=self.dz.session.cookies.get_dict(),
+            timeout=aiohttp.ClientTimeout(total=30),
+        )
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def request(self, method: str, url: str, **kwargs) -> str:
+        async with self.session.request(method, url, **kwargs) as resp:
+            return await resp.text()
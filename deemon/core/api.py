@@ -1,24 +1,62 @@
+import asyncio
+import hashlib
 import json
 import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 import deezer.errors
+import requests
 from deezer import Deezer
 
+from deemon.core import aioclient, ratelimit
+from deemon.core.cache import ResponseCache
 from deemon.core.config import Config as config
 
 logger = logging.getLogger(__name__)
 
+# Number of releases requested when checking a discography for changes
+DISCOGRAPHY_PAGE_SIZE = 25
+
+# Empty, throttled or failed responses that are worth retrying
+TRANSIENT_ERRORS = (json.decoder.JSONDecodeError, requests.exceptions.RequestException) + aioclient.transient_errors()
+
+# Errors handled by the endpoint methods, the GW and public API raise different ones
+ARTIST_ERRORS = (deezer.errors.GWAPIError, deezer.errors.DataException) + TRANSIENT_ERRORS
+DISCOGRAPHY_ERRORS = (deezer.errors.GWAPIError,) + TRANSIENT_ERRORS
+PLAYLIST_ERRORS = (deezer.errors.PermissionException, deezer.errors.DataException) + TRANSIENT_ERRORS
+
 
 class PlatformAPI:
 
+    # Shared by all instances so every request counts against the same budget
+    limiter = None
+
+    # Methods that can be dispatched to the async engine by map()
+    ASYNC_METHODS = {
+        'search_artist': '_search_artist_async',
+        'get_artist_by_id': '_get_artist_by_id_async',
+        'get_artist_albums': '_get_artist_albums_async',
+        'get_playlist': '_get_playlist_async',
+        'get_playlist_tracks': '_get_playlist_tracks_async',
+    }
+
     def __init__(self):
         self.max_threads = 2
         self.dz = Deezer()
         self.platform = self.get_platform()
         self.account_type = None
         self.api = self.set_platform()
-        
+        self.engine = self.get_engine()
+        self.concurrency = self.get_concurrency()
+        self.set_connection_pool()
+        self.cache = ResponseCache() if config.cache_enabled() else None
+        self.max_retries = max(config.fast_api_retries(), 0)
+        if PlatformAPI.limiter is None:
+            PlatformAPI.limiter = ratelimit.RateLimiter(self.get_max_rate())
+
         if config.check_account_status():
             self.account_type = self.get_account_type()
 
@@ -28,6 +66,158 @@ class PlatformAPI:
                 payload = ""
             logger.debug(f"DEBUG_MODE: {message} {str(payload)}")
             
+    def get_engine(self):
+        if config.fast_api_engine() == "async":
+            if aioclient.available():
+                return "async"
+            logger.warning("   [!] aiohttp is not installed, falling back to threads for API requests")
+        return "threads"
+
+    def get_concurrency(self):
+        if self.engine == "async":
+            concurrency = min(max(config.fast_api_concurrency(), 1), 500)
+            logger.debug(f"Using async engine, concurrency set to {concurrency}")
+            return concurrency
+        return self.max_threads
+
+    def get_max_rate(self):
+        max_rate = max(config.fast_api_rate_limit(), 1)
+        if self.platform == "deezer-api":
+            # Public API allows 50 requests per 5 seconds
+            max_rate = min(max_rate, 10)
+        logger.debug(f"API rate limit set to {max_rate} req/s")
+        return max_rate
+
+    def _call(self, func, *args, **kwargs):
+        """
+        Call func through the shared rate limiter, retrying transient errors
+        with jittered exponential backoff. The last error is raised once
+        max_retries has been exhausted.
+        """
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                result = func(*args, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                self.limiter.throttled()
+                if attempt >= self.max_retries:
+                    raise
+                delay = ratelimit.backoff(attempt)
+                logger.debug(f"{type(e).__name__} from API, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self.limiter.success()
+            return result
+
+    async def _acall(self, func, *args, **kwargs):
+        """ Async counterpart of _call """
+        attempt = 0
+        while True:
+            await self.limiter.acquire_async()
+            try:
+                result = await func(*args, **kwargs)
+            except TRANSIENT_ERRORS as e:
+                self.limiter.throttled()
+                if attempt >= self.max_retries:
+                    raise
+                delay = ratelimit.backoff(attempt)
+                logger.debug(f"{type(e).__name__} from API, retrying in {delay:.1f}s ({attempt + 1}/{self.max_retries})")
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self.limiter.success()
+            return result
+
+    def _cached_call(self, endpoint: str, func, *args, **kwargs):
+        """
+        Like _call but the response is served from the response cache while its
+        TTL for this endpoint type has not expired. If the API keeps failing,
+        an expired entry is returned instead.
+        """
+        if not self.cache:
+            return self._call(func, *args, **kwargs)
+        key, result = self._cache_lookup(endpoint, func, args, kwargs)
+        if result is not None:
+            return result
+        try:
+            result = self._call(func, *args, **kwargs)
+        except TRANSIENT_ERRORS:
+            result = self._stale_response(endpoint, key)
+            if result is None:
+                raise
+            return result
+        self.cache.set(endpoint, key, result)
+        return result
+
+    async def _acached_call(self, endpoint: str, func, *args, **kwargs):
+        """
+        Async counterpart of _cached_call, the cache is read and written from a
+        worker thread so the event loop is not blocked on sqlite
+        """
+        if not self.cache:
+            return await self._acall(func, *args, **kwargs)
+        key, result = await asyncio.to_thread(self._cache_lookup, endpoint, func, args, kwargs)
+        if result is not None:
+            return result
+        try:
+            result = await self._acall(func, *args, **kwargs)
+        except TRANSIENT_ERRORS:
+            result = await asyncio.to_thread(self._stale_response, endpoint, key)
+            if result is None:
+                raise
+            return result
+        await asyncio.to_thread(self.cache.set, endpoint, key, result)
+        return result
+
+    def _cache_lookup(self, endpoint: str, func, args: tuple, kwargs: dict):
+        """ Return the cache key of the call and its cached response if it has not expired """
+        key = self.cache.make_key(func, args, kwargs)
+        return key, self.cache.get(endpoint, key)
+
+    def _stale_response(self, endpoint: str, key: str):
+        """ Return the expired cache entry for key to use while the API is unavailable, if any """
+        result = self.cache.get(endpoint, key, allow_stale=True)
+        if result is not None:
+            logger.debug(f"API unavailable, using expired cache entry for {key}")
+        return result
+
+    def _async_client(self, client):
+        """ Return the GW or public API client of AsyncDeezer, like self.api """
+        if self.platform == "deezer-gw":
+            return client.gw
+        return client.api
+
+    def map(self, func, items: list):
+        """
+        Yield func(item) for each item, in order, as results become available.
+        At most twice the concurrency budget is kept in flight so callers can
+        process results without holding the entire result set in memory.
+
+        When the async engine is enabled and func has an async counterpart,
+        requests are multiplexed over a single pooled aiohttp session instead
+        of a thread pool.
+        """
+        window = self.concurrency * 2
+        async_name = self.ASYNC_METHODS.get(getattr(func, '__name__', None))
+        if self.engine == "async" and async_name:
+            executor = aioclient.AsyncDeezer(self.dz, self.concurrency)
+            async_func = getattr(self, async_name)
+            submit = lambda item: executor.submit(async_func(executor, item))
+        else:
+            executor = ThreadPoolExecutor(max_workers=self.max_threads)
+            submit = lambda item: executor.submit(func, item)
+
+        pending = deque()
+        with executor:
+            for item in items:
+                pending.append(submit(item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
     def get_platform(self):
         if config.fast_api():
             return "deezer-gw"
@@ -46,6 +236,15 @@ class PlatformAPI:
         else:
             return self.dz.api
         
+    def set_connection_pool(self):
+        """
+        Size the connection pool of the shared session so that every worker
+        thread can keep its own connection alive instead of reconnecting
+        """
+        adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=self.max_threads)
+        self.dz.session.mount("https://", adapter)
+        self.dz.session.mount("http://", adapter)
+
     def get_account_type(self):
         logger.debug("Verifying ARL...")
         temp_dz = Deezer()
@@ -69,23 +268,39 @@ class PlatformAPI:
         """
         Return a list of dictionaries from API containing {'id': int, 'name': str}
         """
+        func, kwargs = self._search_artist_request(self.api, query, limit)
+        try:
+            result = self._cached_call('search', func, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            return self.search_artist_error(query, e)
+        return self.parse_artist_search(query, result, limit)
+
+    async def _search_artist_async(self, client, query: str, limit: int = 5):
+        func, kwargs = self._search_artist_request(self._async_client(client), query, limit)
+        try:
+            result = await self._acached_call('search', func, **kwargs)
+        except TRANSIENT_ERRORS as e:
+            return self.search_artist_error(query, e)
+        return self.parse_artist_search(query, result, limit)
+
+    def _search_artist_request(self, client, query: str, limit: int):
+        """ Return the artist search method of client (GW or public API) and its arguments """
         if self.platform == "deezer-gw":
-            api_result = []
-            try:
-                logger.info(f"Searching for {query}, please wait...")
-                result = self.api.search(query=query)['ARTIST']['data'][:limit]
-            except json.decoder.JSONDecodeError:
-                logger.error(f"   [!] Empty response from API while searching for artist {query}, retrying...")
-                try:
-                    result = self.api.search(query=query)['ARTIST']['data'][:limit]
-                except json.decoder.JSONDecodeError:
-                    logger.error(f"   [!] API still sending empty response while searching for artist {query}")
-                    return []
-            for r in result:
-                api_result.append({'id': int(r['ART_ID']), 'name': r['ART_NAME']})
-        else:
-            api_result = self.api.search_artist(query=query, limit=limit)['data']
+            logger.info(f"Searching for {query}, please wait...")
+            return client.search, {'query': query}
+        return client.search_artist, {'query': query, 'limit': limit}
 
+    def search_artist_error(self, query: str, e: Exception):
+        if self.platform != "deezer-gw":
+            raise e
+        logger.error(f"   [!] No valid response from API while searching for artist {query}: {e}")
+        return []
+
+    def parse_artist_search(self, query: str, result: dict, limit: int) -> dict:
+        if self.platform == "deezer-gw":
+            api_result = [{'id': int(r['ART_ID']), 'name': r['ART_NAME']} for r in result['ARTIST']['data'][:limit]]
+        else:
+            api_result = result['data']
         return {'query': query, 'results': api_result}
 
     def search_album(self, query: str, limit: int = 5):
@@ -96,18 +311,14 @@ class PlatformAPI:
             api_result = []
             try:
                 logger.info(f"Searching for album '{query}', please wait...")
-                result = self.api.search(query=query)['ALBUM']['data'][:limit]
-            except json.decoder.JSONDecodeError:
-                logger.error(f"   [!] Empty response from API while searching for album {query}, retrying...")
-                try:
-                    result = self.api.search(query=query)['ALBUM']['data'][:limit]
-                except json.decoder.JSONDecodeError:
-                    logger.error(f"   [!] API still sending empty response while searching for album {query}")
-                    return []
+                result = self._cached_call('search', self.api.search, query=query)['ALBUM']['data'][:limit]
+            except TRANSIENT_ERRORS as e:
+                logger.error(f"   [!] No valid response from API while searching for album {query}: {e}")
+                return []
             for r in result:
                 api_result.append({'id': int(r['ALB_ID']), 'title': r['ALB_TITLE'], 'artist': {'name': r['ART_NAME']}})
         else:
-            api_result = self.api.search_album(query=query, limit=limit)['data']
+            api_result = self._cached_call('search', self.api.search_album, query=query, limit=limit)['data']
 
         return {'query': query, 'results': api_result}
 
@@ -115,39 +326,46 @@ class PlatformAPI:
         """
         Return a dictionary from API containing {'id': int, 'name': str}
         """
+        try:
+            result = self._cached_call('artist', self.api.get_artist, query)
+        except ARTIST_ERRORS as e:
+            self.artist_error(query, e)
+            return
+        return self.parse_artist(result)
+
+    async def _get_artist_by_id_async(self, client, query: int):
+        try:
+            result = await self._acached_call('artist', self._async_client(client).get_artist, query)
+        except ARTIST_ERRORS as e:
+            self.artist_error(query, e)
+            return
+        return self.parse_artist(result)
+
+    @staticmethod
+    def artist_error(query: int, e: Exception):
+        if isinstance(e, TRANSIENT_ERRORS):
+            logger.error(f"   [!] No valid response from API for artist ID {query}: {e}")
+        elif isinstance(e, deezer.errors.GWAPIError):
+            logger.debug(f"API error on artist ID {query}: {e}")
+        else:
+            logger.debug(f"API error: {e}")
+
+    def parse_artist(self, result: dict) -> dict:
         if self.platform == "deezer-gw":
-            try:
-                result = self.api.get_artist(query)
-            except deezer.errors.GWAPIError as e:
-                logger.debug(f"API error on artist ID {query}: {e}")
-                return
-            except json.decoder.JSONDecodeError:
-                logger.error(f"   [!] Empty response from API while getting data for artist ID {query}, retrying...")
-                try:
-                    result = self.api.get_artist(query)
-                except json.decoder.JSONDecodeError:
-                    logger.error(f"   [!] API still sending empty response for artist ID {query}")
-                    return
             return {'id': int(result['ART_ID']), 'name': result['ART_NAME']}
-        else:
-            try:
-                result = self.api.get_artist(query)
-            except deezer.errors.DataException as e:
-                logger.debug(f"API error: {e}")
-                return
-            return {'id': result['id'], 'name': result['name']}
-        
+        return {'id': result['id'], 'name': result['name']}
+
     def get_album(self, query: int) -> dict:
         """Return a dictionary from API containing album info"""
         try:
-            albumAPI_gw_page = self.dz.gw.get_album_page(query)
+            albumAPI_gw_page = self._cached_call('album', self.dz.gw.get_album_page, query)
             if 'DATA' in albumAPI_gw_page:
                 from deezer.utils import map_album
                 albumAPI = map_album(albumAPI_gw_page['DATA'])
                 link_id = albumAPI_gw_page['DATA']['ALB_ID']
-                albumAPI_new = self.dz.api.get_album(link_id)
+                albumAPI_new = self._cached_call('album', self.dz.api.get_album, link_id)
                 albumAPI.update(albumAPI_new)
-                albumAPI_gw = self.dz.gw.get_album(link_id)
+                albumAPI_gw = self._cached_call('album', self.dz.gw.get_album, link_id)
                 albumAPI_gw = map_album(albumAPI_gw)
                 albumAPI_gw.update(albumAPI)
                 return albumAPI_gw
@@ -157,7 +375,7 @@ class PlatformAPI:
             logger.debug(f"   [!] GW API error for album ID {query}: {e}, trying public API")
         
         try:
-            result = self.dz.api.get_album(query)
+            result = self._cached_call('album', self.dz.api.get_album, query)
             return result
         except Exception as e:
             logger.error(f"   [!] Failed to retrieve album ID {query}: {e}")
@@ -166,18 +384,18 @@ class PlatformAPI:
     def get_track(self, query: int) -> dict:
         """Return a dictionary from API containing track info"""
         try:
-            trackAPI_gw = self.dz.gw.get_track(query)
+            trackAPI_gw = self._cached_call('track', self.dz.gw.get_track, query)
             from deezer.utils import map_track
             trackAPI = map_track(trackAPI_gw)
             track_id = trackAPI_gw['SNG_ID']
-            trackAPI_new = self.dz.api.get_track(track_id)
+            trackAPI_new = self._cached_call('track', self.dz.api.get_track, track_id)
             trackAPI.update(trackAPI_new)
             return trackAPI
         except Exception as e:
             logger.debug(f"   [!] GW API error for track ID {query}: {e}, trying public API")
         
         try:
-            result = self.dz.api.get_track(query)
+            result = self._cached_call('track', self.dz.api.get_track, query)
             return result
         except Exception as e:
             logger.error(f"   [!] Failed to retrieve track ID {query}: {e}")
@@ -186,11 +404,11 @@ class PlatformAPI:
     def get_extra_release_info(self, query: dict):
         album = {'id': query['album_id'], 'label': None}
         if self.platform == "deezer-gw":
-            album_details = self.api.get_album(query['album_id'])
+            album_details = self._cached_call('album', self.api.get_album, query['album_id'])
             if album_details.get('LABEL_NAME'):
                 album['label'] = album_details['LABEL_NAME']
         else:
-            album_details = self.api.get_album(query['album_id'])
+            album_details = self._cached_call('album', self.api.get_album, query['album_id'])
             if album_details.get('label'):
                 album['label'] = album_details['label']
         
@@ -201,131 +419,240 @@ class PlatformAPI:
         Return a list of dictionaries from API containing
         """
         self.debugger(f"Refreshing artist releases for {query['artist_name']} ({query['artist_id']})")
+        try:
+            response = self._fetch_discography(self.api, query, limit)
+        except DISCOGRAPHY_ERRORS as e:
+            self.discography_error(query, e)
+            query['releases'] = []
+            return query
+        query['releases'] = self.parse_releases(query, response['data'])
+        return query
+
+    async def _get_artist_albums_async(self, client, query: dict, limit: int = -1):
+        self.debugger(f"Refreshing artist releases for {query['artist_name']} ({query['artist_id']})")
+        try:
+            response = await self._afetch_discography(self._async_client(client), query, limit)
+        except DISCOGRAPHY_ERRORS as e:
+            self.discography_error(query, e)
+            query['releases'] = []
+            return query
+        query['releases'] = self.parse_releases(query, response['data'])
+        return query
+
+    def _discography_request(self, client, query: dict):
+        """ Return the discography method of client (GW or public API) and its arguments """
         if self.platform == "deezer-gw":
-            try:
-                result = self.api.get_artist_discography(art_id=query['artist_id'], limit=limit)['data']
-            except deezer.errors.GWAPIError as e:
-                if "UNKNOWN" in str(e):
-                    logger.debug(e)
-                    logger.warning(f"   [!] Artist discography is not available for "
-                                 f"{query['artist_name']} ({query['artist_id']})")
-                else:
-                    logger.debug(e)
-                    logger.error(f"An error occured while attempting to get the discography for "
-                                 f"{query['artist_name']} ({query['artist_id']})")
-                query['releases'] = []
-                return query
-            except json.decoder.JSONDecodeError:
-                logger.error(f"   [!] Empty response from API while getting data for discography for {query['artist_name']}, retrying...")
-                try:
-                    result = self.api.get_artist_discography(art_id=query['artist_id'], limit=limit)['data']
-                except json.decoder.JSONDecodeError:
-                    logger.error(f"   [!] API still sending empty response for discography for {query['artist_name']}")
-                    query['releases'] = []
-                    return query
-            api_result = []
-            for r in result:
-                # Remove ID check to get compilations
-                if (r['ART_ID'] == str(query['artist_id']) and r['ARTISTS_ALBUMS_IS_OFFICIAL']) or (r['ART_ID'] == str(query['artist_id']) and config.allow_unofficial()) or config.allow_compilations():
-                    # TYPE 0 - single, TYPE 1 - album, TYPE 2 - compilation, TYPE 3 - ep
-                    if r['TYPE'] == '0':
-                        r['TYPE'] = "single"
-                    elif r['TYPE'] == '1' and r['ART_ID'] != str(query['artist_id']):
-                        if not config.allow_featured_in():
-                            logger.debug(f"Featured In for {query['artist_name']} detected but are disabled in config")
-                            continue
-                        else:
-                            logger.debug(f"Featured In detected for artist {query['artist_name']}: {r['ALB_TITLE']}")
-                            r['TYPE'] = "album"
-                            # TODO set unique r['TYPE'] for FEATURED IN
-                    elif r['TYPE'] == '2':
-                        if not config.allow_compilations():
-                            logger.debug(f"Compilation for {query['artist_name']} detected but are disabled in config")
-                            continue
-                        else:
-                            logger.debug(f"Compilation detected for artist {query['artist_name']}: {r['ALB_TITLE']}")
-                            r['TYPE'] = "album"
-                            # TODO set unique r['TYPE'] for COMPILATIONS
-                    elif r['TYPE'] == '3':
-                        r['TYPE'] = "ep"
-                    else:
-                        r['TYPE'] = "album"
+            return client.get_artist_discography, {'art_id': query['artist_id']}
+        return client.get_artist_albums, {'artist_id': query['artist_id']}
 
-                    if r['ORIGINAL_RELEASE_DATE'] != "0000-00-00":
-                        release_date = r['ORIGINAL_RELEASE_DATE']
-                    elif r['PHYSICAL_RELEASE_DATE'] != "0000-00-00":
-                        release_date = r['PHYSICAL_RELEASE_DATE']
-                    elif r['DIGITAL_RELEASE_DATE'] != "0000-00-00":
-                        release_date = r['DIGITAL_RELEASE_DATE']
-                    else:
-                        # In the event of an unknown release date, set it to today's date
-                        # See album ID: 417403
-                        logger.warning(f"   [!] Found release without release date, assuming today: "
-                                       f"{query['artist_name']} - {r['ALB_TITLE']}")
-                        release_date = datetime.strftime(datetime.today(), "%Y-%m-%d")
-                    
-                    cover_art = f"https://e-cdns-images.dzcdn.net/images/cover/{r['ALB_PICTURE']}/500x500-00000-80-0-0.jpg"
-                    album_url = f"https://www.deezer.com/album/{r['ALB_ID']}"
-                    
-                    api_result.append(
-                        {
-                            'id': int(r['ALB_ID']),
-                            'title': r['ALB_TITLE'],
-                            'release_date': release_date,
-                            'explicit_lyrics': r['EXPLICIT_ALBUM_CONTENT']['EXPLICIT_LYRICS_STATUS'],
-                            'record_type': r['TYPE'],
-                            'cover_big': cover_art,
-                            'link': album_url,
-                            'nb_tracks': r['NUMBER_TRACK'],
-                            }
-                    )
+    def _fetch_discography(self, client, query: dict, limit: int) -> dict:
+        """
+        Fetch the discography of a monitored artist. If the artist has a
+        watermark, only the first page is requested and the full discography
+        is only fetched when that page or the release total has changed.
+        """
+        func, kwargs = self._discography_request(client, query)
+        if limit == -1 and self.use_incremental(query):
+            page = self._call(func, limit=DISCOGRAPHY_PAGE_SIZE, **kwargs)
+            if self.first_page_unchanged(query, page):
+                return page
+        response = self._call(func, limit=limit, **kwargs)
+        self.record_full_fetch(query, response, limit)
+        return response
+
+    async def _afetch_discography(self, client, query: dict, limit: int) -> dict:
+        """ Async counterpart of _fetch_discography """
+        func, kwargs = self._discography_request(client, query)
+        if limit == -1 and self.use_incremental(query):
+            page = await self._acall(func, limit=DISCOGRAPHY_PAGE_SIZE, **kwargs)
+            if self.first_page_unchanged(query, page):
+                return page
+        response = await self._acall(func, limit=limit, **kwargs)
+        self.record_full_fetch(query, response, limit)
+        return response
+
+    def first_page_unchanged(self, query: dict, page: dict) -> bool:
+        """ Whether the full discography can be skipped, storing the new watermark if so """
+        if not self.discography_unchanged(query, page):
+            return False
+        self.debugger(f"Discography unchanged for {query['artist_name']} ({query['artist_id']})")
+        query['watermark'] = self.discography_watermark(query, page, full=False)
+        return True
+
+    def record_full_fetch(self, query: dict, response: dict, limit: int):
+        if limit == -1:
+            query['watermark'] = self.discography_watermark(query, response, full=True)
+
+    @staticmethod
+    def use_incremental(query: dict) -> bool:
+        if not config.incremental_refresh() or not query.get('release_hash'):
+            return False
+        last_full = query.get('last_full_refresh') or 0
+        return time.time() - last_full < config.full_refresh_interval() * 86400
+
+    @staticmethod
+    def discography_filters(query: dict) -> str:
+        """ Settings that decide which releases of a discography are kept """
+        record_type = query.get('record_type') or config.record_type()
+        return json.dumps([record_type, config.allow_featured_in(), config.allow_compilations(),
+                           config.allow_unofficial()])
+
+    def discography_hash(self, query: dict, data: list) -> str:
+        """
+        Hash of the album IDs on the first page of a discography and the
+        settings that filter it, so changing those forces a full fetch
+        """
+        ids = sorted(str(r.get('ALB_ID', r.get('id'))) for r in data[:DISCOGRAPHY_PAGE_SIZE])
+        return hashlib.sha1((self.discography_filters(query) + ",".join(ids)).encode()).hexdigest()
+
+    def discography_unchanged(self, query: dict, page: dict) -> bool:
+        return (page.get('total') == query.get('release_total')
+                and self.discography_hash(query, page['data']) == query.get('release_hash'))
+
+    def discography_watermark(self, query: dict, response: dict, full: bool) -> dict:
+        return {
+            'artist_id': query['artist_id'],
+            'total': response.get('total', len(response['data'])),
+            'hash': self.discography_hash(query, response['data']),
+            'last_full': int(time.time()) if full else None,
+        }
+
+    @staticmethod
+    def discography_error(query: dict, e: Exception):
+        logger.debug(e)
+        if isinstance(e, TRANSIENT_ERRORS):
+            logger.error(f"   [!] No valid response from API for discography of "
+                         f"{query['artist_name']} ({query['artist_id']}): {e}")
+        elif "UNKNOWN" in str(e):
+            logger.warning(f"   [!] Artist discography is not available for "
+                           f"{query['artist_name']} ({query['artist_id']})")
         else:
-            api_result = self.api.get_artist_albums(artist_id=query['artist_id'], limit=limit)['data']
+            logger.error(f"An error occured while attempting to get the discography for "
+                         f"{query['artist_name']} ({query['artist_id']})")
 
-        query['releases'] = api_result
-        return query
+    def parse_releases(self, query: dict, result: list) -> list:
+        """ Releases in the public API format, only GW data needs converting """
+        if self.platform == "deezer-gw":
+            return self.parse_discography(query, result)
+        return result
 
     @staticmethod
-    def get_playlist(query: int):
+    def parse_discography(query: dict, result: list) -> list:
+        """
+        Convert GW discography data to the release format used by the public API
+        """
+        api_result = []
+        for r in result:
+            # Remove ID check to get compilations
+            if (r['ART_ID'] == str(query['artist_id']) and r['ARTISTS_ALBUMS_IS_OFFICIAL']) or (r['ART_ID'] == str(query['artist_id']) and config.allow_unofficial()) or config.allow_compilations():
+                # TYPE 0 - single, TYPE 1 - album, TYPE 2 - compilation, TYPE 3 - ep
+                if r['TYPE'] == '0':
+                    r['TYPE'] = "single"
+                elif r['TYPE'] == '1' and r['ART_ID'] != str(query['artist_id']):
+                    if not config.allow_featured_in():
+                        logger.debug(f"Featured In for {query['artist_name']} detected but are disabled in config")
+                        continue
+                    else:
+                        logger.debug(f"Featured In detected for artist {query['artist_name']}: {r['ALB_TITLE']}")
+                        r['TYPE'] = "album"
+                        # TODO set unique r['TYPE'] for FEATURED IN
+                elif r['TYPE'] == '2':
+                    if not config.allow_compilations():
+                        logger.debug(f"Compilation for {query['artist_name']} detected but are disabled in config")
+                        continue
+                    else:
+                        logger.debug(f"Compilation detected for artist {query['artist_name']}: {r['ALB_TITLE']}")
+                        r['TYPE'] = "album"
+                        # TODO set unique r['TYPE'] for COMPILATIONS
+                elif r['TYPE'] == '3':
+                    r['TYPE'] = "ep"
+                else:
+                    r['TYPE'] = "album"
+
+                if r['ORIGINAL_RELEASE_DATE'] != "0000-00-00":
+                    release_date = r['ORIGINAL_RELEASE_DATE']
+                elif r['PHYSICAL_RELEASE_DATE'] != "0000-00-00":
+                    release_date = r['PHYSICAL_RELEASE_DATE']
+                elif r['DIGITAL_RELEASE_DATE'] != "0000-00-00":
+                    release_date = r['DIGITAL_RELEASE_DATE']
+                else:
+                    # In the event of an unknown release date, set it to today's date
+                    # See album ID: 417403
+                    logger.warning(f"   [!] Found release without release date, assuming today: "
+                                   f"{query['artist_name']} - {r['ALB_TITLE']}")
+                    release_date = datetime.strftime(datetime.today(), "%Y-%m-%d")
+                
+                cover_art = f"https://e-cdns-images.dzcdn.net/images/cover/{r['ALB_PICTURE']}/500x500-00000-80-0-0.jpg"
+                album_url = f"https://www.deezer.com/album/{r['ALB_ID']}"
+                
+                api_result.append(
+                    {
+                        'id': int(r['ALB_ID']),
+                        'title': r['ALB_TITLE'],
+                        'release_date': release_date,
+                        'explicit_lyrics': r['EXPLICIT_ALBUM_CONTENT']['EXPLICIT_LYRICS_STATUS'],
+                        'record_type': r['TYPE'],
+                        'cover_big': cover_art,
+                        'link': album_url,
+                        'nb_tracks': r['NUMBER_TRACK'],
+                        }
+                )
+        return api_result
+
+    def get_playlist(self, query: int):
         try:
-            api_result = Deezer().api.get_playlist(query)
-        except deezer.errors.PermissionException:
-            logger.warning(f"   [!] Permission Denied: Playlist {query} is private")
+            api_result = self._call(self.dz.api.get_playlist, query)
+        except PLAYLIST_ERRORS as e:
+            self.playlist_error(query, e)
             return
-        except deezer.errors.DataException:
-            logger.warning(f"   [!] Playlist ID {query} was not found")
+        return self.parse_playlist(query, api_result)
+
+    def get_playlist_tracks(self, query: dict):
+        try:
+            api_result = self._call(self.dz.api.get_playlist_tracks, query['id'])
+        except PLAYLIST_ERRORS as e:
+            self.playlist_error(query, e)
             return
-        except json.decoder.JSONDecodeError:
-            logger.error(f"   [!] Empty response from API while getting data for playlist ID {query}, retrying...")
-            try:
-                api_result = Deezer().api.get_playlist(query)
-            except json.decoder.JSONDecodeError:
-                logger.error(f"   [!] API still sending empty response while getting data for playlist ID {query}")
-                return
-        return {'id': query, 'title': api_result['title'],
-                'link': f"https://deezer.com/playlist/{str(api_result['id'])}"}
+        return self.parse_playlist_tracks(query, api_result)
 
-    @staticmethod
-    def get_playlist_tracks(query: dict):
-        track_list = []
+    async def _get_playlist_async(self, client, query: int):
         try:
-            api_result = Deezer().api.get_playlist_tracks(query['id'])
-        except deezer.errors.PermissionException:
-            logger.warning(f"   [!] Permission Denied: Playlist {query['title']} ({query['id']}) is private")
+            api_result = await self._acall(client.api.get_playlist, query)
+        except PLAYLIST_ERRORS as e:
+            self.playlist_error(query, e)
             return
-        except deezer.errors.DataException:
-            logger.warning(f"   [!] Playlist ID {query} was not found")
+        return self.parse_playlist(query, api_result)
+
+    async def _get_playlist_tracks_async(self, client, query: dict):
+        try:
+            api_result = await self._acall(client.api.get_playlist_tracks, query['id'])
+        except PLAYLIST_ERRORS as e:
+            self.playlist_error(query, e)
             return
-        except json.decoder.JSONDecodeError:
-            logger.error(f"   [!] Empty response from API while getting data for playlist ID {query['id']}")
-            try:
-                api_result = Deezer().api.get_playlist_tracks(query['id'])
-            except json.decoder.JSONDecodeError:
-                logger.error(f"   [!] API still sending empty response while getting data for playlist ID {query['id']}")
-                return
-        for track in api_result['data']:
-            track_list.append({'id': track['id'], 'title': track['title'],
-                               'artist_id': track['artist']['id'],
-                               'artist_name': track['artist']['name']})
-        query['tracks'] = track_list
+        return self.parse_playlist_tracks(query, api_result)
+
+    @staticmethod
+    def playlist_error(query, e: Exception):
+        """ Log why a playlist (ID, or dict with its ID and title) could not be retrieved """
+        if isinstance(query, dict):
+            playlist_id, playlist = query['id'], f"{query['title']} ({query['id']})"
+        else:
+            playlist_id, playlist = query, query
+        if isinstance(e, deezer.errors.PermissionException):
+            logger.warning(f"   [!] Permission Denied: Playlist {playlist} is private")
+        elif isinstance(e, deezer.errors.DataException):
+            logger.warning(f"   [!] Playlist ID {playlist_id} was not found")
+        else:
+            logger.error(f"   [!] No valid response from API for playlist ID {playlist_id}: {e}")
+
+    @staticmethod
+    def parse_playlist(query: int, api_result: dict) -> dict:
+        return {'id': query, 'title': api_result['title'],
+                'link': f"https://deezer.com/playlist/{str(api_result['id'])}"}
+
+    @staticmethod
+    def parse_playlist_tracks(query: dict, api_result: dict) -> dict:
+        query['tracks'] = [{'id': track['id'], 'title': track['title'],
+                            'artist_id': track['artist']['id'],
+                            'artist_name': track['artist']['name']} for track in api_result['data']]
         return query
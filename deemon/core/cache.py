@@ -0,0 +1,96 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from deemon.core.config import Config as config
+from deemon.utils import startup
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Persistent cache of API responses stored in cache.db next to deemon.db.
+
+    Entries expire after a TTL that depends on the endpoint type (artist,
+    album, track, search). Expired entries are kept until evicted so they can
+    be served when the API is unavailable. When the cache grows beyond
+    max_size, the least recently used entries are removed.
+    """
+
+    # Evict down to this fraction of max_size to avoid evicting on every insert
+    EVICT_TARGET = 0.9
+
+    def __init__(self):
+        self.ttl = {
+            'artist': config.cache_ttl('artist') * 3600,
+            'album': config.cache_ttl('album') * 3600,
+            'track': config.cache_ttl('track') * 3600,
+            'search': config.cache_ttl('search') * 3600,
+        }
+        self.max_size = config.cache_max_size() * 1024 * 1024
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(startup.get_cache_database(), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS cache ("
+                          "'key' TEXT PRIMARY KEY,"
+                          "'endpoint' TEXT,"
+                          "'value' TEXT,"
+                          "'created' REAL,"
+                          "'accessed' REAL,"
+                          "'size' INTEGER)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS 'idx_accessed' ON 'cache' ('accessed')")
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(func, args: tuple, kwargs: dict) -> str:
+        """ Build a key from the client class (GW/API) and call arguments """
+        name = func.__qualname__.replace("Async", "")
+        return f"{name}:{json.dumps([args, kwargs], sort_keys=True, default=str)}"
+
+    def get(self, endpoint: str, key: str, allow_stale: bool = False):
+        with self.lock:
+            row = self.conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if not row:
+                return
+            value, created = row
+            if not allow_stale and time.time() - created > self.ttl[endpoint]:
+                return
+            self.conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return json.loads(value)
+
+    def set(self, endpoint: str, key: str, value):
+        data = json.dumps(value, default=str)
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self.size -= previous[0]
+            self.conn.execute("INSERT OR REPLACE INTO cache (key, endpoint, value, created, accessed, size) "
+                              "VALUES (?, ?, ?, ?, ?, ?)", (key, endpoint, data, now, now, len(data)))
+            self.size += len(data)
+            if self.size > self.max_size:
+                self.evict()
+            self.conn.commit()
+
+    def evict(self):
+        """ Remove least recently used entries until below EVICT_TARGET of max_size """
+        target = self.max_size * self.EVICT_TARGET
+        removed = 0
+        for key, size in self.conn.execute("SELECT key, size FROM cache ORDER BY accessed").fetchall():
+            if self.size <= target:
+                break
+            self.conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self.size -= size
+            removed += 1
+        logger.debug(f"Evicted {removed} entries from response cache")
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM cache")
+            self.conn.commit()
+            self.size = 0
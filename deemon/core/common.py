@@ -4,27 +4,135 @@ from deemon.core.config import Config as config
 
 logger = logging.getLogger(__name__)
 
+# First bracketed part of a title, e.g. "(Deluxe Edition)" or "[Live]"
+KEYWORD_SECTION = re.compile(r'\(([^)]+)\)|\[([^)]+)]')
+# Leading inline flags such as (?i), which must be scoped to be merged
+GLOBAL_FLAGS = re.compile(r'^\(\?([imsx]+)\)')
+# Group references would point at the wrong group once patterns are merged
+BACKREFERENCE = re.compile(r'\\[1-9]|\(\?P=|\\g<')
 
-def exclude_filtered_versions(albums: list) -> list:
-    """ Remove album versions containing specified text """
-    exclusion_patterns = config.exclusion_patterns()
-    exclusion_keywords = config.exclusion_keywords()
-    allowed = []
-
-    if exclusion_keywords or exclusion_patterns:
-        for album in albums:
-            album_title = album['title']
-            exclusion_pattern_match = [p for p in exclusion_patterns if re.search(p, album_title)]
-            keyword_search = re.search(r'\(([^)]+)\)|\[([^)]+)]', album_title.lower())
-            exclusion_keyword_match = [e for e in exclusion_keywords if keyword_search and e in keyword_search.group()]
-            result = exclusion_pattern_match + exclusion_keyword_match
-            result = '", "'.join(result)
-
-            if exclusion_keyword_match or exclusion_pattern_match:
-                logger.info(f"    Album \"{album_title}\" excluded by filter: \"{result}\"")
+
+class ExclusionFilter:
+    """
+    Exclusion patterns and keywords compiled once from the config.
+
+    All patterns are merged into a single alternation and all keywords into
+    a single escaped alternation that is searched for in the first bracketed
+    part of the lowercased title, so each title is scanned once per rule
+    type. Results are memoized by title since the same titles (and
+    duplicates across editions) are checked on every refresh.
+    """
+
+    MEMO_SIZE = 100_000
+
+    def __init__(self, patterns: list, keywords: list):
+        self.patterns = list(patterns)
+        self.keywords = list(keywords)
+        self.compiled_patterns = [re.compile(p) for p in self.patterns]
+        self.pattern_re, self.separate_patterns = self._merge(self.patterns, self.compiled_patterns)
+        self.keyword_re = re.compile('|'.join(re.escape(k) for k in self.keywords)) if self.keywords else None
+        self.memo = {}
+
+    @staticmethod
+    def _merge(patterns: list, compiled: list):
+        """
+        Combine patterns into one regex. Returns the merged regex (or None) and
+        the compiled patterns that have to be checked on their own.
+        """
+        mergeable, separate = [], []
+        for pattern, compiled_pattern in zip(patterns, compiled):
+            if BACKREFERENCE.search(pattern):
+                separate.append(compiled_pattern)
                 continue
+            flags = GLOBAL_FLAGS.match(pattern)
+            if flags:
+                mergeable.append(f"(?{flags.group(1)}:{pattern[flags.end():]})")
             else:
-                allowed.append(album)
-        return allowed
-    else:
-        return albums
+                mergeable.append(f"(?:{pattern})")
+        if not mergeable:
+            return None, separate
+        try:
+            return re.compile('|'.join(mergeable)), separate
+        except re.error:
+            logger.debug("Exclusion patterns could not be merged, they will be checked one at a time")
+            return None, compiled
+
+    def __bool__(self):
+        return bool(self.patterns or self.keywords)
+
+    def match(self, title: str) -> list:
+        """ Return the patterns and keywords that exclude this title """
+        try:
+            return self.memo[title]
+        except KeyError:
+            pass
+
+        result = []
+        if self.patterns:
+            if ((self.pattern_re and self.pattern_re.search(title))
+                    or any(c.search(title) for c in self.separate_patterns)):
+                # Only titles that match something pay for finding which patterns did
+                result = [p for p, c in zip(self.patterns, self.compiled_patterns) if c.search(title)]
+        if self.keyword_re:
+            section = KEYWORD_SECTION.search(title.lower())
+            if section and self.keyword_re.search(section.group()):
+                result += [k for k in self.keywords if k in section.group()]
+
+        if len(self.memo) >= self.MEMO_SIZE:
+            self.memo.clear()
+        self.memo[title] = result
+        return result
+
+    def is_excluded(self, title: str) -> bool:
+        result = self.match(title)
+        if result:
+            matches = '", "'.join(result)
+            logger.info(f"    Album \"{title}\" excluded by filter: \"{matches}\"")
+            return True
+        return False
+
+    def filter(self, albums: list) -> list:
+        """ Remove album versions matching an exclusion from a list of albums/releases """
+        if not self:
+            return albums
+        return [album for album in albums if not self.is_excluded(album['title'])]
+
+
+def title_key(title: str) -> str:
+    """ Normalized title used to match versions (explicit/clean) of the same release """
+    return ' '.join(title.casefold().split())
+
+
+def explicit_index(releases: list) -> dict:
+    """ Map each normalized title in a discography to the first explicit release with that title """
+    index = {}
+    for release in releases:
+        if release['explicit_lyrics'] == 1:
+            index.setdefault(title_key(release['title']), release['id'])
+    return index
+
+
+def group_by_title(albums: list, key: str = 'title') -> dict:
+    """ Map each normalized title in a discography to its albums, keeping their order """
+    index = {}
+    for album in albums:
+        index.setdefault(title_key(album[key]), []).append(album)
+    return index
+
+
+_exclusion_filter = None
+
+
+def exclusion_filter() -> ExclusionFilter:
+    """ ExclusionFilter for the current config, rebuilt only when the exclusions change """
+    global _exclusion_filter
+    patterns, keywords = config.exclusion_patterns(), config.exclusion_keywords()
+    if (_exclusion_filter is None or _exclusion_filter.patterns != patterns
+            or _exclusion_filter.keywords != keywords):
+        _exclusion_filter = ExclusionFilter(patterns, keywords)
+    return _exclusion_filter
+
+
+def exclude_filtered_versions(albums: list) -> list:
+    """ Remove album versions containing specified text """
+    return exclusion_filter().filter(albums)
@@ -13,7 +13,10 @@ ALLOWED_VALUES = {
     'bitrate': {1: "128", 3: "320", 9: "FLAC"},
     'alerts': [True, False],
     'record_type': ['all', 'album', 'ep', 'single'],
-    'release_channel': ['stable', 'beta']
+    'release_channel': ['stable', 'beta'],
+    'fast_api_engine': ['threads', 'async'],
+    'journal_mode': ['wal', 'delete', 'truncate'],
+    'synchronous': ['off', 'normal', 'full']
 }
 
 DEFAULT_CONFIG = {
@@ -27,6 +30,13 @@ DEFAULT_CONFIG = {
     "prompt_no_matches": True,
     "fast_api": True,
     "fast_api_threads": 25,
+    "fast_api_engine": "threads",
+    "fast_api_concurrency": 100,
+    "fast_api_rate_limit": 50,
+    "fast_api_retries": 5,
+    "low_memory_refresh": False,
+    "incremental_refresh": True,
+    "full_refresh_interval": 7,
     "exclusions": {
         "enable_exclusions": True,
         "patterns": [],
@@ -50,6 +60,9 @@ DEFAULT_CONFIG = {
         "arl": "",
         "check_account_status": True,
         "halt_download_on_error": False,
+        "concurrent_downloads": 1,
+        "concurrent_tracks": 0,
+        "download_retries": 2,
     },
     "smtp_settings": {
         "server": "",
@@ -57,13 +70,29 @@ DEFAULT_CONFIG = {
         "starttls": False,
         "username": "",
         "password": "",
-        "from_addr": ""
+        "from_addr": "",
+        "releases_per_email": 250,
+        "max_emails": 4
     },
     "plex": {
         "base_url": "",
         "ssl_verify": True,
         "token": "",
         "library": ""
+    },
+    "cache": {
+        "enabled": True,
+        "max_size": 100,
+        "artist_ttl": 168,
+        "album_ttl": 720,
+        "track_ttl": 720,
+        "search_ttl": 24
+    },
+    "database": {
+        "journal_mode": "wal",
+        "synchronous": "normal",
+        "mmap_size": 256,
+        "cache_size": 64
     }
 }
 
@@ -377,6 +406,14 @@ class Config(object):
     def smtp_starttls() -> bool:
         return Config._CONFIG.get('smtp_settings').get('starttls')
 
+    @staticmethod
+    def smtp_releases_per_email() -> int:
+        return Config._CONFIG.get('smtp_settings').get('releases_per_email')
+
+    @staticmethod
+    def smtp_max_emails() -> int:
+        return Config._CONFIG.get('smtp_settings').get('max_emails')
+
     @staticmethod
     def check_update() -> int:
         return Config._CONFIG.get('check_update')
@@ -433,6 +470,62 @@ class Config(object):
     def fast_api_threads() -> int:
         return Config._CONFIG['fast_api_threads']
 
+    @staticmethod
+    def fast_api_engine() -> str:
+        return Config._CONFIG['fast_api_engine']
+
+    @staticmethod
+    def fast_api_concurrency() -> int:
+        return Config._CONFIG['fast_api_concurrency']
+
+    @staticmethod
+    def fast_api_rate_limit() -> int:
+        return Config._CONFIG['fast_api_rate_limit']
+
+    @staticmethod
+    def fast_api_retries() -> int:
+        return Config._CONFIG['fast_api_retries']
+
+    @staticmethod
+    def low_memory_refresh() -> bool:
+        return Config._CONFIG['low_memory_refresh']
+
+    @staticmethod
+    def cache_enabled() -> bool:
+        return Config._CONFIG['cache']['enabled'] and not Config._CONFIG.get('no_cache')
+
+    @staticmethod
+    def cache_max_size() -> int:
+        return Config._CONFIG['cache']['max_size']
+
+    @staticmethod
+    def cache_ttl(endpoint: str) -> int:
+        return Config._CONFIG['cache'][f'{endpoint}_ttl']
+
+    @staticmethod
+    def db_journal_mode() -> str:
+        return Config._CONFIG['database']['journal_mode']
+
+    @staticmethod
+    def db_synchronous() -> str:
+        return Config._CONFIG['database']['synchronous']
+
+    @staticmethod
+    def db_mmap_size() -> int:
+        return Config._CONFIG['database']['mmap_size']
+
+    @staticmethod
+    def db_cache_size() -> int:
+        return Config._CONFIG['database']['cache_size']
+
+    @staticmethod
+    def incremental_refresh() -> bool:
+        return Config._CONFIG['incremental_refresh']
+
+    @staticmethod
+    def full_refresh_interval() -> int:
+        return Config._CONFIG['full_refresh_interval']
+
     @staticmethod
     def allow_compilations() -> bool:
         return Config._CONFIG['new_releases']['include_compilations']
@@ -471,6 +564,18 @@ class Config(object):
     def halt_download_on_error() -> bool:
         return Config._CONFIG.get('deemix').get('halt_download_on_error')
 
+    @staticmethod
+    def concurrent_downloads() -> int:
+        return Config._CONFIG.get('deemix').get('concurrent_downloads')
+
+    @staticmethod
+    def concurrent_tracks() -> int:
+        return Config._CONFIG.get('deemix').get('concurrent_tracks')
+
+    @staticmethod
+    def download_retries() -> int:
+        return Config._CONFIG.get('deemix').get('download_retries')
+
     @staticmethod
     def smart_search() -> bool:
         return Config._CONFIG.get('smart_search')
@@ -1,23 +1,173 @@
 import logging
 import sqlite3
 import time
-from datetime import datetime
+from itertools import groupby, islice
+from operator import itemgetter
 from pathlib import Path
 
 from packaging.version import parse as parse_version
 
 from deemon import __dbversion__, __version__
 from deemon.core.config import Config as config
+from deemon.core.seen import SeenReleases
 from deemon.utils import startup, performance, dates
 
 logger = logging.getLogger(__name__)
 
+# Indexes behind the lookups made by Database. Covering columns are appended
+# where a query only reads those columns. Checked by benchmarks/query_plans.py
+INDEXES = {
+    'idx_monitor_artist': "'monitor' ('artist_id', 'profile_id')",
+    'idx_monitor_name': "'monitor' ('profile_id', 'artist_name' COLLATE NOCASE, 'artist_id')",
+    'idx_monitor_refreshed': "'monitor' ('refreshed', 'profile_id')",
+    'idx_monitor_trans': "'monitor' ('trans_id', 'profile_id', 'artist_name')",
+    'idx_playlists_title': "'playlists' ('profile_id', 'title' COLLATE NOCASE)",
+    'idx_playlists_refreshed': "'playlists' ('refreshed', 'profile_id')",
+    'idx_playlists_trans': "'playlists' ('trans_id', 'profile_id', 'title')",
+    'idx_playlist_tracks_playlist': "'playlist_tracks' ('playlist_id', 'profile_id', 'track_id')",
+    'idx_playlist_tracks_trans': "'playlist_tracks' ('trans_id', 'profile_id', 'track_id')",
+    'idx_releases_artist': "'releases' ('profile_id', 'artist_id', 'album_id', 'future_release')",
+    'idx_releases_name': "'releases' ('profile_id', 'artist_name')",
+    'idx_releases_day': "'releases' ('profile_id', 'release_day')",
+    'idx_releases_trans': "'releases' ('trans_id', 'profile_id', 'album_id')",
+    'idx_releases_future': "'releases' ('profile_id') WHERE future_release = 1",
+    'idx_transactions_profile': "'transactions' ('profile_id')",
+}
+
+
+# Indexes added by each schema upgrade, frozen as they were at that version.
+# INDEXES describes the current schema and is only used for new databases;
+# upgrades must not depend on it, an index on a column added later would
+# break every older upgrade path.
+UPGRADE_INDEXES = {
+    '3.10': (
+        "CREATE INDEX IF NOT EXISTS 'idx_monitor_artist' ON 'monitor' ('artist_id', 'profile_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_monitor_name' ON 'monitor' "
+        "('profile_id', 'artist_name' COLLATE NOCASE, 'artist_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_monitor_refreshed' ON 'monitor' ('refreshed', 'profile_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_monitor_trans' ON 'monitor' ('trans_id', 'profile_id', 'artist_name')",
+        "CREATE INDEX IF NOT EXISTS 'idx_playlists_title' ON 'playlists' ('profile_id', 'title' COLLATE NOCASE)",
+        "CREATE INDEX IF NOT EXISTS 'idx_playlists_refreshed' ON 'playlists' ('refreshed', 'profile_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_playlists_trans' ON 'playlists' ('trans_id', 'profile_id', 'title')",
+        "CREATE INDEX IF NOT EXISTS 'idx_playlist_tracks_playlist' ON 'playlist_tracks' "
+        "('playlist_id', 'profile_id', 'track_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_playlist_tracks_trans' ON 'playlist_tracks' "
+        "('trans_id', 'profile_id', 'track_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_releases_artist' ON 'releases' "
+        "('profile_id', 'artist_id', 'album_id', 'future_release')",
+        "CREATE INDEX IF NOT EXISTS 'idx_releases_name' ON 'releases' ('profile_id', 'artist_name')",
+        "CREATE INDEX IF NOT EXISTS 'idx_releases_date' ON 'releases' ('profile_id', 'album_release')",
+        "CREATE INDEX IF NOT EXISTS 'idx_releases_trans' ON 'releases' ('trans_id', 'profile_id', 'album_id')",
+        "CREATE INDEX IF NOT EXISTS 'idx_releases_future' ON 'releases' ('profile_id') WHERE future_release = 1",
+        "CREATE INDEX IF NOT EXISTS 'idx_transactions_profile' ON 'transactions' ('profile_id')",
+    ),
+    '3.12': (
+        "CREATE INDEX IF NOT EXISTS 'idx_releases_day' ON 'releases' ('profile_id', 'release_day')",
+    ),
+}
+
+
+# SQL equivalent of dates.release_day for a YYYY-MM-DD column or parameter
+RELEASE_DAY_SQL = f"COALESCE(CAST(julianday({{}}) - 1721424.5 AS INTEGER), {dates.UNKNOWN_RELEASE_DAY})"
+
+
+# Per-profile counters in the stats table, kept up to date by these triggers.
+# REPLACE only fires the delete triggers with recursive_triggers enabled (see
+# tune). Inserts use an upsert because an outer INSERT OR REPLACE would
+# override an INSERT OR IGNORE inside the trigger.
+STATS_TRIGGERS = {
+    'stats_monitor_insert': "AFTER INSERT ON monitor BEGIN "
+                            "INSERT INTO stats (profile_id, artists) VALUES (NEW.profile_id, 1) "
+                            "ON CONFLICT (profile_id) DO UPDATE SET artists = artists + 1; END",
+    'stats_monitor_delete': "AFTER DELETE ON monitor BEGIN "
+                            "UPDATE stats SET artists = artists - 1 WHERE profile_id = OLD.profile_id; END",
+    'stats_playlists_insert': "AFTER INSERT ON playlists BEGIN "
+                              "INSERT INTO stats (profile_id, playlists) VALUES (NEW.profile_id, 1) "
+                              "ON CONFLICT (profile_id) DO UPDATE SET playlists = playlists + 1; END",
+    'stats_playlists_delete': "AFTER DELETE ON playlists BEGIN "
+                              "UPDATE stats SET playlists = playlists - 1 WHERE profile_id = OLD.profile_id; END",
+    'stats_releases_insert': "AFTER INSERT ON releases BEGIN "
+                             "INSERT INTO stats (profile_id, releases, future_releases) "
+                             "VALUES (NEW.profile_id, 1, NEW.future_release IS 1) "
+                             "ON CONFLICT (profile_id) DO UPDATE SET releases = releases + 1, "
+                             "future_releases = future_releases + (NEW.future_release IS 1); END",
+    'stats_releases_delete': "AFTER DELETE ON releases BEGIN "
+                             "UPDATE stats SET releases = releases - 1, "
+                             "future_releases = future_releases - (OLD.future_release IS 1) "
+                             "WHERE profile_id = OLD.profile_id; END",
+    'stats_releases_future': "AFTER UPDATE OF future_release ON releases BEGIN "
+                             "UPDATE stats SET future_releases = future_releases "
+                             "+ (NEW.future_release IS 1) - (OLD.future_release IS 1) "
+                             "WHERE profile_id = NEW.profile_id; END",
+}
+
+# All counters for every profile in one pass over each table
+STATS_QUERY = ("SELECT profile_id, SUM(artists) AS artists, SUM(playlists) AS playlists, "
+               "SUM(releases) AS releases, SUM(future_releases) AS future_releases FROM ("
+               "SELECT profile_id, COUNT(*) AS artists, 0 AS playlists, 0 AS releases, 0 AS future_releases "
+               "FROM monitor GROUP BY profile_id "
+               "UNION ALL SELECT profile_id, 0, COUNT(*), 0, 0 FROM playlists GROUP BY profile_id "
+               "UNION ALL SELECT profile_id, 0, 0, COUNT(*), SUM(future_release IS 1) FROM releases "
+               "GROUP BY profile_id) GROUP BY profile_id")
+
+# Rows passed to executemany at a time by BatchWriter
+WRITE_CHUNK_SIZE = 1000
+
+
+class BatchWriter:
+    """
+    Write rows with executemany in chunks of WRITE_CHUNK_SIZE inside one
+    explicit transaction that is committed on exit (or rolled back on error).
+    When a transaction is already open, the rows join it and committing or
+    rolling back is left to whoever opened it.
+
+    Rows are consumed lazily from any iterable, so memory use depends on the
+    chunk size rather than on how many rows are written.
+    """
+
+    def __init__(self, db: 'Database', sql: str, chunk_size: int = WRITE_CHUNK_SIZE):
+        self.db = db
+        self.sql = sql
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.started = None
+        self.owns_transaction = False
+
+    def __enter__(self):
+        if not self.db.conn.in_transaction:
+            self.db.query("BEGIN")
+            self.owns_transaction = True
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type:
+            if self.owns_transaction:
+                self.db.conn.rollback()
+            return False
+        if self.owns_transaction:
+            self.db.commit()
+        elapsed = time.perf_counter() - self.started
+        rate = self.rows / elapsed if elapsed else self.rows
+        logger.debug(f"Wrote {self.rows:,} row(s) in {elapsed:.2f}s ({rate:,.0f} rows/sec)")
+
+    def write(self, rows):
+        """ Execute the statement for each parameter tuple in rows """
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.db.cursor.executemany(self.sql, chunk)
+            self.rows += len(chunk)
+
 
 class Database(object):
 
     def __init__(self):
         self.conn = None
         self.cursor = None
+        self.raw_cursor = None
         self.db = startup.get_database()
 
         if not Path(self.db).exists():
@@ -41,12 +191,33 @@ class Database(object):
 
     def connect(self):
         try:
-            self.conn = sqlite3.connect(self.db)
+            self.conn = sqlite3.connect(self.db, cached_statements=256)
             self.conn.row_factory = self.dict_factory
             self.cursor = self.conn.cursor()
+            # Plain tuples for bulk reads where building a dict per row dominates
+            self.raw_cursor = self.conn.cursor()
+            self.raw_cursor.row_factory = None
+            self.tune()
         except sqlite3.OperationalError as e:
             logger.error(f"Error opening database: {e}")
 
+    def tune(self):
+        """ Apply the journal, sync and memory settings from the database config section """
+        journal_mode = self.query(f"PRAGMA journal_mode = {config.db_journal_mode()}").fetchone()['journal_mode']
+        if journal_mode != config.db_journal_mode():
+            logger.debug(f"Unable to set journal mode to {config.db_journal_mode()}, using {journal_mode}")
+        self.query(f"PRAGMA synchronous = {config.db_synchronous()}")
+        self.query(f"PRAGMA mmap_size = {config.db_mmap_size() * 1024 * 1024}")
+        # Negative cache_size is in KiB rather than pages
+        self.query(f"PRAGMA cache_size = -{config.db_cache_size() * 1024}")
+        self.query("PRAGMA temp_store = MEMORY")
+        self.query("PRAGMA recursive_triggers = ON")
+
+    def checkpoint(self):
+        """ Write the WAL back into deemon.db so the file can be copied on its own """
+        self.commit()
+        self.query("PRAGMA wal_checkpoint(TRUNCATE)")
+
     def close(self):
         if self.conn:
             self.conn.commit()
@@ -71,7 +242,10 @@ class Database(object):
                    "'profile_id' INTEGER DEFAULT 1,"
                    "'download_path' TEXT,"
                    "'refreshed' INTEGER DEFAULT 0,"
-                   "'trans_id' INTEGER)")
+                   "'trans_id' INTEGER,"
+                   "'release_total' INTEGER,"
+                   "'release_hash' TEXT,"
+                   "'last_full_refresh' INTEGER DEFAULT 0)")
 
         self.query("CREATE TABLE playlists ("
                    "'id' INTEGER UNIQUE,"
@@ -108,6 +282,7 @@ class Database(object):
                    "'profile_id' INTEGER DEFAULT 1,"
                    "'future_release' INTEGER DEFAULT 0,"
                    "'trans_id' INTEGER,"
+                   "'release_day' INTEGER,"
                    "unique(album_id, profile_id))")
 
         self.query("CREATE TABLE 'deemon' ("
@@ -133,8 +308,38 @@ class Database(object):
                    "'profile_id' INTEGER DEFAULT 1,"
                    "PRIMARY KEY('id' AUTOINCREMENT))")
 
+        self.query("CREATE TABLE queue ("
+                   "'id' INTEGER,"
+                   "'profile_id' INTEGER DEFAULT 1,"
+                   "'artist_name' TEXT,"
+                   "'album_id' INTEGER,"
+                   "'album_title' TEXT,"
+                   "'track_id' INTEGER,"
+                   "'track_title' TEXT,"
+                   "'url' TEXT,"
+                   "'playlist_title' TEXT,"
+                   "'bitrate' TEXT,"
+                   "'download_path' TEXT,"
+                   "'release_type' TEXT,"
+                   "'status' TEXT DEFAULT 'pending',"
+                   "'attempts' INTEGER DEFAULT 0,"
+                   "'reason' TEXT,"
+                   "'created' INTEGER,"
+                   "'updated' INTEGER,"
+                   "unique(url, profile_id),"
+                   "PRIMARY KEY('id' AUTOINCREMENT))")
+
+        self.query("CREATE TABLE stats ("
+                   "'profile_id' INTEGER PRIMARY KEY,"
+                   "'artists' INTEGER DEFAULT 0,"
+                   "'playlists' INTEGER DEFAULT 0,"
+                   "'releases' INTEGER DEFAULT 0,"
+                   "'future_releases' INTEGER DEFAULT 0)")
+
         self.query("CREATE UNIQUE INDEX 'idx_property' ON 'deemon' ('property')")
-        self.query("CREATE INDEX 'artist' ON 'releases' ('artist_id', 'profile_id')")
+        self.query("CREATE INDEX 'queue_status' ON 'queue' ('profile_id', 'status')")
+        self.create_indexes()
+        self.create_stats_triggers()
         self.query(f"INSERT INTO 'deemon' ('property', 'value') VALUES ('version', '{__dbversion__}')")
         self.query("INSERT OR REPLACE INTO 'deemon' ('property', 'value') VALUES ('latest_ver', '')")
         self.query("INSERT INTO 'deemon' ('property', 'value') VALUES ('last_update_check', 0)")
@@ -221,11 +426,113 @@ class Database(object):
             self.commit()
             logger.debug(f"Database upgraded to version 3.7")
 
+        if current_ver < parse_version("3.8"):
+            # Discography watermark used for incremental refresh
+            self.query("ALTER TABLE monitor ADD COLUMN 'release_total' INTEGER")
+            self.query("ALTER TABLE monitor ADD COLUMN 'release_hash' TEXT")
+            self.query("ALTER TABLE monitor ADD COLUMN 'last_full_refresh' INTEGER DEFAULT 0")
+            self.query("INSERT OR REPLACE INTO 'deemon' ('property', 'value') VALUES ('version', '3.8')")
+            self.commit()
+            logger.debug(f"Database upgraded to version 3.8")
+
+        if current_ver < parse_version("3.9"):
+            # Persistent download queue
+            self.query("CREATE TABLE queue ("
+                       "'id' INTEGER,"
+                       "'profile_id' INTEGER DEFAULT 1,"
+                       "'artist_name' TEXT,"
+                       "'album_id' INTEGER,"
+                       "'album_title' TEXT,"
+                       "'track_id' INTEGER,"
+                       "'track_title' TEXT,"
+                       "'url' TEXT,"
+                       "'playlist_title' TEXT,"
+                       "'bitrate' TEXT,"
+                       "'download_path' TEXT,"
+                       "'release_type' TEXT,"
+                       "'status' TEXT DEFAULT 'pending',"
+                       "'attempts' INTEGER DEFAULT 0,"
+                       "'reason' TEXT,"
+                       "'created' INTEGER,"
+                       "'updated' INTEGER,"
+                       "unique(url, profile_id),"
+                       "PRIMARY KEY('id' AUTOINCREMENT))")
+            self.query("CREATE INDEX 'queue_status' ON 'queue' ('profile_id', 'status')")
+            self.query("INSERT OR REPLACE INTO 'deemon' ('property', 'value') VALUES ('version', '3.9')")
+            self.commit()
+            logger.debug(f"Database upgraded to version 3.9")
+
+        if current_ver < parse_version("3.10"):
+            # Replaced by idx_releases_artist which also covers the seen releases lookups
+            self.query("DROP INDEX IF EXISTS 'artist'")
+            logger.info("   [!] Creating database indexes, this may take a moment...")
+            self.create_upgrade_indexes('3.10')
+            self.query("INSERT OR REPLACE INTO 'deemon' ('property', 'value') VALUES ('version', '3.10')")
+            self.commit()
+            logger.debug(f"Database upgraded to version 3.10")
+
+        if current_ver < parse_version("3.11"):
+            # Materialized counters for refresh statistics
+            self.query("CREATE TABLE stats ("
+                       "'profile_id' INTEGER PRIMARY KEY,"
+                       "'artists' INTEGER DEFAULT 0,"
+                       "'playlists' INTEGER DEFAULT 0,"
+                       "'releases' INTEGER DEFAULT 0,"
+                       "'future_releases' INTEGER DEFAULT 0)")
+            self.create_stats_triggers()
+            self.rebuild_stats()
+            self.query("INSERT OR REPLACE INTO 'deemon' ('property', 'value') VALUES ('version', '3.11')")
+            self.commit()
+            logger.debug(f"Database upgraded to version 3.11")
+
+        if current_ver < parse_version("3.12"):
+            # Release dates as day numbers so date filters compare integers
+            logger.info("   [!] Converting release dates, this may take a moment...")
+            self.query("ALTER TABLE releases ADD COLUMN 'release_day' INTEGER")
+            self.query(f"UPDATE releases SET release_day = {RELEASE_DAY_SQL.format('album_release')}")
+            self.query("DROP INDEX IF EXISTS 'idx_releases_date'")
+            self.create_upgrade_indexes('3.12')
+            self.query("INSERT OR REPLACE INTO 'deemon' ('property', 'value') VALUES ('version', '3.12')")
+            self.commit()
+            logger.debug(f"Database upgraded to version 3.12")
+
+    def create_indexes(self):
+        """ Indexes of the current schema, for new databases """
+        for name, definition in INDEXES.items():
+            self.query(f"CREATE INDEX IF NOT EXISTS '{name}' ON {definition}")
+
+    def create_upgrade_indexes(self, version: str):
+        """ Indexes added by the upgrade to version """
+        for statement in UPGRADE_INDEXES[version]:
+            self.query(statement)
+
+    def create_stats_triggers(self):
+        for name, definition in STATS_TRIGGERS.items():
+            self.query(f"CREATE TRIGGER IF NOT EXISTS '{name}' {definition}")
+
+    def rebuild_stats(self):
+        """ Recount the stats table from the monitor, playlists and releases tables """
+        self.query("DELETE FROM stats")
+        self.query(f"INSERT INTO stats (profile_id, artists, playlists, releases, future_releases) {STATS_QUERY}")
+
+    def get_stats(self) -> dict:
+        """ Artist, playlist, release and future release counts for the current profile """
+        vals = {'profile_id': config.profile_id()}
+        stats = self.query("SELECT artists, playlists, releases, future_releases FROM stats "
+                           "WHERE profile_id = :profile_id", vals).fetchone()
+        return stats or {'artists': 0, 'playlists': 0, 'releases': 0, 'future_releases': 0}
+
     def query(self, query, values=None):
         if values is None:
             values = {}
         return self.cursor.execute(query, values)
 
+    def query_raw(self, query, values=None):
+        """ Same as query() but rows are returned as tuples """
+        if values is None:
+            values = {}
+        return self.raw_cursor.execute(query, values)
+
     def reset_future(self, album_id):
         logger.debug("Clearing future_release flag from " + str(album_id))
         values = {'album_id': album_id, 'profile_id': config.profile_id()}
@@ -289,6 +596,48 @@ class Database(object):
             query = "SELECT album_id, future_release FROM 'releases' WHERE profile_id = :profile_id"
         return self.query(query, sql_values).fetchall()
 
+    def get_seen_releases(self, artist_id=None) -> SeenReleases:
+        sql_values = {'artist_id': artist_id, 'profile_id': config.profile_id()}
+        if artist_id:
+            query = "SELECT album_id, future_release FROM 'releases' WHERE artist_id = :artist_id AND profile_id = :profile_id"
+        else:
+            query = "SELECT album_id, future_release FROM 'releases' WHERE profile_id = :profile_id"
+        seen = SeenReleases()
+        seen.update_tuples(self.query_raw(query, sql_values))
+        return seen
+
+    def iter_seen_releases_by_artist(self):
+        """
+        Yield (artist_id, SeenReleases) for each artist in artist_id order,
+        reading the releases table in a single pass on its own cursor
+        """
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute("SELECT artist_id, album_id, future_release FROM 'releases' "
+                       "WHERE profile_id = :profile_id ORDER BY artist_id",
+                       {'profile_id': config.profile_id()})
+        try:
+            for artist_id, rows in groupby(cursor, key=itemgetter(0)):
+                seen = SeenReleases()
+                for _, album_id, future_release in rows:
+                    seen.add(album_id, future_release)
+                yield artist_id, seen
+        finally:
+            cursor.close()
+
+    def get_releases_by_album_ids(self, album_ids: list):
+        """ Look up album IDs regardless of which artist they are stored under """
+        result = []
+        for i in range(0, len(album_ids), 500):
+            chunk = album_ids[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            # Unary + keeps the planner from reading every release of the profile through
+            # idx_releases_artist, the unique (album_id, profile_id) index finds each album
+            result.extend(self.query(f"SELECT album_id, future_release FROM 'releases' "
+                                     f"WHERE album_id IN ({placeholders}) AND +profile_id = ?",
+                                     [*chunk, config.profile_id()]).fetchall())
+        return result
+
     def get_future_releases(self):
         vals = {'profile_id': config.profile_id()}
         return self.query("SELECT * FROM releases "
@@ -342,31 +691,83 @@ class Database(object):
     def set_all_artists_refreshed(self):
         self.query("UPDATE monitor SET refreshed = 1 WHERE refreshed = 0")
         
+    def set_artist_watermarks(self, values: list):
+        """ Store discography watermarks returned by PlatformAPI.get_artist_albums """
+        sql = ("UPDATE monitor SET release_total = :total, release_hash = :hash, "
+               "last_full_refresh = COALESCE(:last_full, last_full_refresh) "
+               f"WHERE artist_id = :artist_id AND profile_id = {config.profile_id()}")
+        self.cursor.executemany(sql, values)
+
+    def add_to_queue(self, values: list):
+        """
+        Add queue items as pending. Items already waiting in the queue are left
+        as they are, finished or failed items are queued again.
+        """
+        now = int(time.time())
+        sql = ("INSERT INTO queue ('profile_id', 'artist_name', 'album_id', 'album_title', 'track_id', 'track_title', "
+               "'url', 'playlist_title', 'bitrate', 'download_path', 'release_type', 'status', 'attempts', "
+               f"'created', 'updated') VALUES ({config.profile_id()}, :artist_name, :album_id, :album_title, "
+               f":track_id, :track_title, :url, :playlist_title, :bitrate, :download_path, :release_type, "
+               f"'pending', 0, {now}, {now}) "
+               "ON CONFLICT (url, profile_id) DO UPDATE SET status = 'pending', attempts = 0, reason = NULL, "
+               "bitrate = excluded.bitrate, download_path = excluded.download_path, updated = excluded.updated "
+               "WHERE status IN ('done', 'failed', 'error')")
+        self.cursor.executemany(sql, values)
+
+    def get_pending_queue(self):
+        """ Items waiting to be downloaded, including any interrupted while in progress """
+        values = {'profile_id': config.profile_id()}
+        return self.query("SELECT * FROM queue WHERE profile_id = :profile_id "
+                          "AND status IN ('pending', 'in_progress') ORDER BY id", values).fetchall()
+
+    def set_queue_status(self, queue_id: int, status: str, reason: str = None):
+        values = {'id': queue_id, 'status': status, 'reason': reason, 'updated': int(time.time())}
+        attempts = "attempts + 1" if status == "in_progress" else "attempts"
+        self.query(f"UPDATE queue SET status = :status, reason = :reason, attempts = {attempts}, "
+                   "updated = :updated WHERE id = :id", values)
+
+    def get_failed_queue(self, since: int = 0):
+        values = {'profile_id': config.profile_id(), 'since': since}
+        return self.query("SELECT * FROM queue WHERE profile_id = :profile_id AND status = 'failed' "
+                          "AND updated >= :since ORDER BY id", values).fetchall()
+
+    def purge_finished_queue(self):
+        """ Remove done, failed and errored items, leaving those still pending or in progress """
+        values = {'profile_id': config.profile_id()}
+        self.query("DELETE FROM queue WHERE profile_id = :profile_id "
+                   "AND status IN ('done', 'failed', 'error')", values)
+
     def set_all_playlists_refreshed(self):
         self.query("UPDATE playlists SET refreshed = 1 WHERE refreshed = 0")
 
     def add_new_releases(self, values):
-        self.new_transaction()
-        sql = (f"INSERT OR REPLACE INTO releases ('artist_id', 'artist_name', 'album_id', 'album_name', 'album_release', "
-               f"'album_added', 'future_release', 'explicit', 'record_type', 'profile_id', 'trans_id') "
-               f"VALUES (:artist_id, :artist_name, :id, :title, :release_date, {int(time.time())}, :future, "
-               f":explicit_lyrics, :record_type, {config.profile_id()}, {config.transaction_id()})")
-        self.cursor.executemany(sql, values)
-        self.set_all_artists_refreshed()
+        now, profile_id, trans_id = int(time.time()), config.profile_id(), config.transaction_id()
+        sql = ("INSERT OR REPLACE INTO releases ('artist_id', 'artist_name', 'album_id', 'album_name', "
+               "'album_release', 'album_added', 'future_release', 'explicit', 'record_type', 'profile_id', "
+               "'trans_id', 'release_day') VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)")
+        with BatchWriter(self, sql) as writer:
+            self.new_transaction(commit=False)
+            writer.write((r['artist_id'], r['artist_name'], r['id'], r['title'], r['release_date'], now,
+                          r['future'], r['explicit_lyrics'], r['record_type'], profile_id, trans_id,
+                          r.get('release_day') or dates.release_day(r['release_date']))
+                         for r in values)
+            self.set_all_artists_refreshed()
 
     def add_new_playlist_releases(self, values):
-        self.new_transaction()
-        sql = (f"INSERT INTO playlist_tracks ('artist_id', 'artist_name', 'track_id', 'track_name', 'playlist_id', "
-               f"'track_added', 'profile_id', 'trans_id') VALUES (:artist_id, :artist_name, :id, :title, :playlist_id, "
-               f"{int(time.time())}, {config.profile_id()}, {config.transaction_id()})")
-        self.cursor.executemany(sql, values)
-        self.set_all_playlists_refreshed()
+        now, profile_id, trans_id = int(time.time()), config.profile_id(), config.transaction_id()
+        sql = ("INSERT INTO playlist_tracks ('artist_id', 'artist_name', 'track_id', 'track_name', 'playlist_id', "
+               "'track_added', 'profile_id', 'trans_id') VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+        with BatchWriter(self, sql) as writer:
+            self.new_transaction(commit=False)
+            writer.write((r['artist_id'], r['artist_name'], r['id'], r['title'], r['playlist_id'], now,
+                          profile_id, trans_id) for r in values)
+            self.set_all_playlists_refreshed()
 
     def show_new_releases(self, from_date_ts, now_ts):
-        today_date = datetime.utcfromtimestamp(now_ts).strftime('%Y-%m-%d')
-        from_date = datetime.utcfromtimestamp(from_date_ts).strftime('%Y-%m-%d')
-        values = {'from': from_date, 'today': today_date, 'profile_id': config.profile_id()}
-        sql = "SELECT * FROM 'releases' WHERE album_release >= :from AND album_release <= :today AND profile_id = :profile_id"
+        values = {'from': dates.utc_day(from_date_ts), 'today': dates.utc_day(now_ts),
+                  'profile_id': config.profile_id()}
+        sql = ("SELECT * FROM 'releases' WHERE profile_id = :profile_id "
+               "AND release_day BETWEEN :from AND :today")
         return self.query(sql, values).fetchall()
 
     def get_album_by_id(self, album_id):
@@ -446,34 +847,34 @@ class Database(object):
             return 0
         return tid['seq'] + 1
 
-    def new_transaction(self):
-        check_exists = self.query(f"SELECT * FROM transactions WHERE id = {config.transaction_id()}").fetchone()
+    def new_transaction(self, commit: bool = True):
+        vals = {'id': config.transaction_id(), 'timestamp': int(time.time()), 'profile_id': config.profile_id()}
+        check_exists = self.query("SELECT id FROM transactions WHERE id = :id", vals).fetchone()
         if not check_exists:
-            current_time = int(time.time())
-            vals = {'timestamp': current_time, 'profile_id': config.profile_id()}
-            self.query(f"INSERT INTO transactions ('timestamp', 'profile_id') "
-                       f"VALUES (:timestamp, :profile_id)", vals)
-            self.commit()
+            self.query("INSERT INTO transactions ('timestamp', 'profile_id') VALUES (:timestamp, :profile_id)", vals)
+            if commit:
+                self.commit()
 
     def rollback_last_refresh(self, rollback: int):
         vals = {'rollback': rollback, 'profile_id': config.profile_id()}
-        transactions = self.query("SELECT id FROM transactions WHERE profile_id = :profile_id "
-                                  f"ORDER BY id DESC LIMIT {rollback}", vals).fetchall()
-        for t in transactions:
-            vals = {'id': t['id'], 'profile_id': config.profile_id()}
-            self.query(f"DELETE FROM monitor WHERE trans_id = :id AND profile_id = :profile_id", vals)
-            self.query(f"DELETE FROM releases WHERE trans_id = :id AND profile_id = :profile_id", vals)
-            self.query(f"DELETE FROM playlist_tracks WHERE trans_id = :id AND profile_id = :profile_id", vals)
-            self.query(f"DELETE FROM transactions WHERE id = :id AND profile_id = :profile_id", vals)
-            self.commit()
+        self.delete_transactions("SELECT id FROM transactions WHERE profile_id = :profile_id "
+                                 "ORDER BY id DESC LIMIT :rollback", vals)
 
     def rollback_refresh(self, rollback: int):
         vals = {'rollback': rollback, 'profile_id': config.profile_id()}
-        self.query(f"DELETE FROM monitor WHERE trans_id = {rollback} AND profile_id = :profile_id", vals)
-        self.query(f"DELETE FROM releases WHERE trans_id = {rollback} AND profile_id = :profile_id", vals)
-        self.query(f"DELETE FROM playlist_tracks WHERE trans_id = {rollback} AND profile_id = :profile_id", vals)
-        self.query(f"DELETE FROM transactions WHERE id = {rollback} AND profile_id = :profile_id", vals)
-        self.commit()
+        self.delete_transactions(":rollback", vals)
+
+    def delete_transactions(self, transactions: str, vals: dict):
+        """
+        Remove everything added by the transaction IDs selected by
+        `transactions` (a list or subquery) within a single SQLite transaction
+        """
+        with self.conn:
+            for table in ("monitor", "releases", "playlist_tracks"):
+                self.query(f"DELETE FROM {table} WHERE trans_id IN ({transactions}) "
+                           "AND profile_id = :profile_id", vals)
+            self.query(f"DELETE FROM transactions WHERE id IN ({transactions}) "
+                       "AND profile_id = :profile_id", vals)
 
     def set_artist_refreshed(self, id):
         vals = {'id': id, 'profile_id': config.profile_id()}
@@ -497,33 +898,24 @@ class Database(object):
         return self.commit()
 
     def get_transactions(self):
+        """ Summary of the most recent transactions: what was added and how much """
         vals = {'profile_id': config.profile_id(), 'trans_limit': config.rollback_view_limit()}
-        transaction_list = self.query("SELECT id, timestamp FROM transactions WHERE profile_id = :profile_id "
-                                      "ORDER BY id DESC LIMIT :trans_limit", vals).fetchall()
-        results = []
-        for tid in transaction_list:
-            vals = {'tid': tid['id'], 'profile_id': config.profile_id()}
-            transaction = {}
-            transaction['id'] = tid['id']
-            transaction['timestamp'] = tid['timestamp']
-            transaction['releases'] = self.query("SELECT album_id "
-                                                 "FROM releases "
-                                                 "WHERE trans_id = :tid "
-                                                 "AND profile_id = :profile_id", vals).fetchall()
-            transaction['playlist_tracks'] = self.query("SELECT track_id "
-                                                        "FROM playlist_tracks "
-                                                        "WHERE trans_id = :tid "
-                                                        "AND profile_id = :profile_id", vals).fetchall()
-            transaction['playlists'] = self.query("SELECT title "
-                                                  "FROM playlists "
-                                                  "WHERE trans_id = :tid "
-                                                  "AND profile_id = :profile_id", vals).fetchall()
-            transaction['monitor'] = self.query("SELECT artist_name "
-                                                "FROM monitor "
-                                                "WHERE trans_id = :tid "
-                                                "AND profile_id = :profile_id", vals).fetchall()
-            results.append(transaction)
-        return results
+        sql = ("SELECT t.id, t.timestamp, "
+               "(SELECT COUNT(*) FROM (SELECT album_id FROM releases "
+               "WHERE trans_id = t.id AND profile_id = :profile_id "
+               "UNION SELECT track_id FROM playlist_tracks "
+               "WHERE trans_id = t.id AND profile_id = :profile_id)) AS release_count, "
+               "(SELECT COUNT(*) FROM monitor "
+               "WHERE trans_id = t.id AND profile_id = :profile_id) AS artist_count, "
+               "(SELECT artist_name FROM monitor "
+               "WHERE trans_id = t.id AND profile_id = :profile_id LIMIT 1) AS artist_name, "
+               "(SELECT COUNT(*) FROM playlists "
+               "WHERE trans_id = t.id AND profile_id = :profile_id) AS playlist_count, "
+               "(SELECT title FROM playlists "
+               "WHERE trans_id = t.id AND profile_id = :profile_id LIMIT 1) AS playlist_title "
+               "FROM transactions t WHERE t.profile_id = :profile_id "
+               "ORDER BY t.id DESC LIMIT :trans_limit")
+        return self.query(sql, vals).fetchall()
 
     def get_all_monitored_artist_ids(self):
         values = {"profile_id": config.profile_id()}
@@ -557,12 +949,13 @@ class Database(object):
 
     def insert_multiple(self, table, values):
         self.cursor.executemany(
-            f"INSERT INTO {table} (artist_id, artist_name, album_id, album_name, album_release, album_added, profile_id, future_release, trans_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            f"INSERT INTO {table} (artist_id, artist_name, album_id, album_name, album_release, album_added, profile_id, future_release, trans_id, release_day) VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, {RELEASE_DAY_SQL.format('?5')})",
             values)
 
     def remove_by_name(self, values):
-        self.cursor.executemany(f"DELETE FROM monitor WHERE profile_id = {config.profile_id()} AND artist_name = ?",
-                                values)
+        # The NOCASE comparison lets idx_monitor_name narrow down the rows, names still match exactly
+        self.cursor.executemany(f"DELETE FROM monitor WHERE profile_id = {config.profile_id()} "
+                                "AND artist_name = ?1 COLLATE NOCASE AND artist_name = ?1", values)
         self.cursor.executemany(f"DELETE FROM releases WHERE profile_id = {config.profile_id()} AND artist_name = ?",
                                 values)
         self.commit()
@@ -576,7 +969,7 @@ class Database(object):
 
     # @performance.timeit
     def remove_specific_releases(self, values):
-        self.query(f"DELETE FROM releases WHERE album_release > :tm_date AND profile_id = {config.profile_id()}", values)
+        self.query(f"DELETE FROM releases WHERE release_day > :tm_day AND profile_id = {config.profile_id()}", values)
 
     def add_extra_release_info(self, values):
         self.new_transaction()
@@ -1,5 +1,6 @@
 import logging
 import sys
+import threading
 from pathlib import Path
 
 import deemix
@@ -44,7 +45,7 @@ class DeemixLogListener:
 class DeemixInterface:
     def __init__(self):
         logger.debug("Initializing deemix library")
-        self.db = Database()
+        self._local = threading.local()
         self.dz = Deezer()
 
         if config.deemix_path() == "":
@@ -61,15 +62,26 @@ class DeemixInterface:
         self.plugins = get_plugins()
         logger.debug(f"Loaded {len(self.plugins)} plugin(s)")
 
-    def download_url(self, url, bitrate, download_path, override_deemix=True):
+    @property
+    def db(self):
+        """ Database connection for the current thread, as downloads may run in parallel """
+        if not hasattr(self._local, 'db'):
+            self._local.db = Database()
+        return self._local.db
+
+    def download_url(self, url, bitrate, download_path, override_deemix=True, track_concurrency: int = None):
         listener = DeemixLogListener()
 
         if override_deemix:
             deemix.generatePlaylistItem = self.generatePlaylistItem
 
+        # Settings are copied per download so parallel downloads can use different paths
+        dx_settings = dict(self.dx_settings)
         if download_path:
-            self.dx_settings['downloadLocation'] = download_path
-            logger.debug(f"deemix download path set to: {self.dx_settings['downloadLocation']}")
+            dx_settings['downloadLocation'] = download_path
+            logger.debug(f"deemix download path set to: {dx_settings['downloadLocation']}")
+        if track_concurrency:
+            dx_settings['queueConcurrency'] = track_concurrency
 
         links = []
         for link in url:
@@ -100,12 +112,12 @@ class DeemixInterface:
             if isinstance(download_object, list):
                 for obj in download_object:
                     if hasattr(obj, 'conversion_data') and matched_plugin and hasattr(matched_plugin, 'convert'):
-                        obj = matched_plugin.convert(self.dz, obj, self.dx_settings, listener)
-                    Downloader(self.dz, obj, self.dx_settings, listener=listener).start()
+                        obj = matched_plugin.convert(self.dz, obj, dx_settings, listener)
+                    Downloader(self.dz, obj, dx_settings, listener=listener).start()
             else:
                 if hasattr(download_object, 'conversion_data') and matched_plugin and hasattr(matched_plugin, 'convert'):
-                    download_object = matched_plugin.convert(self.dz, download_object, self.dx_settings, listener)
-                Downloader(self.dz, download_object, self.dx_settings, listener=listener).start()
+                    download_object = matched_plugin.convert(self.dz, download_object, dx_settings, listener)
+                Downloader(self.dz, download_object, dx_settings, listener=listener).start()
 
     def deezer_acct_type(self):
         user_session = self.dz.get_session()['current_user']
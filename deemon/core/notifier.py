@@ -16,16 +16,71 @@ from deemon.core.config import Config as config
 logger = logging.getLogger(__name__)
 
 
+class AlertDigest:
+    """
+    New release alerts grouped by release date.
+
+    At most releases_per_email * max_emails releases are kept, any further
+    alerts are only counted so a large first refresh can't grow the digest
+    without bound.
+    """
+
+    def __init__(self, limit: int = None):
+        if limit is None:
+            limit = config.smtp_releases_per_email() * config.smtp_max_emails()
+        self.limit = limit
+        self.by_date = {}
+        self.count = 0
+        self.omitted = 0
+
+    def __len__(self):
+        return self.count + self.omitted
+
+    def add(self, release: dict):
+        if self.count >= self.limit:
+            self.omitted += 1
+            return
+        self.by_date.setdefault(release['release_date'], []).append(
+            {
+                'artist': release['artist_name'],
+                'album': release['title'],
+                'cover': release['cover_big'],
+                'url': release['link'],
+                'track_num': release.get('nb_tracks', None),
+                'record_type': release['record_type'],
+            }
+        )
+        self.count += 1
+
+    def clear(self):
+        self.by_date.clear()
+        self.count = 0
+        self.omitted = 0
+
+    def batches(self, size: int):
+        """ Yield {release_date: [albums]} dicts of up to size releases, newest date first """
+        batch, batch_size = {}, 0
+        for release_date in sorted(self.by_date, reverse=True):
+            for album in self.by_date[release_date]:
+                batch.setdefault(release_date, []).append(album)
+                batch_size += 1
+                if batch_size == size:
+                    yield batch
+                    batch, batch_size = {}, 0
+        if batch:
+            yield batch
+
+
 class Notify:
 
-    def __init__(self, new_releases: list = None):
-        logger.debug(f"Sending notification for {new_releases} release(s)")
+    def __init__(self, new_releases: AlertDigest = None):
+        logger.debug(f"Sending notification for {len(new_releases) if new_releases else 0} release(s)")
         self.subject = "deemon Notification"
         self.releases = new_releases
 
     def send(self, body=None, test=False):
         """
-        Send email notification message
+        Send email notification message, or one message per batch of new releases
         """
         if not all([config.smtp_server(), config.smtp_port(), config.smtp_user(),
                     config.smtp_pass(), config.smtp_sender(), config.smtp_recipient()]):
@@ -35,8 +90,7 @@ class Notify:
             logger.debug("Email not configured, no notifications will be sent")
             return False
 
-        if not body:
-            body = self.html_message()
+        messages = [body] if body else self.html_messages()
 
         context = ssl.create_default_context()
 
@@ -47,13 +101,18 @@ class Notify:
             with smtplib.SMTP(config.smtp_server(), config.smtp_port()) as server:
                 server.starttls()
                 server.login(config.smtp_user(), config.smtp_pass())
-                server.sendmail(config.smtp_sender(), config.smtp_recipient(), body.as_string())
-                logger.debug("Email notification has been sent")
+                self.send_messages(server, messages)
         else:
             with smtplib.SMTP_SSL(config.smtp_server(), config.smtp_port(), context=context) as server:
                 server.login(config.smtp_user(), config.smtp_pass())
-                server.sendmail(config.smtp_sender(), config.smtp_recipient(), body.as_string())
-                logger.debug("Email notification has been sent")
+                self.send_messages(server, messages)
+
+    @staticmethod
+    def send_messages(server, messages):
+        # Messages are built one at a time so only one body is held in memory
+        for message in messages:
+            server.sendmail(config.smtp_sender(), config.smtp_recipient(), message.as_string())
+            logger.debug("Email notification has been sent")
 
     def construct_header(self, is_plain_text=True, subject=None):
         subject = subject or self.subject
@@ -70,14 +129,24 @@ class Notify:
 
         return message
 
-    def html_message(self):
+    def html_messages(self):
         """
-        Builds HTML messages
+        Builds HTML messages, one per releases_per_email releases
         """
-        html_body = MIMEText(self.html_new_releases(), 'html')
-        msg = self.construct_header(is_plain_text=False)
-        msg.attach(html_body)
-        return msg
+        batches = list(self.releases.batches(config.smtp_releases_per_email()))
+        total = len(self.releases)
+        for part, batch in enumerate(batches, start=1):
+            omitted = self.releases.omitted if part == len(batches) else 0
+            html_body = MIMEText(self.html_new_releases(batch, total, omitted), 'html')
+            if total > 1:
+                self.subject = f"{total:,} new releases found!"
+            else:
+                self.subject = "1 new release found!"
+            if len(batches) > 1:
+                self.subject += f" ({part} of {len(batches)})"
+            msg = self.construct_header(is_plain_text=False)
+            msg.attach(html_body)
+            yield msg
 
     def test(self):
         """
@@ -107,41 +176,36 @@ class Notify:
         """
         Plaintext version of email to send
         """
-        message = "The following new releases were detected:\n\n"
-        for release in self.releases:
-            release_date_ts = datetime.strptime(release["release_date"], "%Y-%m-%d")
+        parts = ["The following new releases were detected:\n\n"]
+        for release_date in sorted(self.releases.by_date, reverse=True):
+            release_date_ts = datetime.strptime(release_date, "%Y-%m-%d")
             release_date_str = datetime.strftime(release_date_ts, "%A, %B %-d")
-            message += f"\n{release_date_str}\n"
-            for album in release["releases"]:
-                message += f"+ {album['artist']} - {album['album']}\n"
-        return message
-
-    def html_new_releases(self):
-
-        app_version = f"deemon {__version__}"
-        py_version = f"python {platform.python_version()}"
-        sys_version = f"{platform.system()} {platform.release()}"
-
+            parts.append(f"\n{release_date_str}\n")
+            for album in self.releases.by_date[release_date]:
+                parts.append(f"+ {album['artist']} - {album['album']}\n")
+        if self.releases.omitted:
+            parts.append(f"\n...and {self.releases.omitted:,} more release(s)\n")
+        return "".join(parts)
+
+    @staticmethod
+    def iter_new_releases(releases: dict):
+        """
+        Yield the HTML fragments of the new release list, one date or album at a time
+        """
         new_release_list_spacer = f"""
             </ul>
             <p style="font-size: 14px; line-height: 140%;">&nbsp;</p>
         """
 
-        all_new_releases = ""
-
-        self.releases = sorted(self.releases, key=lambda x: x['release_date'], reverse=True)
+        for i, (release_date, albums) in enumerate(releases.items()):
 
-        new_release_count = 0
-        
-        for release in self.releases:
-
-            if all_new_releases != "":
-                all_new_releases += new_release_list_spacer
+            if i:
+                yield new_release_list_spacer
 
-            release_date_ts = datetime.strptime(release["release_date"], "%Y-%m-%d")
+            release_date_ts = datetime.strptime(release_date, "%Y-%m-%d")
             release_date_str = datetime.strftime(release_date_ts, "%A, %B %d").replace(" 0", " ")
 
-            new_release_list_header = f"""
+            yield f"""
 			<div class="album date">
 				<span class="album date badge">
 					{release_date_str}
@@ -149,10 +213,7 @@ class Notify:
 			</div>
             """
 
-            new_release_list_item = ""
-
-            for album in release["releases"]:
-                new_release_count += 1
+            for album in albums:
                 if album['record_type'].lower() == "ep":
                     record_type = "EP"
                 else:
@@ -163,7 +224,7 @@ class Notify:
                 else:
                     album_info = f"{record_type} | {album['track_num']} track(s)"
             
-                new_release_list_item += f"""
+                yield f"""
             <div class="album body">
 				<div class="albumart">
 					<img src="{album['cover']}">
@@ -180,13 +241,18 @@ class Notify:
 			</div>
                 """
 
-            all_new_releases += new_release_list_header + new_release_list_item
+    def html_new_releases(self, releases: dict, total: int, omitted: int = 0):
+
+        app_version = f"deemon {__version__}"
+        py_version = f"python {platform.python_version()}"
+        sys_version = f"{platform.system()} {platform.release()}"
+
+        all_new_releases = "".join(self.iter_new_releases(releases))
+        if omitted:
+            all_new_releases += f"""
+            <p style="font-size: 14px; line-height: 140%;">...and {omitted:,} more release(s)</p>
+            """
 
-        if new_release_count > 1:
-            self.subject = f"{str(new_release_count)} new releases found!"
-        else:
-            self.subject = f"1 new release found!"
-        
         html_output = pkgutil.get_data('deemon', 'assets/index.html').decode('ascii')
         
         if config.update_available():
@@ -195,10 +261,11 @@ class Notify:
             html_output = html_output.replace("{UPDATE_MESSAGE}", "")
             html_output = html_output.replace("{VIEW_UPDATE_MESSAGE}", "display:none;")
 
-        html_output = html_output.replace("{NEW_RELEASE_COUNT}", str(new_release_count))
-        html_output = html_output.replace("{NEW_RELEASE_LIST}", all_new_releases)
+        html_output = html_output.replace("{NEW_RELEASE_COUNT}", str(total))
         html_output = html_output.replace("{DEEMON_VER}", app_version)
         html_output = html_output.replace("{PY_VER}", py_version)
         html_output = html_output.replace("{SYS_VER}", sys_version)
+        # Last, so placeholders in release titles are left alone
+        html_output = html_output.replace("{NEW_RELEASE_LIST}", all_new_releases)
 
         return html_output
@@ -0,0 +1,88 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """ Exponential backoff with full jitter """
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all API requests.
+
+    The fill rate adapts to the responses received: every successful request
+    raises the rate additively (roughly one request/second per second) up to
+    max_rate, and every empty, throttled or failed response halves it. Rate
+    decreases are limited to one per second so that a burst of failures from
+    requests already in flight only counts once.
+
+    Tokens are reserved rather than waited for under the lock, so the same
+    limiter can be used from threads (acquire) and coroutines (acquire_async).
+    """
+
+    def __init__(self, max_rate: float, min_rate: float = 1.0):
+        self.max_rate = max(max_rate, min_rate)
+        self.min_rate = min_rate
+        self.rate = self.max_rate
+        self.tokens = self.rate
+        self.updated = time.monotonic()
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+
+        self.requests = 0
+        self.throttled_count = 0
+        self.first_request = None
+        self.last_request = None
+
+    def _reserve(self) -> float:
+        """ Take a token and return how long the caller must wait before using it """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+            self.requests += 1
+            if self.first_request is None:
+                self.first_request = now + wait
+            self.last_request = max(self.last_request or 0, now + wait)
+            return wait
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+    def success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + 1.0 / self.rate)
+
+    def throttled(self):
+        with self.lock:
+            self.throttled_count += 1
+            now = time.monotonic()
+            if now - self.last_decrease < 1:
+                return
+            self.last_decrease = now
+            self.rate = max(self.min_rate, self.rate / 2)
+            logger.debug(f"API throttling detected, reducing rate to {self.rate:.1f} req/s")
+
+    def requests_per_second(self) -> float:
+        if not self.requests or self.first_request is None:
+            return 0.0
+        elapsed = self.last_request - self.first_request
+        if elapsed <= 0:
+            return float(self.requests)
+        return self.requests / elapsed
@@ -9,9 +9,209 @@ against Spotify album data to identify albums already in the collection.
 import os
 import re
 import json
+from collections import Counter
 from pathlib import Path
 from typing import Dict, List, Set, Tuple
-import unicodedata
+
+from deemon.utils import normalize, scanner
+
+AUDIO_EXTENSIONS = {'.mp3', '.flac', '.m4a', '.aac', '.ogg', '.wma', '.wav', '.ape', '.opus'}
+
+# Bumped whenever the layout of the index file or its records changes
+INDEX_VERSION = 1
+
+
+# Names shorter than this are split into substrings of this size to find candidates
+GRAM_SIZE = 3
+
+# Artists with at least this many albums get their own FuzzyIndex for album lookups
+ALBUM_INDEX_MIN = 64
+
+# Two names can only match if the shorter is at least this fraction of the longer
+MIN_LENGTH_RATIO = 0.70
+
+
+def max_edit_distance(len1: int, len2: int, threshold: float) -> int:
+    """
+    Largest edit distance at which two strings of these lengths still reach
+    the similarity threshold, or -1 if none does.
+    """
+    max_len = max(len1, len2)
+    distance = int((1 - threshold) * max_len) + 1
+    # Same expression as the similarity check so rounding can't disagree with it
+    while distance >= 0 and 1 - (distance / max_len) < threshold:
+        distance -= 1
+    return distance
+
+
+def bounded_levenshtein(str1: str, str2: str, max_distance: int) -> int:
+    """
+    Levenshtein distance between two strings, computed only within a band of
+    max_distance around the diagonal.
+    
+    Args:
+        str1: First string
+        str2: Second string
+        max_distance: Largest distance of interest
+        
+    Returns:
+        int: The distance, or max_distance + 1 as soon as it is known to be larger
+    """
+    over = max_distance + 1
+    len1, len2 = len(str1), len(str2)
+    if abs(len1 - len2) > max_distance:
+        return over
+    
+    previous = [j if j <= max_distance else over for j in range(len2 + 1)]
+    for i in range(1, len1 + 1):
+        current = [over] * (len2 + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        char1 = str1[i - 1]
+        for j in range(max(1, i - max_distance), min(len2, i + max_distance) + 1):
+            value = previous[j - 1] + (char1 != str2[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if value > over:
+                value = over
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return over
+        previous = current
+    
+    return min(previous[len2], over)
+
+
+def fuzzy_match(str1: str, str2: str, threshold: float = 0.85) -> bool:
+    """
+    Check if two strings are similar enough using fuzzy matching.
+    Handles plurals, spelling variations, and minor differences.
+    
+    Args:
+        str1: First string
+        str2: Second string
+        threshold: Similarity threshold (0-1)
+        
+    Returns:
+        bool: True if strings are similar enough
+    """
+    if not str1 or not str2:
+        return False
+    
+    # Exact match
+    if str1 == str2:
+        return True
+    
+    len1, len2 = len(str1), len(str2)
+    
+    # Check if one contains the other (handles plurals, small additions)
+    if str1 in str2 or str2 in str1:
+        # Make sure they're at least 70% similar in length
+        len_ratio = min(len1, len2) / max(len1, len2)
+        if len_ratio >= MIN_LENGTH_RATIO:
+            return True
+    
+    # If lengths are too different, not a match
+    if abs(len1 - len2) > max(len1, len2) * (1 - MIN_LENGTH_RATIO):
+        return False
+    
+    # Levenshtein distance ratio: similarity = 1 - distance / max_len
+    max_distance = max_edit_distance(len1, len2, threshold)
+    if max_distance < 0:
+        return False
+    return bounded_levenshtein(str1, str2, max_distance) <= max_distance
+
+
+class FuzzyIndex:
+    """
+    Finds every name that fuzzy_match would accept for a query without
+    comparing the query against all names.
+    
+    Candidates are limited to names of a compatible length and found through
+    shared character trigrams: an edit touches at most GRAM_SIZE trigrams, so
+    a name within k edits shares all but k * GRAM_SIZE of the query's distinct
+    trigrams. Names the query contains are looked up directly. Candidates are
+    then confirmed with fuzzy_match, so results are exactly the same as a
+    full scan.
+    """
+    
+    def __init__(self, names):
+        """
+        Args:
+            names: Normalized names to index
+        """
+        self.names = list(dict.fromkeys(names))
+        self.name_ids = {name: name_id for name_id, name in enumerate(self.names)}
+        self.by_length = {}
+        self.grams = {}
+        for name_id, name in enumerate(self.names):
+            self.by_length.setdefault(len(name), []).append(name_id)
+            for gram in self._grams(name):
+                self.grams.setdefault(gram, []).append(name_id)
+    
+    def __len__(self):
+        return len(self.names)
+    
+    @staticmethod
+    def _grams(text: str) -> Set[str]:
+        return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+    
+    def search(self, query: str, threshold: float = 0.85) -> List[str]:
+        """
+        Find the indexed names similar to the query.
+        
+        Args:
+            query: Normalized name
+            threshold: Similarity threshold (0-1), as for fuzzy_match
+            
+        Returns:
+            List[str]: Matching names, in index order
+        """
+        if not query:
+            return []
+        
+        length = len(query)
+        # One extra on each side covers rounding in fuzzy_match's length checks
+        min_length = max(1, int(length * MIN_LENGTH_RATIO) - 1)
+        max_length = int(length / MIN_LENGTH_RATIO) + 1
+        candidates = set()
+        
+        # Names contained in the query
+        for sub_length in range(min_length, length + 1):
+            for start in range(length - sub_length + 1):
+                name = query[start:start + sub_length]
+                if name in self.name_ids:
+                    candidates.add(name)
+        
+        query_grams = self._grams(query)
+        max_distance = max_edit_distance(length, max_length, threshold)
+        required = len(query_grams) - GRAM_SIZE * max(max_distance, 0)
+        
+        if required > 0:
+            # Names containing the query share all of its trigrams, names within
+            # max_distance edits share at least `required` of them
+            counts = Counter()
+            for gram in query_grams:
+                counts.update(self.grams.get(gram, ()))
+            for name_id, count in counts.items():
+                if count >= required and min_length <= len(self.names[name_id]) <= max_length:
+                    candidates.add(self.names[name_id])
+        else:
+            # Too short for trigrams to rule anything out
+            for name_length in range(min_length, max_length + 1):
+                candidates.update(self.names[name_id] for name_id in self.by_length.get(name_length, ()))
+        
+        return [name for name in sorted(candidates, key=self.name_ids.get) if fuzzy_match(query, name, threshold)]
+
+
+def default_index_path() -> Path:
+    """Location of the persistent collection index."""
+    return Path.home() / ".config" / "deemixkit" / "collection_index.json"
 
 
 def load_collection_path() -> Path:
@@ -35,17 +235,24 @@ def load_collection_path() -> Path:
 class CollectionMatcher:
     """Handles matching Spotify albums against local music collection."""
     
-    def __init__(self, collection_path: str = None):
+    def __init__(self, collection_path: str = None, index_path: str = None, rebuild: bool = False):
         """
         Initialize the collection matcher.
         
         Args:
             collection_path: Path to the local music collection (optional, loads from config if not provided)
+            index_path: Path to the persistent collection index (optional, see default_index_path)
+            rebuild: Ignore the persistent index and rescan the whole collection
         """
         if collection_path is None:
             collection_path = str(load_collection_path())
         self.collection_path = Path(collection_path)
+        self.index_path = Path(index_path) if index_path else default_index_path()
+        self.rebuild = rebuild
         self.collection_cache = {}
+        self.rescanned = 0
+        self._artists = None
+        self._albums = {}
         self._build_collection_index()
     
     def _normalize_text(self, text: str) -> str:
@@ -58,68 +265,15 @@ class CollectionMatcher:
         - Removing extra whitespace
         - Removing common words that might differ (the, a, an)
         
+        Patterns are precompiled and results memoized in deemon.utils.normalize.
+        
         Args:
             text: Input text
             
         Returns:
             str: Normalized text
         """
-        if not text:
-            return ""
-        
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove diacritics/accents
-        text = ''.join(
-            c for c in unicodedata.normalize('NFD', text)
-            if unicodedata.category(c) != 'Mn'
-        )
-        
-        # Remove everything in parentheses or brackets (often contains edition info)
-        # Examples: (Remastered), (Full Dynamic Range Edition), [Deluxe], etc.
-        text = re.sub(r'\s*[\(\[\{]([^\)\]\}]*)[\)\]\}]\s*', ' ', text)
-        
-        # Remove "+" and everything after it (common in compilations/demos)
-        # Examples: "Album + Demo", "Album + EP", etc.
-        text = re.sub(r'\s*\+.*$', '', text)
-        
-        # Remove ellipsis and trailing dots
-        text = re.sub(r'\.{2,}$', '', text)
-        text = re.sub(r'\.$', '', text)
-        
-        # Remove common articles and possessives at the start
-        text = re.sub(r'^(the|a|an)\s+', '', text)
-        
-        # Remove apostrophes and possessives
-        text = re.sub(r"'s?\b", '', text)
-        
-        # Remove special characters and punctuation, keep only alphanumeric and spaces
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Replace multiple spaces with single space
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove common edition/version keywords that might not have been in parentheses
-        edition_keywords = [
-            'remaster', 'remastered', 'edition', 'deluxe', 'bonus', 'expanded',
-            'anniversary', 'reissue', 'special', 'limited', 'collectors', 'collector',
-            'extended', 'version', 'vol', 'volume', 'disc', 'cd', 'lp', 'ep',
-            'digital', 'vinyl', 'anniversary', 'explicit', 'clean', 'instrumental',
-            'live', 'acoustic', 'unplugged', 'demo', 'bootleg', 'rerecorded',
-            'redux', 'revisited', 'enhanced', 'super', 'ultimate', 'definitive',
-            'complete', 'compiled', 'best', 'greatest', 'hits', 'full', 'dynamic',
-            'range', 'hd', 'hq', 'hi res', 'highres', 'flac', 'wav', 'mp3'
-        ]
-        
-        # Build regex pattern to remove these keywords and anything after them
-        pattern = r'\s+(' + '|'.join(edition_keywords) + r')\b.*$'
-        text = re.sub(pattern, '', text, flags=re.IGNORECASE)
-        
-        # Also remove year patterns (YYYY) that might be at the end
-        text = re.sub(r'\s+\d{4}\s*$', '', text)
-        
-        return text.strip()
+        return normalize.name_key(text)
     
     def _extract_album_info_from_folder(self, folder_name: str) -> Tuple[str, str]:
         """
@@ -178,11 +332,138 @@ class CollectionMatcher:
         # If no pattern matched, use folder-based info
         return fallback_artist, fallback_album
     
+    def _load_index(self) -> Dict:
+        """
+        Load the persistent index, or an empty one if it is missing, unreadable,
+        outdated or was built for another collection path.
+        
+        Returns:
+            Dict: {'dirs': {path: {...}}, 'artists': {path: key}, 'albums': {path: {...}}}
+        """
+        empty = {'dirs': {}, 'artists': {}, 'albums': {}}
+        if self.rebuild or not self.index_path.exists():
+            return empty
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return empty
+        if index.get('version') != INDEX_VERSION or index.get('root') != str(self.collection_path):
+            return empty
+        return index
+    
+    def _save_index(self, index: Dict):
+        """
+        Write the index next to the previous one and swap it in, so an
+        interrupted run never leaves a truncated index behind.
+        
+        Args:
+            index: Index built by _build_collection_index
+        """
+        index = dict(index, version=INDEX_VERSION, root=str(self.collection_path))
+        tmp_path = self.index_path.with_suffix('.tmp')
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Warning: Unable to save collection index: {e}")
+    
+    def _list_subdirs(self, path: str, old_dirs: Dict) -> Tuple[str, Dict, bool]:
+        """
+        List the visible subdirectories of a directory. The listing is only read
+        again if the directory's mtime changed, which happens whenever an entry
+        is added, removed or renamed in it.
+        
+        Args:
+            path: Directory to list
+            old_dirs: Directory entries from the persistent index
+            
+        Returns:
+            Tuple[str, Dict, bool]: (path, index entry or None if unreadable, whether it was read again)
+        """
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            cached = old_dirs.get(path)
+            if cached and cached['mtime'] == mtime:
+                return path, cached, False
+            children = [e.name for e in scanner.list_dir(path) if e.is_dir()]
+        except OSError:
+            # Removed or unreadable since its parent was listed
+            return path, None, False
+        return path, {'mtime': mtime, 'children': children}, True
+    
+    def _scan_album(self, album_dir: Path, artist_name: str) -> Dict:
+        """
+        Read the album info from an album folder name and its first audio file.
+        
+        Args:
+            album_dir: Album folder
+            artist_name: Name of the artist folder, used when the filename has no artist
+            
+        Returns:
+            Dict: Album record stored in the index
+        """
+        year, album_name = self._extract_album_info_from_folder(album_dir.name)
+        record = {
+            'album': album_name,
+            'album_key': self._normalize_text(album_name),
+            'year': year,
+            'file': None
+        }
+        
+        # ALSO scan audio files in this album folder for additional matching
+        # This catches albums where the folder name doesn't match perfectly
+        for entry in scanner.list_dir(str(album_dir), skip_hidden=False):
+            audio_file = Path(entry.name)
+            if audio_file.suffix.lower() in AUDIO_EXTENSIONS and entry.is_file():
+                # Try to extract artist and album from filename
+                # Common patterns: "Artist - Album - Track.mp3", "Artist - Track.mp3", etc.
+                file_artist, file_album = self._extract_info_from_filename(audio_file.stem, artist_name, album_name)
+                
+                if file_artist and file_album:
+                    record['file'] = [file_artist, file_album,
+                                      self._normalize_text(file_artist), self._normalize_text(file_album)]
+                
+                # Only need to check one file per album
+                break
+        
+        return record
+    
+    def _album_record(self, album_path: str, artist_name: str, old_albums: Dict) -> Tuple[Dict, bool]:
+        """
+        Album record for an album folder, read again only if its mtime changed.
+        
+        Args:
+            album_path: Album folder
+            artist_name: Name of the artist folder
+            old_albums: Album records from the persistent index
+            
+        Returns:
+            Tuple[Dict, bool]: (album record or None if unreadable, whether it was read again)
+        """
+        try:
+            mtime = os.stat(album_path).st_mtime_ns
+            record = old_albums.get(album_path)
+            if record and record['mtime'] == mtime:
+                return record, False
+            record = self._scan_album(Path(album_path), artist_name)
+        except OSError:
+            return None, False
+        record['mtime'] = mtime
+        return record, True
+    
     def _build_collection_index(self):
         """
         Scan the music collection and build an index of artists and albums.
         Scans both folder names AND audio files for maximum matching accuracy.
         Structure: {normalized_artist: {normalized_album: (original_artist, original_album, path)}}
+        
+        Folder listings and album records are kept in a persistent index keyed
+        by path and mtime, so only directories that changed since the last run
+        are read again. Each level of the genre/alpha/artist/album tree is
+        listed with parallel scanner workers.
         """
         print(f"Scanning music collection at: {self.collection_path}")
         
@@ -190,151 +471,150 @@ class CollectionMatcher:
             print(f"Warning: Collection path does not exist: {self.collection_path}")
             return
         
+        old_index = self._load_index()
+        old_dirs, old_artists, old_albums = old_index['dirs'], old_index['artists'], old_index['albums']
+        index = {'dirs': {}, 'artists': {}, 'albums': {}}
+        self.rescanned = 0
+        root = str(self.collection_path)
+        
+        # List the root, genre, alpha and artist folders one level at a time
+        level = [root]
+        for _ in range(4):
+            next_level = []
+            for path, entry, rescanned in scanner.map_dirs(lambda p: self._list_subdirs(p, old_dirs), level):
+                if entry is None:
+                    continue
+                index['dirs'][path] = entry
+                self.rescanned += rescanned
+                next_level.extend(os.path.join(path, child) for child in entry['children'])
+            level = next_level
+        
+        # Read the album folders that changed
+        albums = [(path, os.path.basename(os.path.dirname(path))) for path in level]
+        records = scanner.map_dirs(lambda album: self._album_record(album[0], album[1], old_albums), albums)
+        for (album_path, _), (record, rescanned) in zip(albums, records):
+            if record is not None:
+                index['albums'][album_path] = record
+                self.rescanned += rescanned
+        
         album_count = 0
-        audio_extensions = {'.mp3', '.flac', '.m4a', '.aac', '.ogg', '.wma', '.wav', '.ape', '.opus'}
         
-        # Iterate through genre folders
-        for genre_dir in self.collection_path.iterdir():
-            if not genre_dir.is_dir():
-                continue
-            
-            # Skip hidden folders and files
-            if genre_dir.name.startswith('.'):
-                continue
+        def subdirs(path: str) -> List[str]:
+            entry = index['dirs'].get(path)
+            return entry['children'] if entry else []
+        
+        # Build the cache in directory order
+        for genre_name in subdirs(root):
+            genre_path = os.path.join(root, genre_name)
             
             # Iterate through alphabetical folders
-            for alpha_dir in genre_dir.iterdir():
-                if not alpha_dir.is_dir():
-                    continue
-                
-                if alpha_dir.name.startswith('.'):
-                    continue
+            for alpha_name in subdirs(genre_path):
+                alpha_path = os.path.join(genre_path, alpha_name)
                 
                 # Iterate through artist folders
-                for artist_dir in alpha_dir.iterdir():
-                    if not artist_dir.is_dir():
-                        continue
-                    
-                    if artist_dir.name.startswith('.'):
-                        continue
+                for artist_name in subdirs(alpha_path):
+                    artist_path = os.path.join(alpha_path, artist_name)
                     
-                    artist_name = artist_dir.name
-                    normalized_artist = self._normalize_text(artist_name)
+                    normalized_artist = old_artists.get(artist_path)
+                    if normalized_artist is None:
+                        normalized_artist = self._normalize_text(artist_name)
+                    index['artists'][artist_path] = normalized_artist
                     
                     if normalized_artist not in self.collection_cache:
                         self.collection_cache[normalized_artist] = {}
                     
                     # Iterate through album folders
-                    for album_dir in artist_dir.iterdir():
-                        if not album_dir.is_dir():
+                    for album_name in subdirs(artist_path):
+                        album_path = os.path.join(artist_path, album_name)
+                        record = index['albums'].get(album_path)
+                        if record is None:
                             continue
                         
-                        if album_dir.name.startswith('.'):
-                            continue
-                        
-                        # Extract album info from folder name
-                        year, album_name = self._extract_album_info_from_folder(album_dir.name)
-                        normalized_album = self._normalize_text(album_name)
-                        
                         # Store folder-based info in cache
-                        self.collection_cache[normalized_artist][normalized_album] = {
+                        self.collection_cache[normalized_artist][record['album_key']] = {
                             'artist': artist_name,
-                            'album': album_name,
-                            'year': year,
-                            'path': str(album_dir),
-                            'genre': genre_dir.name
+                            'album': record['album'],
+                            'year': record['year'],
+                            'path': album_path,
+                            'genre': genre_name
                         }
                         
                         album_count += 1
                         
-                        # ALSO scan audio files in this album folder for additional matching
-                        # This catches albums where the folder name doesn't match perfectly
-                        for audio_file in album_dir.iterdir():
-                            if audio_file.is_file() and audio_file.suffix.lower() in audio_extensions:
-                                # Try to extract artist and album from filename
-                                # Common patterns: "Artist - Album - Track.mp3", "Artist - Track.mp3", etc.
-                                file_artist, file_album = self._extract_info_from_filename(audio_file.stem, artist_name, album_name)
-                                
-                                if file_artist and file_album:
-                                    norm_file_artist = self._normalize_text(file_artist)
-                                    norm_file_album = self._normalize_text(file_album)
-                                    
-                                    # Add this as an additional entry if different from folder
-                                    if norm_file_artist not in self.collection_cache:
-                                        self.collection_cache[norm_file_artist] = {}
-                                    
-                                    if norm_file_album not in self.collection_cache[norm_file_artist]:
-                                        self.collection_cache[norm_file_artist][norm_file_album] = {
-                                            'artist': file_artist,
-                                            'album': file_album,
-                                            'year': year,
-                                            'path': str(album_dir),
-                                            'genre': genre_dir.name
-                                        }
-                                
-                                # Only need to check one file per album
-                                break
-        
-        print(f"Found {album_count} albums in collection from {len(self.collection_cache)} artists")
+                        if record['file']:
+                            file_artist, file_album, norm_file_artist, norm_file_album = record['file']
+                            
+                            # Add this as an additional entry if different from folder
+                            if norm_file_artist not in self.collection_cache:
+                                self.collection_cache[norm_file_artist] = {}
+                            
+                            if norm_file_album not in self.collection_cache[norm_file_artist]:
+                                self.collection_cache[norm_file_artist][norm_file_album] = {
+                                    'artist': file_artist,
+                                    'album': file_album,
+                                    'year': record['year'],
+                                    'path': album_path,
+                                    'genre': genre_name
+                                }
+        
+        if self.rescanned or len(index['dirs']) != len(old_dirs) or len(index['albums']) != len(old_albums):
+            self._save_index(index)
+        
+        print(f"Found {album_count} albums in collection from {len(self.collection_cache)} artists "
+              f"({self.rescanned} folder(s) rescanned)")
     
     def _fuzzy_match(self, str1: str, str2: str, threshold: float = 0.85) -> bool:
         """
         Check if two strings are similar enough using fuzzy matching.
-        Handles plurals, spelling variations, and minor differences.
+        See fuzzy_match.
+        """
+        return fuzzy_match(str1, str2, threshold)
+    
+    def _artist_index(self) -> FuzzyIndex:
+        """FuzzyIndex over all artists in the collection, built on first use."""
+        if self._artists is None:
+            self._artists = FuzzyIndex(self.collection_cache.keys())
+        return self._artists
+    
+    def _has_album(self, cached_artist: str, normalized_album: str) -> bool:
+        """
+        Check an artist in the collection for an exact or fuzzy album match.
         
         Args:
-            str1: First string
-            str2: Second string
-            threshold: Similarity threshold (0-1)
+            cached_artist: Normalized artist name from the collection
+            normalized_album: Normalized album name
             
         Returns:
-            bool: True if strings are similar enough
+            bool: True if the artist has a matching album
         """
-        if not str1 or not str2:
-            return False
-        
-        # Exact match
-        if str1 == str2:
+        albums = self.collection_cache[cached_artist]
+        if normalized_album in albums:
             return True
         
-        # Check if one contains the other (handles plurals, small additions)
-        if str1 in str2 or str2 in str1:
-            # Make sure they're at least 70% similar in length
-            len_ratio = min(len(str1), len(str2)) / max(len(str1), len(str2))
-            if len_ratio >= 0.70:
-                return True
-        
-        # Calculate Levenshtein distance ratio
-        len1, len2 = len(str1), len(str2)
-        if len1 == 0 or len2 == 0:
-            return False
-        
-        # If lengths are too different, not a match
-        if abs(len1 - len2) > max(len1, len2) * 0.3:
-            return False
-        
-        # Create distance matrix
-        d = [[0] * (len2 + 1) for _ in range(len1 + 1)]
-        
-        for i in range(len1 + 1):
-            d[i][0] = i
-        for j in range(len2 + 1):
-            d[0][j] = j
-        
-        for i in range(1, len1 + 1):
-            for j in range(1, len2 + 1):
-                cost = 0 if str1[i-1] == str2[j-1] else 1
-                d[i][j] = min(
-                    d[i-1][j] + 1,      # deletion
-                    d[i][j-1] + 1,      # insertion
-                    d[i-1][j-1] + cost  # substitution
-                )
-        
-        distance = d[len1][len2]
-        max_len = max(len1, len2)
-        similarity = 1 - (distance / max_len)
-        
-        return similarity >= threshold
+        if len(albums) < ALBUM_INDEX_MIN:
+            return any(fuzzy_match(normalized_album, cached_album, threshold=0.85) for cached_album in albums)
+        
+        if cached_artist not in self._albums:
+            self._albums[cached_artist] = FuzzyIndex(albums.keys())
+        return bool(self._albums[cached_artist].search(normalized_album, threshold=0.85))
+    
+    def _is_match(self, normalized_artist: str, normalized_album: str, similar_artists: List[str]) -> bool:
+        """
+        Check normalized names against the collection.
+        
+        Args:
+            normalized_artist: Normalized artist name
+            normalized_album: Normalized album name
+            similar_artists: Artists in the collection similar to normalized_artist
+            
+        Returns:
+            bool: True if album is in collection
+        """
+        # Check exact artist match, then similar artists
+        if normalized_artist in self.collection_cache and self._has_album(normalized_artist, normalized_album):
+            return True
+        return any(self._has_album(cached_artist, normalized_album)
+                   for cached_artist in similar_artists if cached_artist != normalized_artist)
     
     def is_album_in_collection(self, artist_name: str, album_name: str, year: str = None) -> bool:
         """
@@ -351,31 +631,36 @@ class CollectionMatcher:
         """
         normalized_artist = self._normalize_text(artist_name)
         normalized_album = self._normalize_text(album_name)
+        similar_artists = self._artist_index().search(normalized_artist, threshold=0.90)
+        return self._is_match(normalized_artist, normalized_album, similar_artists)
+    
+    def match_albums(self, albums: List[Tuple[str, str]]) -> List[bool]:
+        """
+        Check a batch of albums (e.g. a whole playlist) against the collection.
+        Names are normalized and artists looked up once per distinct value.
         
-        # Check exact artist match
-        if normalized_artist in self.collection_cache:
-            # Check exact album match
-            if normalized_album in self.collection_cache[normalized_artist]:
-                return True
+        Args:
+            albums: List of (artist_name, album_name) tuples
             
-            # Try fuzzy match on album names for this exact artist
-            for cached_album in self.collection_cache[normalized_artist].keys():
-                if self._fuzzy_match(normalized_album, cached_album, threshold=0.85):
-                    return True
-        
-        # Try fuzzy artist match  
-        for cached_artist in self.collection_cache.keys():
-            if self._fuzzy_match(normalized_artist, cached_artist, threshold=0.90):
-                # Found similar artist, check for exact album match
-                if normalized_album in self.collection_cache[cached_artist]:
-                    return True
-                
-                # Try fuzzy album match too
-                for cached_album in self.collection_cache[cached_artist].keys():
-                    if self._fuzzy_match(normalized_album, cached_album, threshold=0.85):
-                        return True
-        
-        return False
+        Returns:
+            List[bool]: For each album, True if it is in the collection
+        """
+        keys = normalize.name_keys(name for album in albums for name in album)
+        similar_artists = {}
+        results = {}
+        matches = []
+        
+        for normalized_artist, normalized_album in zip(keys[::2], keys[1::2]):
+            key = (normalized_artist, normalized_album)
+            if key not in results:
+                if normalized_artist not in similar_artists:
+                    similar_artists[normalized_artist] = self._artist_index().search(normalized_artist,
+                                                                                     threshold=0.90)
+                results[key] = self._is_match(normalized_artist, normalized_album,
+                                              similar_artists[normalized_artist])
+            matches.append(results[key])
+        
+        return matches
     
     def get_album_info(self, artist_name: str, album_name: str) -> Dict:
         """
@@ -410,12 +695,10 @@ class CollectionMatcher:
         new_albums = []
         existing_albums = []
         
-        for album_data in albums_data:
-            artist = album_data.get('artist', '')
-            album = album_data.get('album', '')
-            year = album_data.get('year', '')
-            
-            if self.is_album_in_collection(artist, album, year):
+        matches = self.match_albums([(album_data.get('artist', ''), album_data.get('album', ''))
+                                     for album_data in albums_data])
+        for album_data, in_collection in zip(albums_data, matches):
+            if in_collection:
                 existing_albums.append(album_data)
             else:
                 new_albums.append(album_data)
@@ -0,0 +1,50 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SeenReleases:
+    """
+    Hash index of album IDs already stored in the database.
+
+    Releases still flagged as future releases are kept apart from the others
+    so they are treated as unseen and re-evaluated on every refresh until
+    their release date has passed.
+    """
+
+    def __init__(self, rows=None):
+        self.released = set()
+        self.future = set()
+        if rows:
+            self.update(rows)
+
+    def __contains__(self, album_id):
+        return album_id in self.released
+
+    def __len__(self):
+        return len(self.released) + len(self.future)
+
+    def add(self, album_id: int, future_release: int = 0):
+        if future_release:
+            self.future.add(album_id)
+            self.released.discard(album_id)
+        else:
+            self.released.add(album_id)
+            self.future.discard(album_id)
+
+    def update(self, rows):
+        """ Add rows containing album_id and (optionally) future_release """
+        for row in rows:
+            self.add(row['album_id'], row.get('future_release', 0))
+
+    def update_tuples(self, rows):
+        """ Add (album_id, future_release) tuples """
+        for album_id, future_release in rows:
+            self.add(album_id, future_release)
+
+    def is_future(self, album_id: int) -> bool:
+        return album_id in self.future
+
+    def unseen(self, releases: list) -> list:
+        """ Return releases from API payload that have not been seen yet """
+        return [r for r in releases if r['id'] not in self.released]
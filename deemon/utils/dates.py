@@ -1,6 +1,7 @@
 import logging
 import time
 from datetime import datetime, date
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +41,28 @@ def str_to_datetime_obj(d: str) -> datetime:
     return datetime.strptime(d, "%Y-%m-%d")
 
 
+# Day number used for unknown release dates ("0000-00-00"), see str_to_datetime_obj
+UNKNOWN_RELEASE_DAY = date(1980, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=65536)
+def release_day(d: str) -> int:
+    """ Convert a YYYY-MM-DD release date to its day number (proleptic ordinal) """
+    if d == "0000-00-00":
+        return UNKNOWN_RELEASE_DAY
+    return date.fromisoformat(d).toordinal()
+
+
+def day_of(d: datetime) -> int:
+    """ Day number of a datetime, comparable with release_day """
+    return d.toordinal()
+
+
+def utc_day(ts: int) -> int:
+    """ Day number of a UTC timestamp, comparable with release_day """
+    return datetime.utcfromtimestamp(ts).toordinal()
+
+
 def get_friendly_date(d: int):
     input_date = datetime.fromtimestamp(d).date()
     input_time = datetime.fromtimestamp(d).time()
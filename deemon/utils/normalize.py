@@ -0,0 +1,130 @@
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Iterable, List
+
+# Distinct strings remembered by each normalizer. A playlist or discography
+# repeats artist names a lot, a collection scan normalizes every folder once.
+CACHE_SIZE = 65536
+
+# Edition/remaster/version text that isn't always in parentheses
+EDITION_KEYWORDS = [
+    'remaster', 'remastered', 'edition', 'deluxe', 'bonus', 'expanded',
+    'anniversary', 'reissue', 'special', 'limited', 'collectors', 'collector',
+    'extended', 'version', 'vol', 'volume', 'disc', 'cd', 'lp', 'ep',
+    'digital', 'vinyl', 'explicit', 'clean', 'instrumental',
+    'live', 'acoustic', 'unplugged', 'demo', 'bootleg', 'rerecorded',
+    'redux', 'revisited', 'enhanced', 'super', 'ultimate', 'definitive',
+    'complete', 'compiled', 'best', 'greatest', 'hits', 'full', 'dynamic',
+    'range', 'hd', 'hq', 'hi res', 'highres', 'flac', 'wav', 'mp3'
+]
+
+# Applied in order by name_key
+NAME_PATTERNS = [
+    # Everything in parentheses or brackets, e.g. (Remastered), [Deluxe]
+    (re.compile(r'\s*[\(\[\{]([^\)\]\}]*)[\)\]\}]\s*'), ' '),
+    # "+" and everything after it, e.g. "Album + Demo"
+    (re.compile(r'\s*\+.*$'), ''),
+    # Ellipsis and trailing dots
+    (re.compile(r'\.{2,}$'), ''),
+    (re.compile(r'\.$'), ''),
+    # Leading articles
+    (re.compile(r'^(the|a|an)\s+'), ''),
+    # Apostrophes and possessives
+    (re.compile(r"'s?\b"), ''),
+    # Punctuation, keep only alphanumerics and spaces
+    (re.compile(r'[^\w\s]'), ''),
+    (re.compile(r'\s+'), ' '),
+    # Edition keywords and anything after them
+    (re.compile(r'\s+(' + '|'.join(EDITION_KEYWORDS) + r')\b.*$', re.IGNORECASE), ''),
+    # Trailing year
+    (re.compile(r'\s+\d{4}\s*$'), ''),
+]
+
+# Applied in order by strip_edition_key. Each pattern is paired with a literal
+# its match has to contain, so titles without it skip the pattern entirely.
+TITLE_SUFFIXES = [
+    (needle, re.compile(pattern, re.IGNORECASE)) for needle, pattern in [
+        ('remastered', r'\s*-\s*remastered.*'),
+        ('remastered', r'\s*\(remastered.*\)'),
+        ('remastered', r'\s*\[remastered.*\]'),
+        ('deluxe', r'\s*-\s*deluxe.*'),
+        ('deluxe', r'\s*\(deluxe.*\)'),
+        ('deluxe', r'\s*\[deluxe.*\]'),
+        ('expanded', r'\s*-\s*expanded.*'),
+        ('expanded', r'\s*\(expanded.*\)'),
+        ('expanded', r'\s*\[expanded.*\]'),
+        ('bonus', r'\s*-\s*bonus.*'),
+        ('bonus', r'\s*\(bonus.*\)'),
+        ('bonus', r'\s*\[bonus.*\]'),
+        ('explicit', r'\s*\[explicit\]'),
+        ('explicit', r'\s*\(explicit\)'),
+        ('(', r'\s*\(\d{4}\)'),
+        ('[', r'\s*\[\d{4}\]'),
+        ('-', r'\s*-\s*\d{4}.*'),
+        ('(', r'\s*\(\d{4}.*\)'),
+        ('[', r'\s*\[\d{4}.*\]'),
+        ('reissue', r'\s*-\s*reissue.*'),
+        ('reissue', r'\s*\(reissue.*\)'),
+        ('reissue', r'\s*\[reissue.*\]'),
+        ('anniversary', r'\s*-\s*anniversary.*'),
+        ('anniversary', r'\s*\(anniversary.*\)'),
+        ('anniversary', r'\s*\[anniversary.*\]'),
+        ('edition', r'\s*-\s*edition.*'),
+        ('edition', r'\s*\(edition.*\)'),
+        ('edition', r'\s*\[edition.*\]'),
+    ]
+]
+
+
+def strip_accents(text: str) -> str:
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFD', text) if unicodedata.category(c) != 'Mn')
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def name_key(text: str) -> str:
+    """
+    Aggressive normalization for matching collection folders against
+    releases: lowercase, no accents, punctuation, articles or edition text
+    """
+    if not text:
+        return ""
+    text = strip_accents(text.lower())
+    for pattern, replacement in NAME_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def strip_edition_key(title: str) -> str:
+    """ Lowercase album title without remaster/deluxe/year/... suffixes """
+    title = title.lower().strip()
+    # Case insensitive matching also pairs a few non-ASCII letters with ASCII
+    # ones (e.g. 'ſ' and 's'), only ASCII titles can rule patterns out early
+    ascii_only = title.isascii()
+    for needle, pattern in TITLE_SUFFIXES:
+        if not ascii_only or needle in title:
+            title = pattern.sub('', title)
+    return title.strip()
+
+
+def _batch(func, texts: Iterable[str]) -> List[str]:
+    results = {}
+    keys = []
+    for text in texts:
+        if text not in results:
+            results[text] = func(text)
+        keys.append(results[text])
+    return keys
+
+
+def name_keys(texts: Iterable[str]) -> List[str]:
+    """ name_key for many strings, each distinct string is normalized once """
+    return _batch(name_key, texts)
+
+
+def strip_edition_keys(titles: Iterable[str]) -> List[str]:
+    """ strip_edition_key for many titles, each distinct title is normalized once """
+    return _batch(strip_edition_key, titles)
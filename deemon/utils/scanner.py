@@ -0,0 +1,83 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+# Directories listed at the same time. Listing is I/O bound, so on network
+# mounts many concurrent requests hide most of the per-directory latency.
+DEFAULT_WORKERS = 16
+# Directories handled per task by map_dirs
+MAP_CHUNK_SIZE = 32
+
+
+def is_hidden(name: str) -> bool:
+    return name.startswith('.')
+
+
+def list_dir(path: str, skip_hidden: bool = True) -> List[os.DirEntry]:
+    """ Entries of a directory in directory order, optionally without hidden ones """
+    with os.scandir(path) as entries:
+        return [entry for entry in entries if not (skip_hidden and is_hidden(entry.name))]
+
+
+def scan(root, extensions: Iterable[str] = None, recursive: bool = True, files: bool = True, dirs: bool = False,
+         skip_hidden: bool = True, follow_symlinks: bool = False,
+         workers: int = DEFAULT_WORKERS) -> Iterator[os.DirEntry]:
+    """
+    Walk a directory tree with parallel os.scandir workers, yielding entries
+    as soon as their directory has been listed, in no particular order.
+
+    Files are filtered by extension (case insensitive, e.g. {'.mp3'}) when
+    extensions are given. Hidden files and directories are left out and not
+    descended into unless skip_hidden is False. Symlinked directories are
+    only followed with follow_symlinks.
+    """
+    if extensions:
+        extensions = {ext.lower() for ext in extensions}
+
+    with ThreadPoolExecutor(workers, thread_name_prefix="scanner") as executor:
+        pending = {executor.submit(list_dir, str(root), skip_hidden)}
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        entries = future.result()
+                    except OSError as e:
+                        logger.debug(f"Unable to scan directory: {e}")
+                        continue
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+                            is_file = not is_dir and entry.is_file()
+                        except OSError:
+                            continue
+                        if is_dir:
+                            if recursive:
+                                pending.add(executor.submit(list_dir, entry.path, skip_hidden))
+                            if dirs:
+                                yield entry
+                        elif is_file and files:
+                            if not extensions or os.path.splitext(entry.name)[1].lower() in extensions:
+                                yield entry
+        finally:
+            # Consumer stopped early, don't list the rest of the tree
+            for future in pending:
+                future.cancel()
+
+
+def map_dirs(func: Callable, paths: Iterable, workers: int = DEFAULT_WORKERS,
+             chunk_size: int = MAP_CHUNK_SIZE) -> Iterator:
+    """
+    Call func for each directory in paths using parallel workers, yielding
+    the results in the order of paths. For callers that need more than a
+    listing per directory (stat, reading a file, ...). Paths are handed out
+    in chunks so cheap calls aren't dominated by scheduling overhead.
+    """
+    paths = list(paths)
+    chunks = [paths[i:i + chunk_size] for i in range(0, len(paths), chunk_size)]
+    with ThreadPoolExecutor(workers, thread_name_prefix="scanner") as executor:
+        for results in executor.map(lambda chunk: [func(path) for path in chunk], chunks):
+            yield from results
@@ -1,13 +1,16 @@
 import logging
 import os
 import sys
+import threading
 from pathlib import Path
 
-import requests
 from packaging.version import parse as parse_version
 
 logger = logging.getLogger(__name__)
 
+# Seconds the update check may take, it is abandoned if deemon exits first
+UPDATE_CHECK_TIMEOUT = 5
+
 
 def get_appdata_root():
 
@@ -64,6 +67,14 @@ def get_database():
     return get_appdata_dir() / 'deemon.db'
 
 
+def get_cache_database():
+    return get_appdata_dir() / 'cache.db'
+
+
+def get_id3_cache():
+    return get_appdata_dir() / 'id3_cache.json'
+
+
 def get_log_file():
     """
     Get path to log file
@@ -71,18 +82,22 @@ def get_log_file():
     return Path(get_appdata_dir() / 'logs' / 'deemon.log')
 
 
-def get_latest_version(release_type):
+def get_latest_version(release_type, timeout: float = UPDATE_CHECK_TIMEOUT):
+    import requests
+
     latest_ver = "https://pypi.org/pypi/deemon/json"
 
     try:
-        response = requests.get(latest_ver)
-    except requests.exceptions.ConnectionError:
+        response = requests.get(latest_ver, timeout=timeout)
+        pypi = response.json()
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.debug(f"Unable to check for updates: {e}")
         return
 
-    latest_stable = parse_version(response.json()['info']['version'])
+    latest_stable = parse_version(pypi['info']['version'])
 
     if release_type == "beta":
-        all_releases = [parse_version(x) for x in response.json()['releases']]
+        all_releases = [parse_version(x) for x in pypi['releases']]
         sorted_releases = sorted(all_releases, reverse=True)
         for release in sorted_releases:
             if "b" in str(release) or "rc" in str(release):
@@ -93,7 +108,29 @@ def get_latest_version(release_type):
     else:
         return latest_stable
 
+
+class UpdateCheck(threading.Thread):
+    """
+    Looks up the latest version in the background so the command being run
+    never waits on PyPI. The result is stored when deemon exits, if the check
+    has finished by then, and shown on the next run.
+    """
+
+    def __init__(self, release_type: str, timeout: float = UPDATE_CHECK_TIMEOUT):
+        super().__init__(name="update-check", daemon=True)
+        self.release_type = release_type
+        self.timeout = timeout
+        self.latest_ver = None
+
+    def run(self):
+        try:
+            self.latest_ver = get_latest_version(self.release_type, self.timeout)
+        except Exception as e:
+            logger.debug(f"Update check failed: {e}")
+
 def get_changelog(ver: str):
+    import requests
+
     try:
         response = requests.get("https://api.github.com/repos/digitalec/"
                                 "deemon/releases")
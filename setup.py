@@ -27,6 +27,9 @@ setup(
     include_package_data=True,
     python_requires=">=3.8",
     install_requires=required,
+    extras_require={
+        "async": ["aiohttp>=3.8"],
+    },
     url="https://github.com/deathrashed/deemon",
     entry_points = {
         "console_scripts": ["deemon=deemon.__main__:main"],
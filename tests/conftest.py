@@ -0,0 +1,22 @@
+import os
+import tempfile
+
+# deemon resolves its appdata directory at import time, keep the tests away
+# from the real configuration and database
+os.environ["XDG_CONFIG_HOME"] = tempfile.mkdtemp(prefix="deemon-tests-")
+
+import pytest
+
+from deemon.core.config import Config
+from deemon.utils import startup
+
+startup.init_appdata_dir(startup.get_appdata_dir())
+Config()
+
+
+@pytest.fixture
+def database_path(tmp_path, monkeypatch):
+    """ A database file of its own for the test """
+    path = tmp_path / "deemon.db"
+    monkeypatch.setattr(startup, "get_database", lambda: path)
+    return path
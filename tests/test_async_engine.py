@@ -0,0 +1,123 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+from deezer import Deezer
+
+from deemon.core import aioclient, api
+from deemon.core.ratelimit import RateLimiter
+
+pytestmark = pytest.mark.skipif(not aioclient.available(), reason="aiohttp is not installed")
+
+
+class DeezerServer(ThreadingHTTPServer):
+    """ Serves artist discographies like api.deezer.com and the GW token request """
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.requests = []
+        self.quota_errors = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        self.server.requests.append(url.path)
+        if self.server.quota_errors:
+            self.server.quota_errors -= 1
+            return self.reply({'error': {'code': 4, 'message': "Quota limit exceeded"}})
+        artist_id = int(url.path.split("/")[2])
+        limit = int(parse_qs(url.query)['limit'][0])
+        releases = [{'id': artist_id * 100 + i, 'title': f"Album {i}"} for i in range(3)]
+        self.reply({'data': releases if limit == -1 else releases[:limit], 'total': len(releases)})
+
+    def do_POST(self):
+        self.server.requests.append(parse_qs(urlparse(self.path).query)['method'][0])
+        self.reply({'error': [], 'results': {'checkForm': "token"}})
+
+    def reply(self, body: dict):
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = DeezerServer()
+    server.thread.start()
+    monkeypatch.setattr(aioclient, "API_URL", server.url)
+    monkeypatch.setattr(aioclient, "GW_URL", server.url + "ajax/gw-light.php")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def platform_api(monkeypatch):
+    monkeypatch.setattr(api.ratelimit, "backoff", lambda attempt: 0)
+    platform_api = api.PlatformAPI.__new__(api.PlatformAPI)
+    platform_api.dz = Deezer()
+    platform_api.platform = "deezer-api"
+    platform_api.engine = "async"
+    platform_api.concurrency = 2
+    platform_api.max_threads = 2
+    platform_api.cache = None
+    platform_api.limiter = RateLimiter(max_rate=1000)
+    platform_api.max_retries = 2
+    return platform_api
+
+
+def artists(count: int) -> list:
+    return [{'artist_id': artist_id, 'artist_name': f"Artist {artist_id}"} for artist_id in range(1, count + 1)]
+
+
+@pytest.mark.parametrize("engine", ["async", "threads"])
+def test_map_yields_results_in_order(platform_api, server, monkeypatch, engine):
+    platform_api.engine = engine
+    # The thread engine calls deezer-py, which answers like the server does
+    monkeypatch.setattr(platform_api.dz.api, "get_artist_albums", lambda artist_id, limit=-1: {
+        'data': [{'id': artist_id * 100 + i} for i in range(3)], 'total': 3})
+    platform_api.api = platform_api.dz.api
+
+    results = list(platform_api.map(platform_api.get_artist_albums, artists(10)))
+
+    assert [r['artist_id'] for r in results] == list(range(1, 11))
+    assert [r['releases'][0]['id'] for r in results] == [artist_id * 100 for artist_id in range(1, 11)]
+
+
+def test_async_requests_only_use_the_public_api(platform_api, server):
+    list(platform_api.map(platform_api.get_artist_albums, artists(3)))
+
+    assert sorted(server.requests) == ["/artist/1/albums", "/artist/2/albums", "/artist/3/albums"]
+
+
+def test_async_quota_errors_are_retried(platform_api, server):
+    server.quota_errors = 2
+
+    results = list(platform_api.map(platform_api.get_artist_albums, artists(1)))
+
+    assert len(results[0]['releases']) == 3
+    assert len(server.requests) == 3
+    assert platform_api.limiter.throttled_count == 2
+
+
+def test_gw_token_is_requested_once_on_first_use(platform_api, server):
+    with aioclient.AsyncDeezer(platform_api.dz, 4) as client:
+        assert server.requests == []
+        calls = [client.submit(client.gw.api_call('artist.getData', {'ART_ID': i})) for i in range(5)]
+        assert [call.result() for call in calls] == [{'checkForm': "token"}] * 5
+
+    assert server.requests.count('deezer.getUserData') == 1
+    assert server.requests.count('artist.getData') == 5
@@ -0,0 +1,116 @@
+import pytest
+
+from deemon.core import db as db_module
+from deemon.core.db import BatchWriter, Database
+
+INSERT_TRACK = ("INSERT INTO playlist_tracks ('track_id', 'playlist_id', 'profile_id') VALUES (?, ?, 1)")
+
+
+class RecordingCursor:
+    """ Records the size of each executemany chunk """
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.chunks = []
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    def executemany(self, sql, rows):
+        self.chunks.append(len(rows))
+        return self.cursor.executemany(sql, rows)
+
+
+@pytest.fixture
+def db(database_path):
+    db = Database()
+    yield db
+    db.close()
+
+
+def stored_tracks(db) -> list:
+    return [row['track_id'] for row in db.query("SELECT track_id FROM playlist_tracks ORDER BY track_id")]
+
+
+def test_rows_are_written_in_chunks_and_committed(db, monkeypatch):
+    monkeypatch.setattr(db, "cursor", RecordingCursor(db.cursor))
+
+    with BatchWriter(db, INSERT_TRACK, chunk_size=2) as writer:
+        writer.write((track_id, 100) for track_id in range(5))
+
+    assert db.cursor.chunks == [2, 2, 1]
+    assert writer.rows == 5
+    assert not db.conn.in_transaction
+    assert stored_tracks(db) == [0, 1, 2, 3, 4]
+
+
+def test_rows_are_consumed_lazily(db):
+    consumed = []
+
+    def rows():
+        for track_id in range(5):
+            consumed.append(track_id)
+            yield track_id, 100
+
+    with BatchWriter(db, INSERT_TRACK, chunk_size=2) as writer:
+        generator = rows()
+        writer.write(next(generator) for _ in range(3))
+        assert consumed == [0, 1, 2]
+
+
+def test_error_rolls_back_every_chunk(db):
+    def rows():
+        yield from [(track_id, 100) for track_id in range(3)]
+        raise ValueError("Bad row")
+
+    with pytest.raises(ValueError):
+        with BatchWriter(db, INSERT_TRACK, chunk_size=2) as writer:
+            writer.write(rows())
+
+    assert stored_tracks(db) == []
+
+
+def test_writes_join_an_open_transaction(db):
+    db.query("BEGIN")
+    db.query("INSERT INTO playlists ('id', 'title', 'profile_id') VALUES (100, 'Playlist', 1)")
+
+    with BatchWriter(db, INSERT_TRACK) as writer:
+        writer.write([(1, 100)])
+
+    # Committing is left to whoever opened the transaction
+    assert db.conn.in_transaction
+    assert stored_tracks(db) == [1]
+    db.conn.rollback()
+    assert db.query("SELECT id FROM playlists").fetchall() == []
+    assert stored_tracks(db) == []
+
+
+def test_error_leaves_an_open_transaction_to_its_owner(db):
+    db.query("BEGIN")
+    db.query("INSERT INTO playlists ('id', 'title', 'profile_id') VALUES (100, 'Playlist', 1)")
+
+    with pytest.raises(ValueError):
+        with BatchWriter(db, INSERT_TRACK) as writer:
+            writer.write([(1, 100)])
+            raise ValueError("Bad row")
+
+    assert db.conn.in_transaction
+    db.commit()
+    assert db.query("SELECT id FROM playlists").fetchone()['id'] == 100
+
+
+def test_new_releases_are_written_with_their_transaction(db, monkeypatch):
+    monkeypatch.setattr(db_module.config, "transaction_id", lambda: 7)
+    db.query("INSERT INTO monitor (artist_id, artist_name, profile_id) VALUES (1, 'Artist', 1)")
+    db.commit()
+    releases = [{'id': album_id, 'title': f"Album {album_id}", 'artist_id': 1, 'artist_name': "Artist",
+                 'release_date': "2020-01-02", 'future': 0, 'explicit_lyrics': 0, 'record_type': "album"}
+                for album_id in range(3)]
+
+    db.add_new_releases(releases)
+
+    rows = db.query("SELECT album_id, trans_id, release_day FROM releases ORDER BY album_id").fetchall()
+    assert [row['album_id'] for row in rows] == [0, 1, 2]
+    assert {row['trans_id'] for row in rows} == {7}
+    assert db.query("SELECT COUNT(*) AS count FROM transactions").fetchone()['count'] == 1
+    assert rows[0]['release_day'] is not None
+    assert db.query("SELECT refreshed FROM monitor").fetchone()['refreshed'] == 1
@@ -0,0 +1,124 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from deemon.core import rileys_collection_matcher as matcher_module
+from deemon.core.rileys_collection_matcher import CollectionMatcher
+
+# Set on every folder after a scan, so any later change gets a different mtime
+# even on filesystems with coarse timestamps
+OLD_MTIME_NS = 1_000_000_000 * 10 ** 9
+
+
+def add_album(library, genre: str, artist: str, folder: str, track: str = "Track"):
+    album_dir = library / genre / artist[0] / artist / folder
+    album_dir.mkdir(parents=True)
+    (album_dir / f"01 - {artist} - {track}.mp3").touch()
+    (album_dir / "cover.jpg").touch()
+    return album_dir
+
+
+def age(library):
+    for path in [library, *library.rglob("*")]:
+        if path.is_dir():
+            os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+
+
+def scan(library, index_path, rebuild: bool = False) -> CollectionMatcher:
+    return CollectionMatcher(str(library), index_path=str(index_path), rebuild=rebuild)
+
+
+@pytest.fixture
+def library(tmp_path):
+    library = tmp_path / "Audio"
+    add_album(library, "Rock", "Nirvana", "1991 - Nevermind")
+    add_album(library, "Rock", "Nirvana", "1993 - In Utero")
+    add_album(library, "Rock", "Muse", "2001 - Origin of Symmetry")
+    add_album(library, "Jazz", "Miles Davis", "1959 - Kind of Blue")
+    return library
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "collection_index.json"
+
+
+@pytest.fixture
+def indexed(library, index_path):
+    """ The library after a first scan has saved its index """
+    first = scan(library, index_path)
+    age(library)
+    # The index has to hold the aged mtimes too
+    scan(library, index_path, rebuild=True)
+    return first
+
+
+def test_first_scan_reads_every_folder(library, index_path):
+    matcher = scan(library, index_path)
+
+    # Root, 2 genres, 3 alpha, 3 artist and 4 album folders
+    assert matcher.rescanned == 13
+    assert matcher.get_album_info("Nirvana", "Nevermind")['year'] == "1991"
+    assert index_path.exists()
+
+
+def test_unchanged_library_is_read_from_the_index(library, index_path, indexed):
+    matcher = scan(library, index_path)
+
+    assert matcher.rescanned == 0
+    assert matcher.collection_cache == indexed.collection_cache
+
+
+@pytest.mark.parametrize("change, rescanned", [
+    # The artist folder and the new album
+    (lambda lib: add_album(lib, "Rock", "Nirvana", "1989 - Bleach"), 2),
+    # Genre, alpha and artist folders are new, the root and the album too
+    (lambda lib: add_album(lib, "Metal", "Slayer", "1986 - Reign in Blood"), 5),
+    # The artist folder and the album under its new name
+    (lambda lib: (lib / "Rock/N/Nirvana/1993 - In Utero").rename(lib / "Rock/N/Nirvana/1993 - In Utero (Deluxe)"), 2),
+    # Only the artist folder
+    (lambda lib: shutil.rmtree(lib / "Rock/M/Muse/2001 - Origin of Symmetry"), 1),
+    # The alpha folder, the artist is gone with its albums
+    (lambda lib: shutil.rmtree(lib / "Jazz/M/Miles Davis"), 1),
+    # Only the album folder, its first track names another album
+    (lambda lib: (lib / "Rock/N/Nirvana/1991 - Nevermind/01 - Nirvana - Track.mp3").rename(
+        lib / "Rock/N/Nirvana/1991 - Nevermind/01 - Nirvana - Bleach - Track.mp3"), 1),
+], ids=["add album", "add artist", "rename album", "remove album", "remove artist", "rename track"])
+def test_changes_match_a_full_rescan(library, index_path, indexed, change, rescanned):
+    change(library)
+
+    incremental = scan(library, index_path)
+    full = scan(library, index_path.with_name("full.json"), rebuild=True)
+
+    assert incremental.rescanned == rescanned
+    assert incremental.collection_cache == full.collection_cache
+    assert incremental.collection_cache != indexed.collection_cache
+    # The updated index is used by the next run
+    assert scan(library, index_path).rescanned == 0
+
+
+def test_rebuild_ignores_the_index(library, index_path, indexed):
+    assert scan(library, index_path, rebuild=True).rescanned == 13
+
+
+@pytest.mark.parametrize("index", [
+    "{not json",
+    json.dumps({'version': matcher_module.INDEX_VERSION + 1, 'root': "", 'dirs': {}, 'artists': {}, 'albums': {}}),
+])
+def test_unusable_index_is_replaced(library, index_path, index):
+    index_path.write_text(index, encoding='utf-8')
+
+    assert scan(library, index_path).rescanned == 13
+    assert json.loads(index_path.read_text(encoding='utf-8'))['version'] == matcher_module.INDEX_VERSION
+
+
+def test_index_of_another_collection_is_ignored(library, index_path, indexed, tmp_path):
+    other = tmp_path / "Other"
+    add_album(other, "Rock", "Nirvana", "1991 - Nevermind")
+
+    matcher = scan(other, index_path)
+
+    assert matcher.rescanned == 5
+    assert list(matcher.collection_cache) == ["nirvana"]
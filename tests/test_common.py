@@ -0,0 +1,38 @@
+import pytest
+
+from deemon.core import common
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Nevermind", "nevermind"),
+    ("  NEVERMIND\t(Deluxe  Edition) ", "nevermind (deluxe edition)"),
+    ("Straße", "strasse"),
+])
+def test_common_title_key_only_folds_case_and_whitespace(title, expected):
+    # Explicit/clean versions are matched on the full title, edition text included
+    assert common.title_key(title) == expected
+
+
+def test_group_by_title_keeps_order_per_title():
+    albums = [{'id': 1, 'title': 'Album'}, {'id': 2, 'title': 'Other'}, {'id': 3, 'title': ' ALBUM'}]
+
+    assert common.group_by_title(albums) == {'album': [albums[0], albums[2]], 'other': [albums[1]]}
+
+
+def test_explicit_index_uses_first_explicit_release():
+    releases = [
+        {'id': 1, 'title': 'Album', 'explicit_lyrics': 0},
+        {'id': 2, 'title': 'album', 'explicit_lyrics': 1},
+        {'id': 3, 'title': 'ALBUM', 'explicit_lyrics': 1},
+    ]
+
+    assert common.explicit_index(releases) == {'album': 2}
+
+
+def test_explicit_index_skips_titles_without_explicit_release():
+    releases = [
+        {'id': 1, 'title': 'Clean Only', 'explicit_lyrics': 0},
+        {'id': 2, 'title': 'Unknown', 'explicit_lyrics': 2},
+    ]
+
+    assert common.explicit_index(releases) == {}
@@ -0,0 +1,121 @@
+import sqlite3
+
+import pytest
+
+from deemon import __dbversion__
+from deemon.core.db import Database
+from deemon.utils import dates
+
+# Schema created by deemon for database version 3.7, the oldest version
+# upgrades start from without a detour through releases_tmp
+SCHEMA_3_7 = [
+    "CREATE TABLE monitor ('artist_id' INTEGER, 'artist_name' TEXT, 'bitrate' TEXT, 'record_type' TEXT, "
+    "'alerts' INTEGER, 'profile_id' INTEGER DEFAULT 1, 'download_path' TEXT, 'refreshed' INTEGER DEFAULT 0, "
+    "'trans_id' INTEGER)",
+    "CREATE TABLE playlists ('id' INTEGER UNIQUE, 'title' TEXT, 'url' TEXT, 'bitrate' TEXT, 'alerts' INTEGER, "
+    "'profile_id' INTEGER DEFAULT 1, 'download_path' TEXT, 'refreshed' INTEGER DEFAULT 0, 'trans_id' INTEGER, "
+    "'monitor_artists' INTEGER DEFAULT 0)",
+    "CREATE TABLE playlist_tracks ('track_id' INTEGER, 'playlist_id' INTEGER, 'artist_id' INTEGER, "
+    "'artist_name' TEXT, 'track_name' TEXT, 'profile_id' INTEGER DEFAULT 1, 'track_added' TEXT, "
+    "'trans_id' INTEGER)",
+    "CREATE TABLE releases ('artist_id' INTEGER, 'artist_name' TEXT, 'album_id' INTEGER, 'album_name' TEXT, "
+    "'album_release' TEXT, 'album_added' INTEGER, 'explicit' INTEGER, 'label' TEXT, 'record_type' INTEGER, "
+    "'profile_id' INTEGER DEFAULT 1, 'future_release' INTEGER DEFAULT 0, 'trans_id' INTEGER, "
+    "unique(album_id, profile_id))",
+    "CREATE TABLE 'deemon' ('property' TEXT, 'value' TEXT)",
+    "CREATE TABLE 'profiles' ('id' INTEGER, 'name' TEXT, 'email' TEXT, 'alerts' INTEGER, 'bitrate' TEXT, "
+    "'record_type' TEXT, 'plex_baseurl' TEXT, 'plex_token' TEXT, 'plex_library' TEXT, 'download_path' TEXT, "
+    "PRIMARY KEY('id' AUTOINCREMENT))",
+    "CREATE TABLE transactions ('id' INTEGER, 'timestamp' INTEGER, 'profile_id' INTEGER DEFAULT 1, "
+    "PRIMARY KEY('id' AUTOINCREMENT))",
+    "CREATE UNIQUE INDEX 'idx_property' ON 'deemon' ('property')",
+    "CREATE INDEX 'artist' ON 'releases' ('artist_id', 'profile_id')",
+    "INSERT INTO 'deemon' ('property', 'value') VALUES ('version', '3.7')",
+    "INSERT INTO 'deemon' ('property', 'value') VALUES ('latest_ver', '')",
+    "INSERT INTO 'deemon' ('property', 'value') VALUES ('last_update_check', 0)",
+    "INSERT INTO 'deemon' ('property', 'value') VALUES ('release_channel', 'stable')",
+    "INSERT INTO 'profiles' ('name') VALUES ('default')",
+]
+
+RELEASES = [
+    (1, "Artist A", 10, "First", "2020-05-01", 0),
+    (1, "Artist A", 11, "Second", "2031-01-15", 1),
+    (2, "Artist B", 20, "Unknown Date", "0000-00-00", 0),
+]
+
+
+def create_3_7_database(path):
+    conn = sqlite3.connect(path)
+    for statement in SCHEMA_3_7:
+        conn.execute(statement)
+    conn.executemany("INSERT INTO monitor (artist_id, artist_name, profile_id) VALUES (?, ?, 1)",
+                     [(1, "Artist A"), (2, "Artist B")])
+    conn.execute("INSERT INTO playlists (id, title, profile_id) VALUES (100, 'Playlist', 1)")
+    conn.executemany("INSERT INTO releases (artist_id, artist_name, album_id, album_name, album_release, "
+                     "future_release, profile_id) VALUES (?, ?, ?, ?, ?, ?, 1)", RELEASES)
+    conn.commit()
+    conn.close()
+
+
+def schema(path) -> dict:
+    """ Columns of every table and definition of every index """
+    conn = sqlite3.connect(path)
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                             "AND name NOT LIKE 'sqlite_%'")]
+    result = {
+        'columns': {table: [row[1:] for row in conn.execute(f"PRAGMA table_info('{table}')")] for table in tables},
+        'indexes': {name: sql for name, sql in conn.execute("SELECT name, sql FROM sqlite_master "
+                                                            "WHERE type = 'index'")},
+        'triggers': sorted(row[0] for row in conn.execute("SELECT name FROM sqlite_master "
+                                                          "WHERE type = 'trigger'")),
+    }
+    conn.close()
+    return result
+
+
+@pytest.fixture
+def upgraded_database(database_path):
+    create_3_7_database(database_path)
+    db = Database()
+    db.do_upgrade()
+    yield db
+    db.close()
+
+
+def test_upgrade_from_3_7_reaches_current_version(upgraded_database):
+    assert upgraded_database.get_db_version() == __dbversion__
+
+
+def test_upgrade_from_3_7_matches_new_database(upgraded_database, database_path, tmp_path, monkeypatch):
+    upgraded_database.commit()
+    new_path = tmp_path / "new.db"
+    monkeypatch.setattr("deemon.utils.startup.get_database", lambda: new_path)
+    Database().close()
+
+    assert schema(database_path) == schema(new_path)
+
+
+def test_upgrade_backfills_release_day(upgraded_database):
+    rows = upgraded_database.query("SELECT album_release, release_day FROM releases").fetchall()
+
+    assert len(rows) == len(RELEASES)
+    for row in rows:
+        assert row['release_day'] == dates.release_day(row['album_release'])
+
+
+def test_upgrade_rebuilds_stats(upgraded_database):
+    stats = upgraded_database.query("SELECT * FROM stats WHERE profile_id = 1").fetchone()
+
+    assert (stats['artists'], stats['playlists'], stats['releases'], stats['future_releases']) == (2, 1, 3, 1)
+
+
+def test_upgrade_of_current_database_is_a_no_op(database_path):
+    db = Database()
+    db.do_upgrade()
+    before = schema(database_path)
+    db.do_upgrade()
+    db.commit()
+
+    assert db.get_db_version() == __dbversion__
+    assert schema(database_path) == before
+    db.close()
@@ -0,0 +1,128 @@
+import pytest
+
+from deemon.cmd import download
+from deemon.core.db import Database
+from deemon.utils import startup
+
+
+class LoggedIn:
+    """ Stands in for the deemix interface, downloads never reach it """
+    def login(self):
+        return True
+
+
+def album(album_id: int, title: str) -> dict:
+    return {'id': album_id, 'title': title, 'artist': {'name': "Artist"},
+            'link': f"https://www.deezer.com/album/{album_id}"}
+
+
+@pytest.fixture
+def downloader(database_path, monkeypatch):
+    """ A Download whose items are recorded instead of sent to deemix """
+    monkeypatch.setattr(download, "get_plex_server", lambda: None)
+    dl = download.Download.__new__(download.Download)
+    dl.db = Database()
+    dl.di = LoggedIn()
+    dl.queue_list = []
+    dl.resume = False
+    dl.downloaded = []
+    failures = {}
+
+    def download_item(item, track_concurrency=None):
+        dl.downloaded.append(item.album_id)
+        if item.album_id in failures:
+            return failures[item.album_id]
+
+    dl.download_item = download_item
+    dl.failures = failures
+    yield dl
+    dl.db.close()
+
+
+def leave_in_queue(db: Database, *albums):
+    """ Items queued by a run that was interrupted before downloading them """
+    db.add_to_queue([vars(download.QueueItem(album=a)) for a in albums])
+    db.commit()
+
+
+def test_only_items_of_this_run_are_downloaded(downloader):
+    leave_in_queue(downloader.db, album(1, "Interrupted"))
+
+    downloader.download_queue([download.QueueItem(album=album(2, "New"))])
+
+    assert downloader.downloaded == [2]
+    assert [row['album_id'] for row in downloader.db.get_pending_queue()] == [1]
+
+
+def test_resume_also_downloads_left_over_items(downloader):
+    leave_in_queue(downloader.db, album(1, "Interrupted"))
+    downloader.resume = True
+
+    downloader.download_queue([download.QueueItem(album=album(2, "New"))])
+
+    assert downloader.downloaded == [1, 2]
+    assert downloader.db.get_pending_queue() == []
+
+
+def test_item_of_this_run_already_left_in_queue_is_downloaded_once(downloader):
+    leave_in_queue(downloader.db, album(1, "Interrupted"))
+
+    downloader.download_queue([download.QueueItem(album=album(1, "Interrupted"))])
+
+    assert downloader.downloaded == [1]
+
+
+def test_failed_csv_keeps_queue_item_columns(downloader):
+    downloader.failures[3] = ("failed", "Not available")
+
+    downloader.download_queue([download.QueueItem(album=album(3, "Unavailable, Sadly"))])
+
+    lines = (startup.get_appdata_dir() / "failed.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0] == ','.join(download.QUEUE_CSV_FIELDS)
+    assert lines[0] == ("artist_name,album_id,album_title,track_id,track_title,url,"
+                        "playlist_title,bitrate,download_path,release_type")
+    assert '"Unavailable, Sadly"' in lines[1]
+
+
+def test_unexpected_errors_are_kept_out_of_failed_csv(downloader, monkeypatch):
+    failed_csv = startup.get_appdata_dir() / "failed.csv"
+    failed_csv.unlink(missing_ok=True)
+    downloader.failures[4] = ("error", "Connection reset")
+    statuses = []
+    set_queue_status = downloader.db.set_queue_status
+
+    def record_status(queue_id, status, reason=None):
+        statuses.append((status, reason))
+        set_queue_status(queue_id, status, reason)
+
+    monkeypatch.setattr(downloader.db, "set_queue_status", record_status)
+
+    downloader.download_queue([download.QueueItem(album=album(4, "Flaky"))])
+
+    assert not failed_csv.exists()
+    assert statuses == [("in_progress", None), ("error", "Connection reset")]
+
+
+def test_item_with_unexpected_error_is_queued_again(downloader):
+    downloader.failures[4] = ("error", "Connection reset")
+    downloader.download_queue([download.QueueItem(album=album(4, "Flaky"))])
+    del downloader.failures[4]
+
+    downloader.download_queue([download.QueueItem(album=album(4, "Flaky"))])
+
+    assert downloader.downloaded == [4, 4]
+    assert downloader.db.query("SELECT * FROM queue WHERE album_id = 4").fetchall() == []
+
+
+def test_only_pending_items_are_kept_after_the_run(downloader):
+    leave_in_queue(downloader.db, album(1, "Interrupted"))
+    downloader.failures[3] = ("failed", "Not available")
+    downloader.failures[4] = ("error", "Connection reset")
+
+    downloader.download_queue([download.QueueItem(album=album(album_id, f"Album {album_id}"))
+                               for album_id in (2, 3, 4)])
+
+    rows = downloader.db.query("SELECT album_id, status FROM queue").fetchall()
+    assert [(row['album_id'], row['status']) for row in rows] == [(1, "pending")]
+    failed_csv = (startup.get_appdata_dir() / "failed.csv").read_text(encoding="utf-8")
+    assert "Album 3" in failed_csv
@@ -0,0 +1,83 @@
+import re
+
+import pytest
+
+from deemon.core import common
+from deemon.core.common import ExclusionFilter
+
+TITLES = [
+    "Nevermind", "Nevermind (Deluxe Edition)", "Nevermind [Live]", "LIVE at Reading",
+    "In Utero (20th Anniversary Remaster)", "Bleach (Live) (Deluxe)", "Abbey Abbey Road", "Demo Tape",
+]
+
+
+def legacy_match(patterns: list, keywords: list, title: str) -> list:
+    """ Previous exclude_filtered_versions check of a single title """
+    pattern_match = [p for p in patterns if re.search(p, title)]
+    keyword_search = re.search(r'\(([^)]+)\)|\[([^)]+)]', title.lower())
+    keyword_match = [k for k in keywords if keyword_search and k in keyword_search.group()]
+    return pattern_match + keyword_match
+
+
+@pytest.mark.parametrize("patterns, keywords", [
+    (["(?i)live", "Remaster"], []),
+    ([], ["deluxe", "live", "anniversary"]),
+    (["^Demo", "(?i)^live"], ["live"]),
+    # Backreferences can't be merged and are checked on their own
+    ([r"(\w+) \1", "Tape"], ["deluxe"]),
+    # Duplicate group names make the merged regex invalid
+    (["(?P<word>Live)", "(?P<word>Tape)"], []),
+])
+def test_matches_like_the_previous_filter(patterns, keywords):
+    exclusions = ExclusionFilter(patterns, keywords)
+
+    for title in TITLES:
+        assert exclusions.match(title) == legacy_match(patterns, keywords, title), title
+
+
+def test_keywords_only_match_the_first_bracketed_part():
+    exclusions = ExclusionFilter([], ["deluxe"])
+
+    assert exclusions.match("Bleach (Live) (Deluxe)") == []
+    assert exclusions.match("Bleach (Deluxe) (Live)") == ["deluxe"]
+    assert exclusions.match("Deluxe") == []
+
+
+def test_filter_removes_excluded_albums():
+    albums = [{'id': i, 'title': title} for i, title in enumerate(TITLES)]
+
+    allowed = ExclusionFilter(["(?i)live"], ["deluxe"]).filter(albums)
+
+    assert [album['id'] for album in allowed] == [0, 4, 6, 7]
+
+
+def test_empty_filter_keeps_all_albums():
+    albums = [{'id': 1, 'title': "Nevermind (Deluxe Edition)"}]
+
+    assert not ExclusionFilter([], [])
+    assert ExclusionFilter([], []).filter(albums) is albums
+
+
+def test_memo_is_bounded(monkeypatch):
+    monkeypatch.setattr(ExclusionFilter, "MEMO_SIZE", 2)
+    exclusions = ExclusionFilter(["Live"], [])
+
+    for title in TITLES:
+        exclusions.match(title)
+
+    assert len(exclusions.memo) <= 2
+
+
+def test_filter_is_rebuilt_when_the_config_changes(monkeypatch):
+    exclusions = {'patterns': ["Live"], 'keywords': []}
+    monkeypatch.setattr(common.config, "exclusion_patterns", lambda: list(exclusions['patterns']))
+    monkeypatch.setattr(common.config, "exclusion_keywords", lambda: list(exclusions['keywords']))
+    monkeypatch.setattr(common, "_exclusion_filter", None)
+
+    first = common.exclusion_filter()
+    assert common.exclusion_filter() is first
+
+    exclusions['keywords'] = ["deluxe"]
+    second = common.exclusion_filter()
+    assert second is not first
+    assert second.keywords == ["deluxe"]
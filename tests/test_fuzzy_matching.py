@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from deemon.core.rileys_collection_matcher import (
+    CollectionMatcher, FuzzyIndex, bounded_levenshtein, fuzzy_match)
+
+
+def levenshtein(str1: str, str2: str) -> int:
+    """ Full-matrix distance, as computed by the previous _fuzzy_match """
+    previous = list(range(len(str2) + 1))
+    for i, char1 in enumerate(str1, 1):
+        current = [i]
+        for j, char2 in enumerate(str2, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char1 != char2)))
+        previous = current
+    return previous[-1]
+
+
+def legacy_fuzzy_match(str1: str, str2: str, threshold: float = 0.85) -> bool:
+    """ Previous CollectionMatcher._fuzzy_match """
+    if not str1 or not str2:
+        return False
+    if str1 == str2:
+        return True
+    if str1 in str2 or str2 in str1:
+        if min(len(str1), len(str2)) / max(len(str1), len(str2)) >= 0.70:
+            return True
+    if abs(len(str1) - len(str2)) > max(len(str1), len(str2)) * 0.3:
+        return False
+    return 1 - (levenshtein(str1, str2) / max(len(str1), len(str2))) >= threshold
+
+
+def similar_names(count: int, seed: int = 0) -> list:
+    """ Short names over a small alphabet, with edited copies of each other """
+    rng = random.Random(seed)
+    names = []
+    for _ in range(count):
+        if names and rng.random() < 0.6:
+            name = list(rng.choice(names))
+            for _ in range(rng.randint(1, 3)):
+                position = rng.randint(0, len(name))
+                action = rng.choice(["insert", "delete", "replace"])
+                if action == "insert" or not name:
+                    name.insert(position, rng.choice("abc "))
+                elif position < len(name):
+                    if action == "delete":
+                        del name[position]
+                    else:
+                        name[position] = rng.choice("abc ")
+            names.append(''.join(name))
+        else:
+            names.append(''.join(rng.choice("abc ") for _ in range(rng.randint(1, 14))))
+    return names
+
+
+@pytest.mark.parametrize("str1, str2", [
+    ("", ""), ("", "abc"), ("kitten", "sitting"), ("flaw", "lawn"), ("abc", "abc"), ("abcdef", "azced"),
+])
+@pytest.mark.parametrize("max_distance", [0, 1, 2, 3, 10])
+def test_bounded_levenshtein(str1, str2, max_distance):
+    assert bounded_levenshtein(str1, str2, max_distance) == min(levenshtein(str1, str2), max_distance + 1)
+
+
+def test_bounded_levenshtein_matches_full_distance():
+    names = similar_names(150)
+    for str1 in names[:50]:
+        for str2 in names:
+            for max_distance in (0, 1, 2, 4):
+                expected = min(levenshtein(str1, str2), max_distance + 1)
+                assert bounded_levenshtein(str1, str2, max_distance) == expected, (str1, str2, max_distance)
+
+
+@pytest.mark.parametrize("threshold", [0.85, 0.90])
+def test_fuzzy_match_agrees_with_previous_implementation(threshold):
+    names = similar_names(150, seed=1)
+    for str1 in names[:50]:
+        for str2 in names:
+            assert fuzzy_match(str1, str2, threshold) == legacy_fuzzy_match(str1, str2, threshold), (str1, str2)
+
+
+@pytest.mark.parametrize("threshold", [0.85, 0.90])
+def test_index_search_equals_full_scan(threshold):
+    names = similar_names(400, seed=2)
+    index = FuzzyIndex(names)
+
+    for query in similar_names(100, seed=3) + names[:50]:
+        expected = [name for name in dict.fromkeys(names) if fuzzy_match(query, name, threshold)]
+        assert index.search(query, threshold) == expected, query
+
+
+def test_index_search_of_empty_query():
+    assert FuzzyIndex(["abc"]).search("") == []
+
+
+def test_match_albums_agrees_with_single_lookups(tmp_path, monkeypatch):
+    # Enough albums for one artist to get its own album index
+    monkeypatch.setattr("deemon.core.rileys_collection_matcher.ALBUM_INDEX_MIN", 4)
+    library = tmp_path / "Audio"
+    for artist, albums in [("Nirvana", ["Nevermind", "In Utero", "Bleach", "Incesticide", "MTV Unplugged"]),
+                           ("Muse", ["Origin of Symmetry", "Absolution"])]:
+        for album in albums:
+            (library / "Rock" / artist[0] / artist / f"2000 - {album}").mkdir(parents=True)
+    matcher = CollectionMatcher(str(library), index_path=str(tmp_path / "index.json"))
+    albums = [("Nirvana", "Nevermind"), ("Nirvan", "Nevermnd"), ("The Nirvana", "In Utero (Deluxe)"),
+              ("Muse", "Absolutions"), ("Muse", "Nevermind"), ("Unknown", "Absolution"), ("Nirvana", "Bleach")]
+
+    expected = [matcher.is_album_in_collection(artist, album) for artist, album in albums]
+
+    assert matcher.match_albums(albums) == expected
+    assert expected == [True, True, True, True, False, False, True]
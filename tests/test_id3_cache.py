@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+from mutagen.easyid3 import EasyID3
+
+from deemon.cmd import upgradelib
+from deemon.cmd.upgradelib import TagCache
+from deemon.utils import scanner
+
+
+def tag(path, artist: str, album: str, title: str):
+    path.touch()
+    tags = EasyID3()
+    tags.update({'artist': artist, 'album': album, 'title': title})
+    tags.save(str(path))
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    library = tmp_path / "Music"
+    (library / "Nirvana").mkdir(parents=True)
+    tag(library / "Nirvana" / "01.mp3", "Nirvana/Foo Fighters", "Nevermind", "Breed")
+    tag(library / "Nirvana" / "02.mp3", "Nirvana", "In_Utero", "Serve the Servants")
+    (library / "Nirvana" / "03.mp3").write_bytes(b"not an mp3")
+    monkeypatch.setattr(upgradelib, "LIBRARY_ROOT", str(library))
+    monkeypatch.setattr(upgradelib.startup, "get_id3_cache", lambda: tmp_path / "id3_cache.json")
+    return library
+
+
+def read(library, processes: int = 0) -> list:
+    entries = sorted(scanner.scan(library, extensions={'.mp3'}), key=lambda entry: entry.path)
+    return upgradelib.read_library_tags(entries, processes)
+
+
+def cached_files(tmp_path) -> list:
+    with open(tmp_path / "id3_cache.json", encoding='utf-8') as f:
+        return sorted(os.path.basename(file) for file in json.load(f)['files'])
+
+
+@pytest.mark.parametrize("processes", [0, 1])
+def test_tags_are_read_and_cached(library, tmp_path, processes):
+    tags = read(library, processes)
+
+    assert tags[0] == {'artist': "Nirvana", 'album': "Nevermind", 'title': "Breed"}
+    assert tags[1] == {'artist': "Nirvana", 'album': "In Utero", 'title': "Serve the Servants"}
+    assert set(tags[2]) == {'error'}
+    assert cached_files(tmp_path) == ["01.mp3", "02.mp3", "03.mp3"]
+
+
+def test_unchanged_files_are_not_read_again(library, monkeypatch):
+    expected = read(library)
+    monkeypatch.setattr(upgradelib, "read_tags", lambda file: pytest.fail(f"{file} was read again"))
+
+    assert read(library) == expected
+
+
+def test_changed_files_are_read_again(library):
+    read(library)
+    track = library / "Nirvana" / "02.mp3"
+    size, mtime_ns = track.stat().st_size, track.stat().st_mtime_ns
+    tag(track, "Nirvana", "In Utero", "Serve The Servants")
+    # Same size, so only the mtime tells the file changed
+    os.utime(track, ns=(mtime_ns + 1, mtime_ns + 1))
+    assert track.stat().st_size == size
+
+    assert read(library)[1]['title'] == "Serve The Servants"
+
+
+def test_removed_files_are_pruned(library, tmp_path):
+    read(library)
+    (library / "Nirvana" / "01.mp3").unlink()
+
+    read(library)
+
+    assert cached_files(tmp_path) == ["02.mp3", "03.mp3"]
+
+
+def test_files_outside_the_library_are_kept(tmp_path):
+    cache = TagCache(tmp_path / "id3_cache.json")
+    stat = os.stat(tmp_path)
+    cache.set(str(tmp_path / "Other" / "01.mp3"), stat, {'error': "Other library"})
+    cache.set(str(tmp_path / "Music" / "01.mp3"), stat, {'error': "Removed"})
+
+    cache.save(str(tmp_path / "Music"))
+
+    assert cached_files(tmp_path) == ["01.mp3"]
+    assert TagCache(tmp_path / "id3_cache.json").get(str(tmp_path / "Other" / "01.mp3"), stat) == {
+        'error': "Other library"}
+
+
+@pytest.mark.parametrize("content", [
+    "{not json",
+    json.dumps({'version': upgradelib.ID3_CACHE_VERSION + 1, 'files': {}}),
+    json.dumps(["not", "a", "cache"]),
+])
+def test_unusable_cache_is_ignored(tmp_path, content):
+    (tmp_path / "id3_cache.json").write_text(content, encoding='utf-8')
+
+    assert TagCache(tmp_path / "id3_cache.json").entries == {}
+
+
+def test_missing_stat_is_never_cached(tmp_path):
+    cache = TagCache(tmp_path / "id3_cache.json")
+    cache.set("missing.mp3", None, {'error': "Missing"})
+
+    assert cache.get("missing.mp3", None) is None
+    assert cache.entries == {}
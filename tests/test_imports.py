@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# generate is a standalone script that does its work on import, it isn't part of the CLI
+COMMANDS = sorted(path.stem for path in (ROOT / "deemon" / "cmd").glob("*.py")
+                  if path.stem not in ("__init__", "generate"))
+
+
+@pytest.mark.parametrize("module", COMMANDS)
+def test_command_module_imports_before_config_is_loaded(module):
+    # The CLI imports command modules lazily, at which point the config may not be loaded yet
+    env = dict(os.environ, XDG_CONFIG_HOME=tempfile.mkdtemp(), PYTHONPATH=str(ROOT))
+    result = subprocess.run([sys.executable, "-c", f"import deemon.cmd.{module}"], env=env,
+                            capture_output=True, text=True, timeout=60)
+
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,41 @@
+import pytest
+
+from deemon.utils import normalize
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("The Beatles", "beatles"),
+    ("Motörhead", "motorhead"),
+    ("Abbey Road (Remastered)", "abbey road"),
+    ("Rock'n'Roll Suicide...", "rocknroll suicide"),
+    ("Greatest Hits Vol. 2", "greatest"),
+    ("Album + Demos", "album"),
+    ("OK Computer 1997", "ok computer"),
+    ("Beyoncé's Lemonade", "beyonce lemonade"),
+    ("", ""),
+    (None, ""),
+])
+def test_name_key(text, expected):
+    assert normalize.name_key(text) == expected
+
+
+@pytest.mark.parametrize("title, expected", [
+    ("Abbey Road - Remastered 2009", "abbey road"),
+    ("Abbey Road - 2009 Remaster", "abbey road"),
+    ("Nevermind (Deluxe Edition)", "nevermind"),
+    ("Lemonade [Explicit]", "lemonade"),
+    ("Rumours (1977)", "rumours"),
+    ("Thriller (25th Anniversary Edition)", "thriller (25th anniversary edition)"),
+    ("  Plain Title ", "plain title"),
+    # Case insensitive matching pairs 'ſ' with 's', non-ASCII titles try every pattern
+    ("Album - Remaſtered 2011", "album"),
+])
+def test_strip_edition_key(title, expected):
+    assert normalize.strip_edition_key(title) == expected
+
+
+def test_batch_keys_match_single_keys():
+    titles = ["Nevermind (Deluxe Edition)", "The Beatles", "Nevermind (Deluxe Edition)", "Motörhead"]
+
+    assert normalize.name_keys(titles) == [normalize.name_key(title) for title in titles]
+    assert normalize.strip_edition_keys(titles) == [normalize.strip_edition_key(title) for title in titles]
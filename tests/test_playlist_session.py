@@ -0,0 +1,72 @@
+import json
+
+import pytest
+import requests
+from deezer import Deezer
+
+from deemon.core import api
+from deemon.core.ratelimit import RateLimiter
+
+PLAYLISTS = {
+    1: {'id': 1, 'title': "Playlist", 'tracks': [{'id': 10, 'title': "Track", 'artist': {'id': 5, 'name': "Artist"}}]},
+    2: {'error': {'code': 200, 'message': "Private playlist"}},
+    3: {'error': {'code': 800, 'message': "No data"}},
+}
+
+
+class DeezerAdapter(requests.adapters.BaseAdapter):
+    """ Answers api.deezer.com playlist requests, mounted on the session under test """
+    def __init__(self):
+        super().__init__()
+        self.paths = []
+
+    def send(self, request, **kwargs):
+        path = request.path_url.split("?")[0].strip("/").split("/")
+        self.paths.append("/".join(path))
+        playlist = PLAYLISTS[int(path[1])]
+        if len(path) == 3 and 'error' not in playlist:
+            playlist = {'data': playlist['tracks']}
+        response = requests.Response()
+        response.status_code = 200
+        response._content = json.dumps(playlist).encode()
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def platform_api(monkeypatch):
+    monkeypatch.setattr(api, "Deezer", lambda *args: pytest.fail("A new Deezer client was created"))
+    platform_api = api.PlatformAPI.__new__(api.PlatformAPI)
+    platform_api.dz = Deezer()
+    platform_api.max_threads = 4
+    platform_api.cache = None
+    platform_api.limiter = RateLimiter(max_rate=1000)
+    platform_api.max_retries = 0
+    platform_api.set_connection_pool()
+    platform_api.adapter = DeezerAdapter()
+    platform_api.dz.session.mount("https://api.deezer.com/", platform_api.adapter)
+    return platform_api
+
+
+def test_connection_pool_fits_every_worker(platform_api):
+    adapter = platform_api.dz.session.get_adapter("https://www.deezer.com/")
+
+    assert adapter._pool_maxsize == platform_api.max_threads
+
+
+def test_playlists_are_requested_through_the_shared_session(platform_api):
+    playlist = platform_api.get_playlist(1)
+    tracks = platform_api.get_playlist_tracks({'id': 1, 'title': "Playlist"})
+
+    assert playlist == {'id': 1, 'title': "Playlist", 'link': "https://deezer.com/playlist/1"}
+    assert tracks['tracks'] == [{'id': 10, 'title': "Track", 'artist_id': 5, 'artist_name': "Artist"}]
+    assert platform_api.adapter.paths == ["playlist/1", "playlist/1/tracks"]
+
+
+@pytest.mark.parametrize("playlist_id", [2, 3], ids=["private", "not found"])
+def test_unavailable_playlists(platform_api, playlist_id):
+    assert platform_api.get_playlist(playlist_id) is None
+    assert platform_api.get_playlist_tracks({'id': playlist_id, 'title': "Playlist"}) is None
@@ -0,0 +1,41 @@
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from deemon.core.db import Database
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_database_lookups_use_indexes():
+    # Upgraded databases get the same indexes, see test_upgrade_from_3_7_matches_new_database
+    env = dict(os.environ, XDG_CONFIG_HOME=tempfile.mkdtemp())
+    result = subprocess.run([sys.executable, str(ROOT / "benchmarks" / "query_plans.py")], env=env,
+                            capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "0 full table or profile scan(s)" in result.stdout
+
+
+def test_releases_are_found_by_album_id_in_the_current_profile(database_path):
+    db = Database()
+    db.cursor.executemany("INSERT INTO releases (artist_id, album_id, profile_id, future_release) "
+                          "VALUES (?, ?, ?, ?)", [(1, 10, 1, 0), (2, 11, 1, 1), (3, 12, 2, 0)])
+
+    rows = db.get_releases_by_album_ids(list(range(1000)))
+    db.close()
+
+    assert sorted((row['album_id'], row['future_release']) for row in rows) == [(10, 0), (11, 1)]
+
+
+def test_artists_are_removed_by_exact_name(database_path):
+    db = Database()
+    db.cursor.executemany("INSERT INTO monitor (artist_id, artist_name, profile_id) VALUES (?, ?, 1)",
+                          [(1, "Artist"), (2, "ARTIST")])
+
+    db.remove_by_name([("Artist",)])
+
+    assert [row['artist_id'] for row in db.query("SELECT artist_id FROM monitor")] == [2]
+    db.close()
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+import requests
+
+from deemon.core import api, ratelimit
+from deemon.core.ratelimit import RateLimiter
+
+
+class Clock:
+    """ Replaces the time module in ratelimit, sleeping only moves the clock """
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ratelimit, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("attempt, limit", [(0, 0.5), (1, 1.0), (3, 4.0), (10, 30.0)])
+def test_backoff_is_jittered_up_to_a_capped_exponential(monkeypatch, attempt, limit):
+    monkeypatch.setattr(ratelimit.random, "uniform", lambda low, high: (low, high))
+
+    assert ratelimit.backoff(attempt) == (0, limit)
+
+
+def test_burst_up_to_the_rate_then_paced(clock):
+    limiter = RateLimiter(max_rate=5)
+
+    for _ in range(5):
+        limiter.acquire()
+    assert clock.slept == []
+
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.slept == pytest.approx([0.2, 0.2])
+    assert limiter.requests == 7
+
+
+def test_async_acquire_shares_the_bucket(clock, monkeypatch):
+    waits = []
+
+    async def sleep(seconds):
+        waits.append(seconds)
+
+    monkeypatch.setattr(ratelimit.asyncio, "sleep", sleep)
+    limiter = RateLimiter(max_rate=2)
+
+    async def acquire_all():
+        for _ in range(4):
+            await limiter.acquire_async()
+
+    asyncio.run(acquire_all())
+
+    # Without waiting in between, reservations queue up behind each other
+    assert waits == pytest.approx([0.5, 1.0])
+
+
+def test_throttling_halves_the_rate_once_per_second(clock):
+    limiter = RateLimiter(max_rate=16, min_rate=3)
+
+    limiter.throttled()
+    limiter.throttled()
+    assert limiter.rate == 8
+
+    clock.now += 1
+    limiter.throttled()
+    clock.now += 1
+    limiter.throttled()
+    assert limiter.rate == 3
+    assert limiter.throttled_count == 4
+
+
+def test_success_raises_the_rate_up_to_the_maximum(clock):
+    limiter = RateLimiter(max_rate=4)
+    limiter.throttled()
+    assert limiter.rate == 2
+
+    limiter.success()
+    assert limiter.rate == 2.5
+
+    for _ in range(10):
+        limiter.success()
+    assert limiter.rate == 4
+
+
+def test_requests_per_second(clock):
+    limiter = RateLimiter(max_rate=10)
+    assert limiter.requests_per_second() == 0
+
+    for _ in range(30):
+        limiter.acquire()
+
+    # 10 at once, then one every 0.1s
+    assert limiter.requests_per_second() == pytest.approx(30 / 2.0)
+
+
+@pytest.fixture
+def platform_api(clock, monkeypatch):
+    monkeypatch.setattr(api.time, "sleep", clock.sleep)
+    monkeypatch.setattr(ratelimit, "backoff", lambda attempt: 2 ** attempt)
+    platform_api = api.PlatformAPI.__new__(api.PlatformAPI)
+    platform_api.limiter = RateLimiter(max_rate=100)
+    platform_api.max_retries = 2
+    return platform_api
+
+
+def failing(failures: int):
+    calls = []
+
+    def request():
+        calls.append(len(calls))
+        if len(calls) <= failures:
+            raise requests.exceptions.ConnectionError("Connection reset")
+        return {'data': []}
+
+    return request, calls
+
+
+def test_transient_errors_are_retried_with_backoff(platform_api, clock):
+    request, calls = failing(2)
+
+    assert platform_api._call(request) == {'data': []}
+    assert len(calls) == 3
+    assert clock.slept == [1, 2]
+    assert platform_api.limiter.throttled_count == 2
+
+
+def test_last_error_is_raised_after_the_retries(platform_api):
+    request, calls = failing(3)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        platform_api._call(request)
+    assert len(calls) == 3
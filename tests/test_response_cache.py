@@ -0,0 +1,160 @@
+import asyncio
+import threading
+
+import pytest
+import requests
+from deezer.api import API
+from deezer.gw import GW
+
+from deemon.core import aioclient, api, cache
+from deemon.core.cache import ResponseCache
+from deemon.core.ratelimit import RateLimiter
+from deemon.utils import startup
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def response_cache(tmp_path, monkeypatch, clock):
+    monkeypatch.setattr(startup, "get_cache_database", lambda: tmp_path / "cache.db")
+    response_cache = ResponseCache()
+    response_cache.ttl = {'artist': 3600, 'album': 60, 'track': 60, 'search': 60}
+    yield response_cache
+    response_cache.conn.close()
+
+
+def test_entries_expire_per_endpoint(response_cache, clock):
+    response_cache.set('artist', "artist", {'id': 1})
+    response_cache.set('album', "album", {'id': 2})
+
+    clock.now += 61
+
+    assert response_cache.get('artist', "artist") == {'id': 1}
+    assert response_cache.get('album', "album") is None
+    assert response_cache.get('album', "album", allow_stale=True) == {'id': 2}
+
+
+def test_entries_survive_a_restart(response_cache):
+    response_cache.set('artist', "artist", {'id': 1})
+
+    reopened = ResponseCache()
+
+    assert reopened.get('artist', "artist") == {'id': 1}
+    assert reopened.size == response_cache.size
+    reopened.conn.close()
+
+
+def test_replacing_an_entry_keeps_the_size(response_cache):
+    response_cache.set('artist', "artist", {'name': "a"})
+    response_cache.set('artist', "artist", {'name': "b"})
+
+    assert response_cache.size == len('{"name": "b"}')
+
+
+def test_least_recently_used_entries_are_evicted(response_cache, clock):
+    entry_size = len('{"id": 0}')
+    response_cache.max_size = 3 * entry_size
+    for key in range(3):
+        response_cache.set('artist', str(key), {'id': key})
+        clock.now += 1
+    response_cache.get('artist', "0")
+    clock.now += 1
+
+    response_cache.set('artist', "3", {'id': 3})
+
+    # Evicted down to EVICT_TARGET of max_size, "0" was used after "1" and "2"
+    assert [key for key in "0123" if response_cache.get('artist', key, allow_stale=True)] == ["0", "3"]
+    assert response_cache.size == 2 * entry_size
+
+
+def test_clear(response_cache):
+    response_cache.set('artist', "artist", {'id': 1})
+    response_cache.clear()
+
+    assert response_cache.get('artist', "artist", allow_stale=True) is None
+    assert response_cache.size == 0
+
+
+def test_keys_are_shared_by_the_sync_and_async_clients():
+    assert (ResponseCache.make_key(API.get_artist, (1,), {})
+            == ResponseCache.make_key(aioclient.AsyncAPI.get_artist, (1,), {}))
+    assert (ResponseCache.make_key(GW.get_artist, (1,), {})
+            != ResponseCache.make_key(API.get_artist, (1,), {}))
+    assert (ResponseCache.make_key(API.get_artist_albums, (1,), {'limit': 25})
+            != ResponseCache.make_key(API.get_artist_albums, (1,), {'limit': -1}))
+
+
+@pytest.fixture
+def platform_api(response_cache, monkeypatch):
+    platform_api = api.PlatformAPI.__new__(api.PlatformAPI)
+    platform_api.cache = response_cache
+    platform_api.limiter = RateLimiter(max_rate=1000)
+    platform_api.max_retries = 0
+    return platform_api
+
+
+def test_cached_call_serves_fresh_entries(platform_api):
+    calls = []
+
+    def get_artist(artist_id):
+        calls.append(artist_id)
+        return {'id': artist_id}
+
+    assert platform_api._cached_call('artist', get_artist, 1) == {'id': 1}
+    assert platform_api._cached_call('artist', get_artist, 1) == {'id': 1}
+    assert calls == [1]
+
+
+def test_expired_entry_is_used_when_the_api_fails(platform_api, clock):
+    def get_album(album_id):
+        if clock.now > 1_700_000_000:
+            raise requests.exceptions.ConnectionError("Connection reset")
+        return {'id': album_id}
+
+    platform_api._cached_call('album', get_album, 2)
+    clock.now += 3600
+
+    assert platform_api._cached_call('album', get_album, 2) == {'id': 2}
+    with pytest.raises(requests.exceptions.ConnectionError):
+        platform_api._cached_call('album', get_album, 3)
+
+
+def test_async_cached_call_uses_the_cache_off_the_event_loop(platform_api, clock, monkeypatch):
+    cache_threads = []
+
+    def record_thread(method):
+        def wrapper(*args, **kwargs):
+            cache_threads.append(threading.current_thread())
+            return method(*args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(platform_api.cache, "get", record_thread(platform_api.cache.get))
+    monkeypatch.setattr(platform_api.cache, "set", record_thread(platform_api.cache.set))
+
+    async def get_album(album_id):
+        if clock.now > 1_700_000_000:
+            raise requests.exceptions.ConnectionError("Connection reset")
+        return {'id': album_id}
+
+    async def refresh():
+        first = await platform_api._acached_call('album', get_album, 2)
+        clock.now += 3600
+        return first, await platform_api._acached_call('album', get_album, 2)
+
+    assert asyncio.run(refresh()) == ({'id': 2}, {'id': 2})
+    # Lookup and store, then lookup and the expired entry
+    assert len(cache_threads) == 4
+    assert threading.main_thread() not in cache_threads
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from deemon.cmd import rollback
+from deemon.core.db import Database
+
+
+@pytest.fixture
+def db(database_path):
+    """ Three refreshes of profile 1, plus one of profile 2 sharing transaction ID 3 """
+    db = Database()
+    now = int(time.time())
+    db.cursor.executemany("INSERT INTO transactions (id, timestamp, profile_id) VALUES (?, ?, ?)",
+                          [(1, now, 1), (2, now, 1), (3, now, 1)])
+    db.cursor.executemany("INSERT INTO monitor (artist_id, artist_name, profile_id, trans_id) VALUES (?, ?, ?, ?)",
+                          [(1, "Artist A", 1, 1), (2, "Artist B", 1, 1), (3, "Artist C", 2, 3)])
+    db.cursor.executemany("INSERT INTO playlists (id, title, profile_id, trans_id) VALUES (?, ?, ?, ?)",
+                          [(100, "Playlist", 1, 2)])
+    db.cursor.executemany("INSERT INTO releases (artist_id, album_id, profile_id, trans_id) VALUES (?, ?, ?, ?)",
+                          [(1, 10, 1, 1), (1, 11, 1, 2), (2, 12, 1, 3), (3, 12, 2, 3)])
+    db.cursor.executemany("INSERT INTO playlist_tracks (track_id, playlist_id, profile_id, trans_id) "
+                          "VALUES (?, ?, ?, ?)", [(1000, 100, 1, 2), (11, 100, 1, 2), (1001, 100, 1, 3)])
+    db.commit()
+    yield db
+    db.close()
+
+
+def remaining(db) -> dict:
+    return {
+        'transactions': [r['id'] for r in db.query("SELECT id FROM transactions ORDER BY id")],
+        'monitor': [r['artist_id'] for r in db.query("SELECT artist_id FROM monitor ORDER BY artist_id")],
+        'releases': [(r['album_id'], r['profile_id'])
+                     for r in db.query("SELECT album_id, profile_id FROM releases ORDER BY album_id, profile_id")],
+        'playlist_tracks': [r['track_id'] for r in db.query("SELECT track_id FROM playlist_tracks ORDER BY track_id")],
+    }
+
+
+def test_rollback_last_refreshes(db):
+    db.rollback_last_refresh(2)
+
+    assert remaining(db) == {
+        'transactions': [1],
+        'monitor': [1, 2, 3],
+        'releases': [(10, 1), (12, 2)],
+        'playlist_tracks': [],
+    }
+
+
+def test_rollback_a_single_refresh(db):
+    db.rollback_refresh(1)
+
+    assert remaining(db) == {
+        'transactions': [2, 3],
+        'monitor': [3],
+        'releases': [(11, 1), (12, 1), (12, 2)],
+        'playlist_tracks': [11, 1000, 1001],
+    }
+
+
+def test_transactions_are_summarized(db):
+    summary = {t['id']: (t['release_count'], t['artist_count'], t['artist_name'], t['playlist_count'],
+                         t['playlist_title']) for t in db.get_transactions()}
+
+    assert list(summary) == [3, 2, 1]
+    assert summary[1] == (1, 2, "Artist A", 0, None)
+    # Album 11 and track 11 are counted once, as before
+    assert summary[2] == (2, 0, None, 1, "Playlist")
+    assert summary[3] == (2, 0, None, 0, None)
+
+
+def test_view_transactions(db, monkeypatch, capsys):
+    monkeypatch.setattr("builtins.input", lambda prompt: "2")
+
+    rollback.view_transactions()
+
+    lines = capsys.readouterr().out.splitlines()
+    assert [line.split(" - ", 1)[1] for line in lines if " - " in line] == [
+        "Added 2 releases", "Added Playlist and 2 releases", "Added Artist A + 1 artist(s) and 1 release"]
+    assert remaining(Database())['transactions'] == [1, 3]
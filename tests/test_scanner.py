@@ -0,0 +1,88 @@
+import os
+
+import pytest
+
+from deemon.utils import scanner
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for path in ["Artist/Album/01.mp3", "Artist/Album/02.MP3", "Artist/Album/cover.jpg", "Artist/Single/01.flac",
+                 "Artist/.hidden/01.mp3", ".trash/01.mp3", "Artist/.03.mp3", "top.mp3"]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+    (tmp_path / "Empty").mkdir()
+    return tmp_path
+
+
+def names(tree, entries) -> list:
+    return sorted(os.path.relpath(entry.path, tree) for entry in entries)
+
+
+def walk(tree, extensions=None, skip_hidden=True) -> list:
+    """ Files os.walk finds, for comparison """
+    files = []
+    for root, dirs, filenames in os.walk(tree):
+        if skip_hidden:
+            dirs[:] = [d for d in dirs if not d.startswith('.')]
+            filenames = [f for f in filenames if not f.startswith('.')]
+        files += [os.path.relpath(os.path.join(root, f), tree) for f in filenames
+                  if not extensions or os.path.splitext(f)[1].lower() in extensions]
+    return sorted(files)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_scan_finds_the_same_files_as_os_walk(tree, workers):
+    assert names(tree, scanner.scan(tree, workers=workers)) == walk(tree)
+
+
+def test_scan_filters_extensions_case_insensitively(tree):
+    assert names(tree, scanner.scan(tree, extensions={'.MP3'})) == [
+        os.path.join("Artist", "Album", "01.mp3"), os.path.join("Artist", "Album", "02.MP3"), "top.mp3"]
+
+
+def test_scan_includes_hidden_entries_when_asked(tree):
+    assert names(tree, scanner.scan(tree, skip_hidden=False)) == walk(tree, skip_hidden=False)
+
+
+def test_scan_directories_only(tree):
+    assert names(tree, scanner.scan(tree, files=False, dirs=True)) == [
+        "Artist", os.path.join("Artist", "Album"), os.path.join("Artist", "Single"), "Empty"]
+
+
+def test_scan_without_recursion(tree):
+    assert names(tree, scanner.scan(tree, recursive=False, dirs=True)) == ["Artist", "Empty", "top.mp3"]
+
+
+def test_scan_does_not_follow_symlinked_directories_by_default(tree):
+    try:
+        (tree / "Link").symlink_to(tree / "Artist", target_is_directory=True)
+    except OSError:
+        pytest.skip("Symlinks are not supported here")
+
+    assert os.path.join("Link", "Album", "01.mp3") not in names(tree, scanner.scan(tree))
+    assert os.path.join("Link", "Album", "01.mp3") in names(tree, scanner.scan(tree, follow_symlinks=True))
+
+
+def test_scan_of_missing_directory_is_empty(tmp_path):
+    assert list(scanner.scan(tmp_path / "missing")) == []
+
+
+def test_scan_stopped_early(tree):
+    # Closing the generator cancels the pending listings and shuts the workers down
+    entries = scanner.scan(tree)
+    assert next(entries)
+    entries.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 100])
+def test_map_dirs_keeps_the_order_of_paths(chunk_size):
+    paths = [f"dir{i}" for i in range(20)]
+
+    assert list(scanner.map_dirs(str.upper, paths, workers=4, chunk_size=chunk_size)) == [p.upper() for p in paths]
+
+
+def test_list_dir(tree):
+    assert sorted(e.name for e in scanner.list_dir(str(tree / "Artist"))) == ["Album", "Single"]
+    assert sorted(e.name for e in scanner.list_dir(str(tree / "Artist"), skip_hidden=False)) == [
+        ".03.mp3", ".hidden", "Album", "Single"]
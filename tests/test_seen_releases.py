@@ -0,0 +1,62 @@
+import pytest
+
+from deemon.core.db import Database
+from deemon.core.seen import SeenReleases
+
+
+def release(album_id: int, artist_id: int = 1, future: int = 0) -> dict:
+    return {'id': album_id, 'title': f"Album {album_id}", 'artist_id': artist_id,
+            'artist_name': f"Artist {artist_id}", 'release_date': "2020-01-01", 'future': future,
+            'explicit_lyrics': 0, 'record_type': "album"}
+
+
+@pytest.fixture
+def db(database_path):
+    db = Database()
+    yield db
+    db.close()
+
+
+def test_future_releases_are_unseen():
+    seen = SeenReleases([{'album_id': 1}, {'album_id': 2, 'future_release': 1}])
+
+    assert 1 in seen
+    assert 2 not in seen
+    assert seen.is_future(2)
+    assert len(seen) == 2
+    assert seen.unseen([{'id': 1}, {'id': 2}, {'id': 3}]) == [{'id': 2}, {'id': 3}]
+
+
+def test_release_moves_between_future_and_released():
+    seen = SeenReleases()
+    seen.add(1, future_release=1)
+    seen.add(1)
+
+    assert 1 in seen and not seen.is_future(1)
+
+    seen.update_tuples([(1, 1)])
+
+    assert 1 not in seen and seen.is_future(1)
+    assert len(seen) == 1
+
+
+def test_tuples_and_rows_give_the_same_index():
+    rows = [(1, 0), (2, 1), (3, 0), (2, 0), (3, 1)]
+    from_rows = SeenReleases([{'album_id': a, 'future_release': f} for a, f in rows])
+    from_tuples = SeenReleases()
+    from_tuples.update_tuples(rows)
+
+    assert (from_rows.released, from_rows.future) == (from_tuples.released, from_tuples.future) == ({1, 2}, {3})
+
+
+def test_stored_releases_are_grouped_by_artist(db):
+    db.add_new_releases([release(10, artist_id=2), release(11, artist_id=1), release(12, artist_id=2, future=1),
+                         release(13, artist_id=3)])
+
+    by_artist = {artist_id: (seen.released, seen.future) for artist_id, seen in db.iter_seen_releases_by_artist()}
+
+    assert list(by_artist) == [1, 2, 3]
+    assert by_artist[2] == ({10}, {12})
+    for artist_id, expected in by_artist.items():
+        seen = db.get_seen_releases(artist_id)
+        assert (seen.released, seen.future) == expected
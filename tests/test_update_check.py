@@ -0,0 +1,56 @@
+import logging
+import threading
+import time
+
+import pytest
+
+from deemon import cli
+from deemon.core.db import Database
+from deemon.utils import startup
+
+
+@pytest.fixture
+def database(database_path, monkeypatch):
+    # Both are set up by the run command
+    db = Database()
+    monkeypatch.setattr(cli, "db", db)
+    monkeypatch.setattr(cli, "logger", logging.getLogger("deemon"))
+    yield db
+    db.close()
+
+
+def update_check(monkeypatch, latest_ver: str = None, pypi_answered: threading.Event = None):
+    """ An update check whose PyPI lookup waits for pypi_answered, if given """
+    def get_latest_version(release_type, timeout):
+        if pypi_answered:
+            pypi_answered.wait()
+        return latest_ver
+
+    monkeypatch.setattr(startup, "get_latest_version", get_latest_version)
+    check = startup.UpdateCheck("stable")
+    check.start()
+    return check
+
+
+def test_finished_check_is_saved(database, monkeypatch):
+    check = update_check(monkeypatch, "9.9.9")
+    check.join()
+
+    cli.save_update_check(check)
+
+    assert database.get_latest_ver() == "9.9.9"
+    assert int(database.last_update_check()) > 0
+
+
+def test_unfinished_check_is_not_waited_on(database, monkeypatch):
+    pypi_answered = threading.Event()
+    check = update_check(monkeypatch, "9.9.9", pypi_answered)
+
+    started = time.monotonic()
+    cli.save_update_check(check)
+
+    assert time.monotonic() - started < 1
+    # Checked again on the next run
+    assert int(database.last_update_check()) == 0
+    assert database.get_latest_ver() == ""
+    pypi_answered.set()
@@ -0,0 +1,157 @@
+import time
+
+import pytest
+
+from deemon.core import api
+from deemon.core.db import Database
+from deemon.core.ratelimit import RateLimiter
+
+DISCOGRAPHY = [{'id': album_id} for album_id in range(100, 160)]
+
+
+class Client:
+    """ Public API client serving a discography, newest releases first """
+    def __init__(self, releases):
+        self.releases = releases
+        self.limits = []
+
+    def get_artist_albums(self, artist_id, limit=-1):
+        self.limits.append(limit)
+        data = self.releases if limit == -1 else self.releases[:limit]
+        return {'data': list(data), 'total': len(self.releases)}
+
+
+@pytest.fixture
+def platform_api(monkeypatch):
+    monkeypatch.setattr(api.config, "incremental_refresh", lambda: True)
+    monkeypatch.setattr(api.config, "full_refresh_interval", lambda: 7)
+    platform_api = api.PlatformAPI.__new__(api.PlatformAPI)
+    platform_api.platform = "deezer-api"
+    platform_api.limiter = RateLimiter(max_rate=1000)
+    platform_api.max_retries = 0
+    return platform_api
+
+
+def artist(watermark: dict = None) -> dict:
+    query = {'artist_id': 1, 'artist_name': "Artist"}
+    if watermark:
+        query.update(release_total=watermark['total'], release_hash=watermark['hash'],
+                     last_full_refresh=watermark['last_full'])
+    return query
+
+
+def first_refresh(platform_api, releases=DISCOGRAPHY) -> dict:
+    query = artist()
+    platform_api._fetch_discography(Client(releases), query, -1)
+    return query['watermark']
+
+
+def test_first_refresh_fetches_everything(platform_api):
+    client = Client(DISCOGRAPHY)
+    query = artist()
+
+    response = platform_api._fetch_discography(client, query, -1)
+
+    assert client.limits == [-1]
+    assert len(response['data']) == 60
+    assert query['watermark']['total'] == 60
+    assert query['watermark']['last_full'] == pytest.approx(time.time(), abs=5)
+
+
+def test_unchanged_discography_only_fetches_the_first_page(platform_api):
+    watermark = first_refresh(platform_api)
+    client = Client(DISCOGRAPHY)
+    query = artist(watermark)
+
+    response = platform_api._fetch_discography(client, query, -1)
+
+    assert client.limits == [api.DISCOGRAPHY_PAGE_SIZE]
+    assert response['data'] == DISCOGRAPHY[:api.DISCOGRAPHY_PAGE_SIZE]
+    assert query['watermark'] == dict(watermark, last_full=None)
+
+
+@pytest.mark.parametrize("releases", [
+    # A new release on the first page
+    [{'id': 99}] + DISCOGRAPHY,
+    # A release removed further down, only the total changes
+    DISCOGRAPHY[:-1],
+], ids=["new release", "total changed"])
+def test_changed_discography_is_fetched_in_full(platform_api, releases):
+    client = Client(releases)
+    query = artist(first_refresh(platform_api))
+
+    response = platform_api._fetch_discography(client, query, -1)
+
+    assert client.limits == [api.DISCOGRAPHY_PAGE_SIZE, -1]
+    assert response['data'] == releases
+    assert query['watermark']['total'] == len(releases)
+
+
+def test_full_refresh_after_the_interval(platform_api):
+    watermark = first_refresh(platform_api)
+    watermark['last_full'] -= 8 * 86400
+    client = Client(DISCOGRAPHY)
+
+    platform_api._fetch_discography(client, artist(watermark), -1)
+
+    assert client.limits == [-1]
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("record_type", "album"),
+    ("allow_featured_in", True),
+    ("allow_compilations", True),
+    ("allow_unofficial", True),
+])
+def test_changed_release_filters_force_a_full_fetch(platform_api, monkeypatch, setting, value):
+    watermark = first_refresh(platform_api)
+    monkeypatch.setattr(api.config, setting, lambda: value)
+    client = Client(DISCOGRAPHY)
+
+    platform_api._fetch_discography(client, artist(watermark), -1)
+
+    assert client.limits == [api.DISCOGRAPHY_PAGE_SIZE, -1]
+
+
+def test_changed_artist_record_type_forces_a_full_fetch(platform_api):
+    watermark = first_refresh(platform_api)
+    client = Client(DISCOGRAPHY)
+    query = dict(artist(watermark), record_type="ep")
+
+    platform_api._fetch_discography(client, query, -1)
+
+    assert client.limits == [api.DISCOGRAPHY_PAGE_SIZE, -1]
+
+
+def test_incremental_refresh_can_be_disabled(platform_api, monkeypatch):
+    monkeypatch.setattr(api.config, "incremental_refresh", lambda: False)
+    client = Client(DISCOGRAPHY)
+
+    platform_api._fetch_discography(client, artist(first_refresh(platform_api)), -1)
+
+    assert client.limits == [-1]
+
+
+def test_limited_requests_leave_the_watermark_alone(platform_api):
+    client = Client(DISCOGRAPHY)
+    query = artist(first_refresh(platform_api))
+
+    platform_api._fetch_discography(client, query, 10)
+
+    assert client.limits == [10]
+    assert 'watermark' not in query
+
+
+def test_watermarks_are_stored_per_artist(database_path):
+    db = Database()
+    db.query("INSERT INTO monitor (artist_id, artist_name, profile_id) VALUES (1, 'Artist', 1), (2, 'Other', 1)")
+
+    db.set_artist_watermarks([{'artist_id': 1, 'total': 60, 'hash': "full", 'last_full': 1000}])
+    db.set_artist_watermarks([{'artist_id': 1, 'total': 61, 'hash': "page", 'last_full': None}])
+    db.commit()
+
+    first, other = db.get_monitored_artist_by_id(1), db.get_monitored_artist_by_id(2)
+    db.close()
+    # The time of the last full fetch is kept by first-page refreshes
+    assert (first['release_total'], first['release_hash'], first['last_full_refresh']) == (61, "page", 1000)
+    assert other['release_hash'] is None